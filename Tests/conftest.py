@@ -0,0 +1,59 @@
+"""
+Shared fixtures for tests that run the real servicer on stub backends.
+"""
+import grpc
+import pytest
+import pytest_asyncio
+import story2audio_pb2_grpc
+from grpc_health.v1 import health_pb2_grpc
+from config import Config
+from src import admission, batch_processor, kokoro_tts
+from src.admission import AdmissionController
+
+# Zero-latency stub backends; also exported to the environment for spawned workers
+STUB_SETTINGS = {
+    "ENHANCER_BACKEND": "stub",
+    "TTS_BACKEND": "stub",
+    "STUB_ENHANCER_MS_PER_TOKEN": 0.0,
+    "STUB_TTS_MS_PER_CHAR": 0.0,
+    "STUB_TTS_SAMPLES_PER_CHAR": 8,
+    "ENABLE_CACHING": False,
+}
+
+
+@pytest.fixture
+def stub_backends(monkeypatch):
+    """Select zero-latency stub backends for this process and spawned children, resetting shared state."""
+    for name, value in STUB_SETTINGS.items():
+        monkeypatch.setenv(name, str(value).lower())
+        monkeypatch.setattr(Config, name, value)
+    monkeypatch.setattr(kokoro_tts, "_pipeline_instance", None)
+    monkeypatch.setattr(admission, "_controller", AdmissionController())
+    monkeypatch.setattr(batch_processor, "_worker_enhancer", None)
+
+
+@pytest_asyncio.fixture
+async def grpc_server():
+    """
+    Start in-process gRPC servers, stopped when the test ends.
+
+    Yields:
+        Async callable taking a StoryService servicer (and optionally a health
+        servicer) and returning the local port it is served on
+    """
+    servers = []
+
+    async def start(servicer=None, health=None):
+        server = grpc.aio.server()
+        if servicer is not None:
+            story2audio_pb2_grpc.add_StoryServiceServicer_to_server(servicer, server)
+        if health is not None:
+            health_pb2_grpc.add_HealthServicer_to_server(health, server)
+        port = server.add_insecure_port("localhost:0")
+        await server.start()
+        servers.append(server)
+        return port
+
+    yield start
+    for server in servers:
+        await server.stop(None)
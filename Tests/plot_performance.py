@@ -1,15 +1,39 @@
-import matplotlib.pyplot as plt
+"""
+Plot load-test results written by scripts/benchmark.py.
 
-# Simulated data (replace with your actual Locust test results)
-concurrent_users = [1, 5, 10, 15, 20]
-response_times = [1.2, 2.5, 3.5, 4.8, 6.0]  # Average response times in seconds
+Usage:
+    python Tests/plot_performance.py results.json [performance_graph.png]
+"""
+import json
+import sys
 
-plt.figure(figsize=(8, 6))
-plt.plot(concurrent_users, response_times, marker='o', color='b', label='Response Time (s)')
-plt.title('Concurrent Users vs. Response Time')
-plt.xlabel('Number of Concurrent Users')
-plt.ylabel('Response Time (seconds)')
-plt.grid(True)
-plt.legend()
 
-plt.savefig('performance_graph.png')
\ No newline at end of file
+def plot_results(results: dict, output_path: str = "performance_graph.png") -> None:
+    """Plot latency percentiles and TTFB against concurrency (or arrival rate)."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    runs = [run for run in results["runs"] if "latency_p50" in run]
+    levels = [run["level"] for run in runs]
+    xlabel = "Concurrent Requests" if results["mode"] == "closed" else "Arrival Rate (requests/s)"
+
+    plt.figure(figsize=(8, 6))
+    for key, style in (("latency_p50", "o-"), ("latency_p90", "s-"), ("latency_p99", "^-"), ("ttfb_p50", "x--")):
+        plt.plot(levels, [run[key] for run in runs], style, label=key.replace("_", " "))
+    plt.title(f"{xlabel} vs. Response Time ({results['rpc']} RPC)")
+    plt.xlabel(xlabel)
+    plt.ylabel("Response Time (seconds)")
+    plt.grid(True)
+    plt.legend()
+    plt.savefig(output_path)
+    plt.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    with open(sys.argv[1], encoding="utf-8") as f:
+        data = json.load(f)
+    plot_results(data, sys.argv[2] if len(sys.argv) > 2 else "performance_graph.png")
@@ -0,0 +1,149 @@
+"""
+Tests for admission control and load shedding.
+"""
+import asyncio
+import grpc
+import pytest
+import story2audio_pb2
+import story2audio_pb2_grpc
+from src import admission
+from src.admission import AdmissionController, AdmissionRejected
+
+
+class TestAdmissionController:
+    """Test cases for the work budget."""
+
+    @pytest.mark.asyncio
+    async def test_admits_within_budget(self):
+        """Test requests that fit the budget are admitted and released."""
+        controller = AdmissionController(max_work=10, queue_timeout=0, cost_per_word=1.0)
+        async with controller.admit(4):
+            async with controller.admit(6):
+                assert controller.in_flight_work == 10
+        assert controller.in_flight_work == 0
+        assert controller.stats()["admitted"] == 2
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_budget_exhausted(self):
+        """Test a request over budget is shed when it cannot queue."""
+        controller = AdmissionController(max_work=10, queue_timeout=0, cost_per_word=1.0)
+        async with controller.admit(8):
+            with pytest.raises(AdmissionRejected) as exc_info:
+                async with controller.admit(5):
+                    pass
+        assert exc_info.value.reason == "overloaded"
+        assert controller.stats()["rejected_overloaded"] == 1
+
+    @pytest.mark.asyncio
+    async def test_oversized_request_admitted_when_idle(self):
+        """Test a story larger than the budget still runs on an idle server."""
+        controller = AdmissionController(max_work=10, queue_timeout=0, cost_per_word=1.0)
+        async with controller.admit(50):
+            assert controller.in_flight_work == 50
+
+    @pytest.mark.asyncio
+    async def test_queued_requests_admitted_in_order(self):
+        """Test waiting requests are admitted first come, first served as budget frees up."""
+        controller = AdmissionController(max_work=10, queue_timeout=5, cost_per_word=1.0)
+        order = []
+        release = asyncio.Event()
+
+        async def request(name, words):
+            async with controller.admit(words):
+                order.append(name)
+                await release.wait()
+
+        first = asyncio.create_task(request("first", 10))
+        await asyncio.sleep(0)
+        large = asyncio.create_task(request("large", 8))
+        await asyncio.sleep(0)
+        small = asyncio.create_task(request("small", 1))
+        await asyncio.sleep(0.01)
+        assert order == ["first"] and controller.queued == 2
+
+        release.set()
+        await asyncio.gather(first, large, small)
+        assert order == ["first", "large", "small"]
+        assert controller.in_flight_work == 0
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout(self):
+        """Test a queued request is rejected when budget does not free up in time."""
+        controller = AdmissionController(max_work=10, queue_timeout=0.05, cost_per_word=1.0)
+        async with controller.admit(10):
+            with pytest.raises(AdmissionRejected):
+                async with controller.admit(1):
+                    pass
+            assert controller.queued == 0
+
+    @pytest.mark.asyncio
+    async def test_unmeetable_deadline(self):
+        """Test a request is dropped before starting when its deadline is shorter than the estimate."""
+        controller = AdmissionController(max_work=0, cost_per_word=0.5)
+        with pytest.raises(AdmissionRejected) as exc_info:
+            async with controller.admit(100, time_remaining=10):
+                pass
+        assert exc_info.value.reason == "deadline"
+
+        async with controller.admit(10, time_remaining=10):
+            pass
+
+    @pytest.mark.asyncio
+    async def test_calibrates_from_stage_time(self):
+        """Test observed stage time moves the per-word cost estimate."""
+        controller = AdmissionController(cost_per_word=0.01, smoothing=0.5)
+        async with controller.admit(10) as ticket:
+            ticket.work.add("synthesize", 1.0)
+        assert controller.cost_per_word == pytest.approx(0.055)
+
+        # Failed requests are not used for calibration
+        with pytest.raises(RuntimeError):
+            async with controller.admit(10) as ticket:
+                ticket.work.add("synthesize", 100.0)
+                raise RuntimeError("boom")
+        assert controller.cost_per_word == pytest.approx(0.055)
+        assert controller.in_flight_work == 0
+
+    @pytest.mark.asyncio
+    async def test_overlapping_stages_admit_reachable_deadline(self):
+        """Test the deadline check uses wall time, not stage time summed across overlapping stages."""
+        controller = AdmissionController(max_work=0, cost_per_word=0.01, smoothing=1.0)
+        async with controller.admit(10) as ticket:
+            # Enhancement and synthesis of different chunks run side by side
+            async def stage(name):
+                await asyncio.sleep(0.05)
+                ticket.work.add(name, 0.5)
+            await asyncio.gather(stage("enhance"), stage("synthesize"))
+        assert controller.cost_per_word == pytest.approx(0.1)
+        assert controller.seconds_per_word < 0.05
+
+        # Summed work (1s) exceeds the deadline, the measured wall time does not
+        assert controller.estimate(10) > 0.5
+        with pytest.raises(AdmissionRejected) as exc_info:
+            async with controller.admit(1000, time_remaining=0.5):
+                pass
+        assert exc_info.value.reason == "deadline"
+        async with controller.admit(10, time_remaining=0.5):
+            pass
+
+
+class TestServerAdmission:
+    """Admission control in the real servicer on stub backends."""
+
+    @pytest.mark.asyncio
+    async def test_deadline_rejected_before_inference(self, stub_backends, grpc_server, monkeypatch):
+        """Test a stream whose deadline cannot be met fails fast with DEADLINE_EXCEEDED."""
+        from api.server import StoryServiceServicer
+
+        monkeypatch.setattr(admission, "_controller", AdmissionController(cost_per_word=1.0))
+        servicer = StoryServiceServicer()
+        port = await grpc_server(servicer)
+        story = "A brave knight went on a quest to save the kingdom. " * 8
+        async with grpc.aio.insecure_channel(f"localhost:{port}") as channel:
+            stub = story2audio_pb2_grpc.StoryServiceStub(channel)
+            with pytest.raises(grpc.aio.AioRpcError) as exc_info:
+                async for _ in stub.GenerateAudioStream(story2audio_pb2.StoryRequest(story_text=story), timeout=5):
+                    pass
+        assert exc_info.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+        assert "exceeds remaining deadline" in exc_info.value.details()
+        assert servicer.enhancer is None
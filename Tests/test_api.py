@@ -35,6 +35,37 @@ async def test_generate_audio_long_input():
         assert response.audio_base64 == ""
         assert "Text too long" in response.message
 
+@pytest.mark.asyncio
+async def test_generate_audio_stream():
+    async with grpc.aio.insecure_channel("localhost:50051") as channel:
+        stub = story2audio_pb2_grpc.StoryServiceStub(channel)
+        request = story2audio_pb2.StoryRequest(story_text="A brave knight went on a quest.")
+        frames = [frame async for frame in stub.GenerateAudioStream(request)]
+        assert len(frames) > 0
+        assert [f.index for f in frames] == list(range(len(frames)))
+        assert frames[-1].final
+        assert all(len(f.audio) > 0 for f in frames)
+
+@pytest.mark.asyncio
+async def test_generate_audio_binary():
+    async with grpc.aio.insecure_channel("localhost:50051") as channel:
+        stub = story2audio_pb2_grpc.StoryServiceStub(channel)
+        request = story2audio_pb2.StoryRequest(story_text="A brave knight went on a quest.", binary=True)
+        response = await stub.GenerateAudio(request)
+        assert response.status == "success"
+        assert len(response.audio) > 0
+        assert response.audio_base64 == ""
+
+@pytest.mark.asyncio
+async def test_generate_audio_chunked():
+    async with grpc.aio.insecure_channel("localhost:50051") as channel:
+        stub = story2audio_pb2_grpc.StoryServiceStub(channel)
+        request = story2audio_pb2.StoryRequest(story_text="A brave knight went on a quest.")
+        pieces = [piece async for piece in stub.GenerateAudioChunked(request)]
+        assert [p.sequence for p in pieces] == list(range(len(pieces)))
+        assert pieces[-1].last
+        assert sum(len(p.data) for p in pieces) == pieces[0].total_size
+
 if __name__ == "__main__":
     import sys
     sys.exit(pytest.main(["-v", __file__]))
\ No newline at end of file
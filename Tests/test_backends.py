@@ -0,0 +1,93 @@
+"""
+Tests for the model backend registry and stub backends.
+"""
+import time
+import grpc
+import numpy as np
+import pytest
+import story2audio_pb2
+import story2audio_pb2_grpc
+from src import backends, kokoro_tts
+from src.backends import StubEnhancer, StubTTSPipeline, create_enhancer, create_tts_pipeline
+
+
+class TestRegistry:
+    """Test cases for backend lookup."""
+
+    def test_unknown_backend(self):
+        """Test an unregistered backend name is rejected."""
+        with pytest.raises(ValueError):
+            create_enhancer("missing")
+        with pytest.raises(ValueError):
+            create_tts_pipeline(name="missing")
+
+    def test_register_custom_backend(self, monkeypatch):
+        """Test a registered factory is used when selected."""
+        monkeypatch.setattr(backends, "_tts_backends", dict(backends._tts_backends))
+        backends.register_tts_backend("silent", lambda lang_code: f"silent-{lang_code}")
+        assert create_tts_pipeline("b", name="silent") == "silent-b"
+        assert "silent" in backends.available_backends()["tts"]
+
+    def test_config_selects_backend(self, stub_backends):
+        """Test Config chooses the backend when no name is given."""
+        assert isinstance(create_enhancer(), StubEnhancer)
+        assert isinstance(kokoro_tts.get_pipeline(), StubTTSPipeline)
+
+
+class TestStubEnhancer:
+    """Test cases for StubEnhancer."""
+
+    def test_echoes_chunks(self):
+        """Test chunks come back unchanged and in order."""
+        enhancer = StubEnhancer(ms_per_token=0)
+        chunks = ["The knight rode out.", "A dragon waited\nin the hills."]
+        assert enhancer.enhance_batch(chunks, batch_size=2) == chunks
+        assert enhancer.enhance_chunk(chunks[0]) == chunks[0]
+
+    def test_latency_per_token(self):
+        """Test decode time scales with tokens, not with batch size."""
+        enhancer = StubEnhancer(ms_per_token=1)
+        start = time.perf_counter()
+        enhancer.enhance_batch(["one story.", "two story.", "three story."], max_new_tokens=40, batch_size=3)
+        elapsed = time.perf_counter() - start
+        assert 0.04 <= elapsed < 0.1
+
+
+class TestStubTTSPipeline:
+    """Test cases for StubTTSPipeline."""
+
+    def test_output_length_per_char(self):
+        """Test audio length is proportional to text length across all segments."""
+        text = "First sentence. Second one! And a third?"
+        segments = list(StubTTSPipeline(samples_per_char=10, ms_per_char=0)(text, voice="af_heart"))
+        assert len(segments) == 3
+        assert sum(len(audio) for _, _, audio in segments) == 10 * len(text)
+
+    def test_deterministic_per_voice(self):
+        """Test the same input gives identical audio and voices differ."""
+        pipeline = StubTTSPipeline(samples_per_char=50, ms_per_char=0)
+        a = kokoro_tts.synthesize_chunk("Hello there.", voice="af_heart", pipeline=pipeline)
+        b = kokoro_tts.synthesize_chunk("Hello there.", voice="af_heart", pipeline=pipeline)
+        c = kokoro_tts.synthesize_chunk("Hello there.", voice="am_adam", pipeline=pipeline)
+        assert np.array_equal(a, b)
+        assert not np.array_equal(a, c)
+
+
+class TestServerWithStubs:
+    """Run the real servicer end to end on stub backends."""
+
+    @pytest.mark.asyncio
+    async def test_generate_audio_stream(self, stub_backends, grpc_server):
+        """Test the streaming RPC produces one PCM frame per chunk."""
+        from api.server import StoryServiceServicer
+
+        port = await grpc_server(StoryServiceServicer())
+        story = "A brave knight went on a quest to save the kingdom. " * 8
+        async with grpc.aio.insecure_channel(f"localhost:{port}") as channel:
+            stub = story2audio_pb2_grpc.StoryServiceStub(channel)
+            frames = [
+                frame async for frame in stub.GenerateAudioStream(story2audio_pb2.StoryRequest(story_text=story))
+            ]
+        assert frames and frames[-1].final
+        assert [f.index for f in frames] == list(range(frames[0].total_chunks))
+        assert all(len(f.audio) > 0 for f in frames)
@@ -0,0 +1,167 @@
+"""
+Tests for offline batch rendering.
+"""
+import json
+import pytest
+import soundfile as sf
+from config import Config
+from src import batch_processor
+from src.batch_processor import BatchStory, chunk_key, load_stories, main, output_name, run_batch
+
+STORY = "A brave knight went on a quest to save the kingdom. " * 6
+INTRO = "Once upon a time, in a land far away, there lived a wise old owl."
+
+
+def corpus():
+    return [
+        BatchStory("owl", INTRO),
+        BatchStory("knight", STORY),
+        BatchStory("series/knight-again", STORY),
+    ]
+
+
+class TestLoadStories:
+    """Test cases for reading a corpus."""
+
+    def test_jsonl(self, tmp_path):
+        """Test JSONL records are read with their ids, numbering lines without one."""
+        path = tmp_path / "stories.jsonl"
+        path.write_text(
+            json.dumps({"id": "owl", "text": INTRO}) + "\n\n" + json.dumps({"story_text": STORY}) + "\n",
+            encoding="utf-8"
+        )
+        stories = load_stories(str(path))
+        assert [(story.story_id, story.text) for story in stories] == [("owl", INTRO), ("3", STORY)]
+
+    def test_directory(self, tmp_path):
+        """Test .txt files in a directory tree are read with their relative paths as ids."""
+        (tmp_path / "series").mkdir()
+        (tmp_path / "owl.txt").write_text(INTRO, encoding="utf-8")
+        (tmp_path / "series" / "knight.txt").write_text(STORY, encoding="utf-8")
+        (tmp_path / "notes.md").write_text("ignored", encoding="utf-8")
+        assert [story.story_id for story in load_stories(str(tmp_path))] == ["owl", "series/knight"]
+
+    def test_duplicate_ids(self, tmp_path):
+        """Test repeated ids are rejected."""
+        path = tmp_path / "stories.jsonl"
+        path.write_text(json.dumps({"id": "a", "text": "x"}) + "\n" + json.dumps({"id": "a", "text": "y"}), encoding="utf-8")
+        with pytest.raises(ValueError, match="Duplicate"):
+            load_stories(str(path))
+
+
+class TestKeysAndNames:
+    """Test cases for chunk keys and output paths."""
+
+    def test_chunk_key_covers_enhancement_settings(self, monkeypatch):
+        """Test enhanced chunks are keyed by the enhancer model and generation parameters."""
+        enhanced, plain = chunk_key(INTRO, True), chunk_key(INTRO, False)
+        for name, value in (("ENHANCER_MODEL", "other/model"), ("ENHANCEMENT_TEMPERATURE", 0.1),
+                            ("ENHANCEMENT_TOP_P", 0.5), ("ENHANCEMENT_MAX_TOKENS", 7)):
+            with monkeypatch.context() as patch:
+                patch.setattr(Config, name, value)
+                assert chunk_key(INTRO, True) != enhanced
+                assert chunk_key(INTRO, False) == plain
+
+    def test_output_names_distinct(self):
+        """Test ids that sanitize to the same path get distinct names."""
+        names = [output_name(story_id, "wav") for story_id in ("x", "./x", "../x", "x/")]
+        assert names[0] == "x.wav"
+        assert len(set(names)) == 4
+        assert all(".." not in name and not name.startswith("/") for name in names)
+        assert output_name("series/knight", "wav") == "series/knight.wav"
+
+    def test_colliding_outputs_rejected(self, tmp_path):
+        """Test a corpus whose stories would overwrite each other's output is rejected."""
+        stories = [BatchStory("Owl", INTRO), BatchStory("owl", INTRO)]
+        with pytest.raises(ValueError, match="same file"):
+            run_batch(stories, str(tmp_path), workers=0, audio_format="wav")
+
+
+class TestRunBatch:
+    """Test cases for rendering a corpus on stub backends."""
+
+    def test_renders_and_dedupes(self, tmp_path, stub_backends):
+        """Test every story is written and identical chunks are synthesized once."""
+        finished = []
+        summary = run_batch(corpus(), str(tmp_path), workers=0, audio_format="wav", chunk_size=20, on_story=finished.append)
+
+        assert (summary["done"], summary["failed"]) == (3, 0)
+        assert summary["unique_chunks"] < summary["chunks"]
+        assert summary["rendered_chunks"] == summary["unique_chunks"]
+        assert sorted(entry["id"] for entry in finished) == ["knight", "owl", "series/knight-again"]
+
+        knight, rate = sf.read(tmp_path / "knight.wav")
+        again, _ = sf.read(tmp_path / "series" / "knight-again.wav")
+        assert rate == Config.SAMPLE_RATE
+        assert len(knight) == len(again) > 0
+
+    def test_chunks_match_server(self, tmp_path, stub_backends):
+        """Test stories are chunked from their raw text, like the server, keeping paragraph breaks."""
+        from src.preprocess import chunk_story
+        from src.validators import StoryValidator
+
+        raw = "Chapter One\n\nThe knight rode out at dawn."
+        story = BatchStory("chapter", raw)
+        run_batch([story], str(tmp_path), workers=0, audio_format="wav", enhance=False, chunk_size=4)
+
+        analysis = StoryValidator.analyze(raw)
+        served = chunk_story(analysis.source, chunk_size=4, max_tokens=Config.CHUNK_MAX_TOKENS, word_spans=analysis.word_spans)
+        assert served == ["Chapter One", "The knight rode out", "at dawn."]
+        assert story.chunk_keys == [chunk_key(chunk, False) for chunk in served]
+
+    def test_resume(self, tmp_path, stub_backends):
+        """Test a rerun skips finished stories and re-renders only what changed or is missing."""
+        run_batch(corpus(), str(tmp_path), workers=0, audio_format="wav", chunk_size=20)
+        (tmp_path / "owl.wav").unlink()
+
+        stories = corpus()
+        stories[1].text = STORY + " The end."
+        summary = run_batch(stories, str(tmp_path), workers=0, audio_format="wav", chunk_size=20)
+
+        assert (summary["skipped"], summary["done"]) == (1, 2)
+        # The owl's chunk is still stored; only the knight's new ending is synthesized
+        assert summary["rendered_chunks"] == 1
+        assert (tmp_path / "owl.wav").exists()
+
+    def test_failed_story(self, tmp_path, stub_backends):
+        """Test an empty story is recorded as failed without stopping the rest."""
+        stories = [BatchStory("empty", "   "), BatchStory("owl", INTRO)]
+        summary = run_batch(stories, str(tmp_path), workers=0, audio_format="wav")
+
+        assert (summary["done"], summary["failed"]) == (1, 1)
+        entries = [json.loads(line) for line in (tmp_path / "manifest.jsonl").read_text().splitlines()]
+        assert {entry["id"]: entry["status"] for entry in entries} == {"empty": "failed", "owl": "done"}
+
+    def test_failed_chunk_fails_its_stories(self, tmp_path, monkeypatch, stub_backends):
+        """Test a chunk that cannot be rendered fails every story using it, and only those."""
+        render_chunks = batch_processor._render_chunks
+
+        def flaky_render(chunks, chunk_dir, enhance):
+            if any("quest" in text for _, text in chunks):
+                raise RuntimeError("synthesis failed")
+            return render_chunks(chunks, chunk_dir, enhance)
+
+        monkeypatch.setattr(batch_processor, "_render_chunks", flaky_render)
+        summary = run_batch(corpus(), str(tmp_path), workers=0, batch_size=1, audio_format="wav", chunk_size=20)
+
+        assert (summary["done"], summary["failed"]) == (1, 2)
+        entries = [json.loads(line) for line in (tmp_path / "manifest.jsonl").read_text().splitlines()]
+        assert {entry["id"]: entry.get("error") for entry in entries} == {
+            "owl": None, "knight": "synthesis failed", "series/knight-again": "synthesis failed"
+        }
+
+    def test_worker_processes(self, tmp_path, stub_backends):
+        """Test rendering in spawned worker processes, which read their settings from the environment."""
+        summary = run_batch(corpus(), str(tmp_path), workers=2, audio_format="wav", chunk_size=20)
+        assert (summary["done"], summary["failed"]) == (3, 0)
+        assert (tmp_path / "series" / "knight-again.wav").stat().st_size > 44
+
+    def test_cli(self, tmp_path, stub_backends, capsys):
+        """Test the command line renders a directory and exits cleanly."""
+        source = tmp_path / "stories"
+        source.mkdir()
+        (source / "owl.txt").write_text(INTRO, encoding="utf-8")
+        exit_code = main([str(source), str(tmp_path / "out"), "--workers", "0", "--format", "wav", "--no-enhance"])
+        assert exit_code == 0
+        assert (tmp_path / "out" / "owl.wav").exists()
+        assert "1 rendered" in capsys.readouterr().out
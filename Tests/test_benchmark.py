@@ -0,0 +1,116 @@
+"""
+Tests for the load-test harness.
+"""
+import asyncio
+import grpc
+import pytest
+import story2audio_pb2
+import story2audio_pb2_grpc
+from scripts.benchmark import percentile, run_benchmark, summarize, RequestResult
+
+
+class SlowStoryService(story2audio_pb2_grpc.StoryServiceServicer):
+    """Answers after a short delay and tracks peak concurrency."""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    async def GenerateAudio(self, request, context):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        if request.story_text == "fail":
+            return story2audio_pb2.AudioResponse(status="error", message="bad story")
+        return story2audio_pb2.AudioResponse(status="success", audio_base64="abcd", message="ok")
+
+    async def GenerateAudioStream(self, request, context):
+        for index in range(3):
+            await asyncio.sleep(self.delay)
+            yield story2audio_pb2.AudioFrame(index=index, audio=b"xx", final=index == 2, total_chunks=3)
+
+
+async def start_server(service):
+    server = grpc.aio.server()
+    story2audio_pb2_grpc.add_StoryServiceServicer_to_server(service, server)
+    port = server.add_insecure_port("localhost:0")
+    await server.start()
+    return server, f"localhost:{port}"
+
+
+class TestStatistics:
+    """Test cases for percentile and summarize."""
+
+    def test_percentile_interpolates(self):
+        """Test percentiles interpolate between ranked values."""
+        values = [4, 1, 3, 2, 5]
+        assert percentile(values, 0) == 1
+        assert percentile(values, 50) == 3
+        assert percentile(values, 100) == 5
+        assert percentile(values, 90) == pytest.approx(4.6)
+
+    def test_summarize_counts_errors(self):
+        """Test error rate and throughput only count successful requests as served."""
+        results = [
+            RequestResult(0, 1.0, 0.5, True),
+            RequestResult(0, 2.0, 0.5, True),
+            RequestResult(0, 0.1, 0.1, False, error="boom"),
+        ]
+        summary = summarize(results, elapsed=2.0)
+        assert summary["error_rate"] == pytest.approx(1 / 3)
+        assert summary["throughput_rps"] == pytest.approx(1.0)
+        assert summary["latency_p50"] == pytest.approx(1.5)
+
+
+class TestRunBenchmark:
+    """Test cases for run_benchmark against an in-process server."""
+
+    @pytest.mark.asyncio
+    async def test_closed_loop_concurrency(self):
+        """Test each closed-loop level keeps that many requests in flight."""
+        service = SlowStoryService()
+        server, address = await start_server(service)
+        try:
+            results = await run_benchmark([address], mode="closed", levels=[1, 4], num_requests=8, warmup=0)
+        finally:
+            await server.stop(None)
+        assert [run["requests"] for run in results["runs"]] == [8, 8]
+        assert all(run["error_rate"] == 0 for run in results["runs"])
+        assert service.peak == 4
+
+    @pytest.mark.asyncio
+    async def test_errors_recorded(self):
+        """Test failed responses count towards the error rate."""
+        server, address = await start_server(SlowStoryService(delay=0))
+        try:
+            results = await run_benchmark(
+                [address], levels=[2], num_requests=4, stories=["ok story", "fail"], warmup=0
+            )
+        finally:
+            await server.stop(None)
+        run = results["runs"][0]
+        assert run["error_rate"] == pytest.approx(0.5)
+        assert run["errors"] == ["bad story"]
+
+    @pytest.mark.asyncio
+    async def test_stream_ttfb_before_latency(self):
+        """Test the streaming RPC reports first-byte time ahead of completion."""
+        server, address = await start_server(SlowStoryService())
+        try:
+            results = await run_benchmark([address], levels=[1], num_requests=2, rpc="stream", warmup=0)
+        finally:
+            await server.stop(None)
+        run = results["runs"][0]
+        assert run["ttfb_p50"] < run["latency_p50"]
+
+    @pytest.mark.asyncio
+    async def test_open_loop(self):
+        """Test open-loop mode issues requests at roughly the requested rate."""
+        server, address = await start_server(SlowStoryService(delay=0))
+        try:
+            results = await run_benchmark([address], mode="open", levels=[50], duration=0.5, warmup=0)
+        finally:
+            await server.stop(None)
+        assert 5 <= results["runs"][0]["requests"] <= 60
@@ -0,0 +1,110 @@
+"""
+Tests for caching utilities.
+"""
+import pytest
+from src.cache import ContentCache, SimpleCache, normalize_cache_text
+
+
+class TestSimpleCache:
+    """Test cases for SimpleCache."""
+
+    def test_set_get(self):
+        """Test values round-trip."""
+        cache = SimpleCache(ttl=60)
+        cache.set("k", "v")
+        assert cache.get("k") == "v"
+        assert cache.get("missing") is None
+
+
+class TestContentCache:
+    """Test cases for ContentCache."""
+
+    def test_key_depends_on_all_parts(self):
+        """Test different voices or rates give different addresses."""
+        a = ContentCache.make_key("tts", "hello", "af_heart", 24000)
+        b = ContentCache.make_key("tts", "hello", "af_bella", 24000)
+        c = ContentCache.make_key("tts", "hello", "af_heart", 22050)
+        assert len({a, b, c}) == 3
+        assert a == ContentCache.make_key("tts", "hello", "af_heart", 24000)
+
+    def test_normalize_cache_text(self):
+        """Test whitespace differences map to the same text."""
+        assert normalize_cache_text("  Hello \n  world ") == "Hello world"
+
+    def test_hits_and_misses(self):
+        """Test counters track lookups."""
+        cache = ContentCache()
+        assert cache.get("k") is None
+        cache.set("k", b"value")
+        assert cache.get("k") == b"value"
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == pytest.approx(0.5)
+
+    def test_memory_lru_eviction(self):
+        """Test the memory tier evicts least recently used entries by size."""
+        cache = ContentCache(max_memory_bytes=10)
+        cache.set("a", b"12345")
+        cache.set("b", b"12345")
+        cache.get("a")
+        cache.set("c", b"12345")
+        assert cache.get("a") == b"12345"
+        assert cache.get("b") is None
+        stats = cache.stats()
+        assert stats["memory_bytes"] <= 10
+        assert stats["memory_evictions"] == stats["evictions"] == 1
+
+    def test_persists_across_instances(self, tmp_path):
+        """Test entries written to disk are found by a new instance."""
+        ContentCache(directory=str(tmp_path)).set("k", b"audio")
+        cache = ContentCache(directory=str(tmp_path))
+        assert cache.get("k") == b"audio"
+        assert cache.stats()["disk_hits"] == 1
+
+    def test_disk_eviction(self, tmp_path):
+        """Test the disk tier stays within its size bound."""
+        cache = ContentCache(directory=str(tmp_path), max_memory_bytes=0, max_disk_bytes=10)
+        cache.set("a", b"123456")
+        cache.set("b", b"123456")
+        stats = cache.stats()
+        assert stats["disk_bytes"] <= 10
+        assert stats["evictions"] == 1
+        assert stats["memory_evictions"] == 0
+        assert cache.get("a") is None
+        assert cache.get("b") == b"123456"
+
+    def test_memory_eviction_with_disk_tier(self, tmp_path):
+        """Test entries evicted from memory are counted separately and still served from disk."""
+        cache = ContentCache(directory=str(tmp_path), max_memory_bytes=10)
+        cache.set("a", b"12345")
+        cache.set("b", b"123456")
+        stats = cache.stats()
+        assert (stats["memory_evictions"], stats["evictions"]) == (1, 0)
+        assert cache.get("a") == b"12345"
+        assert cache.stats()["disk_hits"] == 1
+
+    def test_counters_exported_as_gauges(self, monkeypatch):
+        """Test hit/miss counters of the shared caches appear in the metrics exposition by namespace."""
+        from config import Config
+        from src import cache as cache_module
+        from src.metrics import MetricsCollector
+
+        monkeypatch.setattr(Config, "ENABLE_CACHING", True)
+        monkeypatch.setattr(Config, "CACHE_DIR", "")
+        monkeypatch.setattr(cache_module, "_content_caches", {})
+        audio = cache_module.get_content_cache("audio")
+        audio.set("k", b"value")
+        audio.get("k")
+        audio.get("missing")
+
+        collector = MetricsCollector()
+        for counter in ("hits", "misses", "evictions"):
+            collector.register_gauge(
+                f"cache_{counter}", counter, lambda counter=counter: cache_module.content_cache_counter(counter),
+                label="cache"
+            )
+        text = collector.render_prometheus()
+        assert 'story2audio_cache_hits{cache="audio"} 1' in text
+        assert 'story2audio_cache_misses{cache="audio"} 1' in text
+        assert 'story2audio_cache_evictions{cache="audio"} 0' in text
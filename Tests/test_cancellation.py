@@ -0,0 +1,136 @@
+"""
+Tests for cancellation propagation.
+"""
+import asyncio
+import time
+import grpc
+import pytest
+import story2audio_pb2
+import story2audio_pb2_grpc
+from config import Config
+from src import admission, kokoro_tts
+from src.admission import AdmissionController
+from src.backends import StubEnhancer, StubTTSPipeline
+from src.cancellation import CancellationToken, RequestCancelled
+from src.metrics import metrics
+
+
+class CountingPipeline(StubTTSPipeline):
+    """Stub pipeline that counts the segments it has generated."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.segments = 0
+
+    def __call__(self, text, voice=None):
+        for segment in super().__call__(text, voice):
+            self.segments += 1
+            yield segment
+
+
+class TestCancellationToken:
+    """Test cases for the token."""
+
+    def test_cancel(self):
+        """Test cancelling sets the flag once and raises on check."""
+        token = CancellationToken()
+        token.raise_if_cancelled()
+        assert token.cancel("client disconnected")
+        assert not token.cancel()
+        with pytest.raises(RequestCancelled, match="client disconnected"):
+            token.raise_if_cancelled()
+
+    def test_deadline(self):
+        """Test the token expires on its own at the deadline."""
+        token = CancellationToken(time_remaining=0.02)
+        assert not token.cancelled
+        time.sleep(0.03)
+        assert token.cancelled
+        assert token.reason == "deadline exceeded"
+
+    def test_enhance_batch_stops_between_batches(self, monkeypatch):
+        """Test batched enhancement checks the token before each forward pass."""
+        monkeypatch.setattr(Config, "ENABLE_CACHING", False)
+        enhancer = StubEnhancer(ms_per_token=0)
+        token = CancellationToken()
+        assert enhancer.enhance_batch(["One.", "Two."], cancel=token) == ["One.", "Two."]
+
+        token.cancel()
+        with pytest.raises(RequestCancelled):
+            enhancer.enhance_batch(["One.", "Two."], cancel=token)
+
+
+class TestServerCancellation:
+    """Cancellation in the real servicer on stub backends."""
+
+    @pytest.mark.asyncio
+    async def test_client_cancel_stops_synthesis(self, stub_backends, grpc_server, monkeypatch):
+        """Test a stream cancelled after its first frame does not synthesize the remaining chunks."""
+        from api.server import StoryServiceServicer
+
+        pipeline = CountingPipeline(samples_per_char=8, ms_per_char=2)
+        monkeypatch.setattr(Config, "CHUNK_SIZE", 10)
+        monkeypatch.setattr(kokoro_tts, "_pipeline_instance", pipeline)
+        saved_before = metrics.get_stats()["cancelled_work_seconds_saved"]
+
+        port = await grpc_server(StoryServiceServicer())
+        story = "A brave knight went on a quest to save the kingdom. " * 20
+        async with grpc.aio.insecure_channel(f"localhost:{port}") as channel:
+            stub = story2audio_pb2_grpc.StoryServiceStub(channel)
+            call = stub.GenerateAudioStream(story2audio_pb2.StoryRequest(story_text=story))
+            first = await call.read()
+            call.cancel()
+            await asyncio.sleep(0.5)
+
+        assert first.total_chunks > 10
+        assert pipeline.segments < first.total_chunks
+        assert metrics.get_stats()["cancelled_work_seconds_saved"] > saved_before
+
+    @staticmethod
+    def _servicer(monkeypatch, ms_per_char):
+        import api.server
+        from api.server import StoryServiceServicer
+        from src.utils import to_pcm16
+
+        monkeypatch.setattr(Config, "TTS_BATCHING", False)
+        monkeypatch.setattr(Config, "TTS_PROCESS_WORKERS", 0)
+        monkeypatch.setattr(Config, "IN_MEMORY_AUDIO", True)
+        monkeypatch.setattr(Config, "CHUNK_SIZE", 5)
+        monkeypatch.setattr(kokoro_tts, "_pipeline_instance", CountingPipeline(samples_per_char=8, ms_per_char=ms_per_char))
+        monkeypatch.setattr(admission, "_controller", AdmissionController(cost_per_word=0.01))
+        monkeypatch.setattr(api.server, "encode_audio", lambda audio, **kw: to_pcm16(audio))
+        return StoryServiceServicer()
+
+    @staticmethod
+    def _cancelled_count():
+        return metrics.get_stats()["additional_stats"].get("requests_cancelled", 0)
+
+    @pytest.mark.asyncio
+    async def test_deadline_counts_as_cancelled(self, stub_backends, monkeypatch):
+        """Test a request whose deadline passes mid-render is recorded as cancelled."""
+        from src.validators import StoryValidator
+
+        servicer = self._servicer(monkeypatch, ms_per_char=20)
+        story = StoryValidator.analyze("A brave knight went on a quest to save the kingdom. " * 4)
+        before = self._cancelled_count()
+        with pytest.raises(RequestCancelled, match="deadline"):
+            await servicer._render_story(story, "deadline", time_remaining=0.5)
+        assert self._cancelled_count() == before + 1
+
+    @pytest.mark.asyncio
+    async def test_failure_not_counted_as_cancelled(self, stub_backends, monkeypatch):
+        """Test a request that fails on its own does not count as cancelled or saved work."""
+        from src.validators import StoryValidator
+
+        servicer = self._servicer(monkeypatch, ms_per_char=0)
+
+        async def broken(*args, **kwargs):
+            raise RuntimeError("pipeline broke")
+
+        monkeypatch.setattr(servicer, "_render_in_memory", broken)
+        story = StoryValidator.analyze("A brave knight went on a quest to save the kingdom.")
+        before, saved_before = self._cancelled_count(), metrics.get_stats()["cancelled_work_seconds_saved"]
+        with pytest.raises(RuntimeError):
+            await servicer._render_story(story, "broken", time_remaining=30)
+        assert self._cancelled_count() == before
+        assert metrics.get_stats()["cancelled_work_seconds_saved"] == saved_before
@@ -0,0 +1,74 @@
+"""
+Tests for sentence-aware chunking.
+"""
+import pytest
+from src.chunker import chunk_text, split_sentences
+
+
+def sentences(text):
+    return [text[start:end] for start, end in split_sentences(text)]
+
+
+class TestSplitSentences:
+    """Test cases for sentence segmentation."""
+
+    def test_basic(self):
+        """Test sentences end at terminal punctuation followed by a capital."""
+        assert sentences("It rained. Then it stopped!  Did it?") == ["It rained.", "Then it stopped!", "Did it?"]
+
+    def test_abbreviations_and_numbers(self):
+        """Test abbreviations, initials and decimals do not end a sentence."""
+        text = "Dr. Watson met J. R. Hartley at 3.15 on Jan. 5th. They talked."
+        assert sentences(text) == ["Dr. Watson met J. R. Hartley at 3.15 on Jan. 5th.", "They talked."]
+
+    def test_dialogue(self):
+        """Test closing quotes stay with their sentence and dialogue tags continue it."""
+        text = '"Stop!" she cried. "Why?" He shrugged.'
+        assert sentences(text) == ['"Stop!" she cried.', '"Why?"', "He shrugged."]
+
+    def test_ellipsis(self):
+        """Test an ellipsis ends a sentence only before a new one."""
+        assert sentences("Wait... and then. Silence... The end.") == ["Wait... and then.", "Silence...", "The end."]
+
+    def test_paragraphs(self):
+        """Test a blank line ends a sentence without punctuation."""
+        assert sentences("Chapter One\n\nIt began.\nIt went on.") == ["Chapter One", "It began.", "It went on."]
+
+
+class TestChunkText:
+    """Test cases for packing sentences into chunks."""
+
+    def test_offsets_map_to_source(self):
+        """Test chunk offsets cover the chunk's words in the original text."""
+        text = "  The fox ran.\n\n  The   dog  followed it home. " * 5
+        for chunk in chunk_text(text, max_words=8):
+            assert " ".join(text[chunk.start:chunk.end].split()) == chunk.text
+
+    def test_sentence_aligned(self):
+        """Test chunks end on sentence boundaries and respect both limits."""
+        text = "The knight rode out at dawn. He did not look back. " * 30
+        chunks = chunk_text(text, max_words=40, max_tokens=120)
+        assert len(chunks) > 1
+        assert all(chunk.text.endswith(".") for chunk in chunks)
+        assert all(chunk.word_count <= 40 and chunk.tokens <= 120 for chunk in chunks)
+        assert " ".join(chunk.text for chunk in chunks) == " ".join(text.split())
+
+    def test_long_sentence_split_at_clause(self):
+        """Test a sentence longer than a chunk is split, preferring clause breaks."""
+        text = "On and on it went, over hills and rivers, " * 10 + "until it stopped."
+        chunks = chunk_text(text, max_words=20)
+        assert all(chunk.word_count <= 20 for chunk in chunks)
+        assert all(chunk.text.endswith(",") for chunk in chunks[:-1])
+
+    def test_digest(self):
+        """Test identical chunk text has the same digest regardless of position."""
+        first, second = chunk_text("Hello there. Hello there.", max_words=2)
+        assert first.digest == second.digest
+        assert (first.start, second.start) == (0, 13)
+
+    def test_invalid_limits(self):
+        """Test non-positive limits are rejected."""
+        with pytest.raises(ValueError):
+            chunk_text("text", max_words=0)
+        with pytest.raises(ValueError):
+            chunk_text("text", max_tokens=0)
@@ -0,0 +1,28 @@
+"""
+Tests for per-stage executors.
+"""
+import pytest
+from config import Config
+from src.executors import get_executor, shutdown_executors
+
+
+class TestExecutors:
+    """Test cases for stage executors."""
+
+    def teardown_method(self):
+        shutdown_executors()
+
+    def test_one_executor_per_stage(self):
+        """Test each stage gets its own shared executor."""
+        assert get_executor("enhance") is get_executor("enhance")
+        assert get_executor("enhance") is not get_executor("tts")
+
+    def test_size_from_config(self, monkeypatch):
+        """Test executor size follows the configured stage limit."""
+        monkeypatch.setattr(Config, "TTS_WORKERS", 3)
+        assert get_executor("tts")._max_workers == 3
+
+    def test_unknown_stage(self):
+        """Test unknown stage names are rejected."""
+        with pytest.raises(ValueError):
+            get_executor("unknown")
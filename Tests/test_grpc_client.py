@@ -0,0 +1,136 @@
+"""
+Tests for the pooled gRPC client against in-process fake servers.
+"""
+import io
+import grpc
+import pytest
+import story2audio_pb2
+import story2audio_pb2_grpc
+from api.grpc_client import Story2AudioClient
+
+
+class FakeStoryService(story2audio_pb2_grpc.StoryServiceServicer):
+    """Echoes the story back as audio and records which peers called it."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.peers = set()
+
+    async def GenerateAudio(self, request, context):
+        self.calls += 1
+        self.peers.add(context.peer())
+        return story2audio_pb2.AudioResponse(
+            status="success",
+            audio_base64=f"{self.name}:{request.story_text}",
+            message="ok"
+        )
+
+    async def GenerateAudioChunked(self, request, context):
+        data = request.story_text.encode()
+        pieces = [data[i:i + 4] for i in range(0, len(data), 4)]
+        for sequence, piece in enumerate(pieces):
+            yield story2audio_pb2.AudioPiece(
+                sequence=sequence,
+                data=piece,
+                last=sequence == len(pieces) - 1,
+                total_size=len(data),
+                audio_format="mp3"
+            )
+
+
+async def start_server(name):
+    service = FakeStoryService(name)
+    server = grpc.aio.server()
+    story2audio_pb2_grpc.add_StoryServiceServicer_to_server(service, server)
+    port = server.add_insecure_port("localhost:0")
+    await server.start()
+    return server, service, f"localhost:{port}"
+
+
+class TestStory2AudioClient:
+    """Test cases for Story2AudioClient."""
+
+    @pytest.mark.asyncio
+    async def test_channel_reused_across_calls(self):
+        """Test repeated calls go over a single connection."""
+        server, service, address = await start_server("a")
+        try:
+            async with Story2AudioClient(addresses=[address]) as client:
+                for _ in range(3):
+                    audio, status, _ = await client.generate_audio("story")
+                    assert status == "success"
+                assert len(client._channels) == 1
+            assert service.calls == 3
+            assert len(service.peers) == 1
+            assert client._channels == []
+        finally:
+            await server.stop(None)
+
+    @pytest.mark.asyncio
+    async def test_round_robin_across_addresses(self):
+        """Test requests are spread over all server addresses."""
+        server_a, service_a, address_a = await start_server("a")
+        server_b, service_b, address_b = await start_server("b")
+        try:
+            async with Story2AudioClient(addresses=[address_a, address_b]) as client:
+                for _ in range(4):
+                    await client.generate_audio("story")
+            assert service_a.calls == 2
+            assert service_b.calls == 2
+        finally:
+            await server_a.stop(None)
+            await server_b.stop(None)
+
+    @pytest.mark.asyncio
+    async def test_generate_many_keeps_order(self):
+        """Test generate_many returns one result per story in input order."""
+        server, _, address = await start_server("a")
+        try:
+            async with Story2AudioClient(addresses=[address], channels_per_address=2) as client:
+                results = await client.generate_many([f"story {i}" for i in range(10)], concurrency=3)
+            assert [audio for audio, _, _ in results] == [f"a:story {i}" for i in range(10)]
+            assert all(status == "success" for _, status, _ in results)
+        finally:
+            await server.stop(None)
+
+    @pytest.mark.asyncio
+    async def test_download_audio_reassembles_pieces(self):
+        """Test chunked pieces are written back-to-back into the destination."""
+        server, _, address = await start_server("a")
+        try:
+            async with Story2AudioClient(addresses=[address]) as client:
+                buffer = io.BytesIO()
+                written = await client.download_audio("a brave knight", buffer)
+            assert written == len("a brave knight")
+            assert buffer.getvalue() == b"a brave knight"
+        finally:
+            await server.stop(None)
+
+    def test_invalid_channels_per_address(self):
+        """Test a pool without channels is rejected."""
+        with pytest.raises(ValueError):
+            Story2AudioClient(channels_per_address=0)
+
+    def test_default_client_per_loop(self):
+        """Test each loop gets its own default client and clients of closed loops are released."""
+        import asyncio
+        import gc
+        import weakref
+        from api import grpc_client
+
+        async def open_default():
+            client = grpc_client.get_default_client()
+            assert grpc_client.get_default_client() is client
+            client._stub()
+            return weakref.ref(client), weakref.ref(client._channels[0])
+
+        async def open_second():
+            await open_default()
+            gc.collect()
+            assert len(grpc_client._default_clients) == 1
+            await grpc_client.get_default_client().close()
+
+        first, channel = asyncio.run(open_default())
+        asyncio.run(open_second())
+        assert first() is None and channel() is None
@@ -0,0 +1,85 @@
+"""
+Tests for gRPC health checking and warm-up readiness.
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+import grpc
+import pytest
+from grpc_health.v1 import health_pb2, health_pb2_grpc
+from api.health import SERVICE_NAME, check_serving, create_health_servicer
+from src.tts_workers import TTSWorkerPool
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+async def health_status(address, service=SERVICE_NAME):
+    async with grpc.aio.insecure_channel(address) as channel:
+        response = await health_pb2_grpc.HealthStub(channel).Check(health_pb2.HealthCheckRequest(service=service))
+    return response.status
+
+
+class TestReadiness:
+    """Test cases for warm-up gated readiness."""
+
+    @pytest.mark.asyncio
+    async def test_serving_after_warm_up(self, stub_backends, grpc_server):
+        """Test health is NOT_SERVING until warm-up completes."""
+        from api.server import StoryServiceServicer, warm_up_and_serve
+
+        health_servicer = await create_health_servicer()
+        address = f"localhost:{await grpc_server(health=health_servicer)}"
+        assert await health_status(address) == health_pb2.HealthCheckResponse.NOT_SERVING
+        assert await health_status(address, "") == health_pb2.HealthCheckResponse.NOT_SERVING
+        await warm_up_and_serve(StoryServiceServicer(), health_servicer)
+        assert await health_status(address) == health_pb2.HealthCheckResponse.SERVING
+
+    @pytest.mark.asyncio
+    async def test_failed_warm_up_stays_not_serving(self, stub_backends, monkeypatch):
+        """Test a warm-up failure keeps the instance out of rotation."""
+        from api.server import StoryServiceServicer, warm_up_and_serve
+
+        async def broken_warm_up(self):
+            raise RuntimeError("model missing")
+
+        monkeypatch.setattr(StoryServiceServicer, "warm_up", broken_warm_up)
+        health_servicer = await create_health_servicer()
+        await warm_up_and_serve(StoryServiceServicer(), health_servicer)
+        response = await health_servicer.Check(health_pb2.HealthCheckRequest(service=SERVICE_NAME), None)
+        assert response.status == health_pb2.HealthCheckResponse.NOT_SERVING
+
+    def test_worker_pool_wait_ready(self, stub_backends):
+        """Test every worker process warms up before the pool reports ready."""
+        pool = TTSWorkerPool(workers=2)
+        pool.start()
+        try:
+            pool.wait_ready(timeout=60)
+            pool.wait_ready(timeout=1)
+            assert len(pool.synthesize("Hello there.")) > 0
+        finally:
+            pool.shutdown()
+
+    def test_server_process_becomes_ready(self, stub_backends, tmp_path):
+        """Test a real server process reports SERVING once warmed up."""
+        port = free_port()
+        env = {**os.environ, "GRPC_PORT": str(port), "METRICS_PORT": "0",
+               "OUTPUT_DIR": str(tmp_path), "WORKSPACE_DIR": str(tmp_path),
+               "JOB_DB_PATH": str(tmp_path / "jobs.db"), "JOB_AUDIO_DIR": str(tmp_path)}
+        process = subprocess.Popen([sys.executable, "-m", "api.server"], env=env,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            deadline = time.monotonic() + 60
+            while not check_serving(f"localhost:{port}", timeout=1):
+                assert process.poll() is None, "server exited"
+                assert time.monotonic() < deadline, "server never became ready"
+                time.sleep(0.5)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
@@ -0,0 +1,247 @@
+"""
+Tests for the asynchronous job API.
+"""
+import asyncio
+import sqlite3
+import grpc
+import pytest
+from config import Config
+from api.grpc_client import Story2AudioClient
+from src.admission import AdmissionRejected
+from src.jobs import JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JobManager, JobQueueFull, JobStore
+from src.utils import to_pcm16
+
+
+async def fake_render(story_text, job_id, progress):
+    """Render one 'chunk' per word, reporting progress."""
+    words = story_text.split()
+    progress.total = len(words)
+    progress.update(0)
+    for _ in words:
+        await asyncio.sleep(0)
+        progress.update()
+    return story_text.upper().encode("utf-8")
+
+
+async def wait_finished(manager, job_id):
+    async for job in manager.watch(job_id):
+        if job.finished:
+            return job
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    yield store
+    store.close()
+
+
+class TestJobStore:
+    """Test cases for durable job records."""
+
+    def test_persists_across_reopen(self, tmp_path):
+        """Test jobs survive closing and reopening the database."""
+        path = str(tmp_path / "jobs.db")
+        store = JobStore(path)
+        job = store.create("Once upon a time.")
+        store.update(job.job_id, state=JOB_RUNNING, current=1, total=3)
+        store.close()
+
+        reopened = JobStore(path)
+        loaded = reopened.get(job.job_id)
+        assert (loaded.story_text, loaded.state, loaded.current, loaded.total) == ("Once upon a time.", JOB_RUNNING, 1, 3)
+        assert reopened.requeue_unfinished() == [job.job_id]
+        assert reopened.get(job.job_id).state == JOB_QUEUED
+        reopened.close()
+
+    def test_unknown_job(self, store):
+        """Test looking up a missing job returns None."""
+        assert store.get("missing") is None
+
+
+class TestJobManager:
+    """Test cases for job processing."""
+
+    @pytest.mark.asyncio
+    async def test_submit_and_watch(self, store, tmp_path):
+        """Test a submitted job reports progress and its audio can be read back."""
+        manager = JobManager(store, fake_render, audio_dir=str(tmp_path / "audio"))
+        await manager.start()
+        try:
+            job = await manager.submit("the quick brown fox")
+            assert job.state == JOB_QUEUED
+            updates = [update async for update in manager.watch(job.job_id)]
+        finally:
+            await manager.stop()
+
+        assert updates[-1].state == JOB_SUCCEEDED
+        assert (updates[-1].current, updates[-1].total) == (4, 4)
+        assert updates[-1].audio_size == len(b"THE QUICK BROWN FOX")
+        assert manager.read_audio(job.job_id) == b"THE QUICK BROWN FOX"
+
+    @pytest.mark.asyncio
+    async def test_failed_job(self, store, tmp_path):
+        """Test a render error marks the job failed with its message."""
+        async def broken_render(story_text, job_id, progress):
+            raise RuntimeError("No audio was generated")
+
+        manager = JobManager(store, broken_render, audio_dir=str(tmp_path))
+        await manager.start()
+        try:
+            job = await wait_finished(manager, (await manager.submit("A story.")).job_id)
+        finally:
+            await manager.stop()
+        assert job.state == JOB_FAILED
+        assert job.message == "No audio was generated"
+        with pytest.raises(ValueError):
+            manager.read_audio(job.job_id)
+
+    @pytest.mark.asyncio
+    async def test_store_failure_fails_job_and_keeps_worker(self, store, tmp_path, monkeypatch):
+        """Test a database error during a job's bookkeeping fails that job and the worker moves on."""
+        update = store.update
+
+        def locked_once(job_id, durable=False, **values):
+            if values.get("state") == JOB_RUNNING and job_id == broken.job_id:
+                raise sqlite3.OperationalError("database is locked")
+            update(job_id, durable=durable, **values)
+
+        broken, healthy = store.create("first story"), store.create("second story")
+        monkeypatch.setattr(store, "update", locked_once)
+        manager = JobManager(store, fake_render, audio_dir=str(tmp_path), workers=1)
+        await manager.start()
+        try:
+            # Without recovery the only worker dies and neither job finishes
+            finished = [await asyncio.wait_for(wait_finished(manager, job.job_id), 10) for job in (broken, healthy)]
+            assert manager._live == {}
+        finally:
+            await manager.stop()
+        assert [job.state for job in finished] == [JOB_FAILED, JOB_SUCCEEDED]
+        assert "database is locked" in finished[0].message
+
+    @pytest.mark.asyncio
+    async def test_busy_server_retries(self, store, tmp_path):
+        """Test a job the server is too busy to admit is retried instead of failed."""
+        attempts = []
+
+        async def busy_once(story_text, job_id, progress):
+            attempts.append(job_id)
+            if len(attempts) == 1:
+                raise AdmissionRejected("busy", "overloaded")
+            return await fake_render(story_text, job_id, progress)
+
+        manager = JobManager(store, busy_once, audio_dir=str(tmp_path), retry_delay=0.01)
+        await manager.start()
+        try:
+            job = await wait_finished(manager, (await manager.submit("A story.")).job_id)
+        finally:
+            await manager.stop()
+        assert job.state == JOB_SUCCEEDED
+        assert len(attempts) == 2
+
+    @pytest.mark.asyncio
+    async def test_interrupted_jobs_resume(self, store, tmp_path):
+        """Test jobs left queued or running by a previous process are processed on start."""
+        interrupted = store.create("left running")
+        store.update(interrupted.job_id, state=JOB_RUNNING, current=1, total=2)
+        waiting = store.create("left queued")
+
+        manager = JobManager(store, fake_render, audio_dir=str(tmp_path))
+        await manager.start()
+        try:
+            finished = [await wait_finished(manager, job.job_id) for job in (interrupted, waiting)]
+        finally:
+            await manager.stop()
+        assert [job.state for job in finished] == [JOB_SUCCEEDED, JOB_SUCCEEDED]
+
+    @pytest.mark.asyncio
+    async def test_queue_full(self, store, tmp_path):
+        """Test submissions are rejected once max_queued jobs are waiting."""
+        manager = JobManager(store, fake_render, audio_dir=str(tmp_path), max_queued=1)
+        await manager.start()
+        await manager.stop()
+        await manager.submit("first")
+        with pytest.raises(JobQueueFull):
+            await manager.submit("second")
+
+    @pytest.mark.asyncio
+    async def test_retention(self, store, tmp_path):
+        """Test finished jobs and their audio are deleted after the retention period."""
+        manager = JobManager(store, fake_render, audio_dir=str(tmp_path), retention=3600)
+        await manager.start()
+        try:
+            job = await wait_finished(manager, (await manager.submit("short story")).job_id)
+        finally:
+            await manager.stop()
+        assert await manager.cleanup_expired() == 0
+
+        manager.retention = -1
+        assert await manager.cleanup_expired() == 1
+        assert store.get(job.job_id) is None
+        assert not (tmp_path / f"{job.job_id}.mp3").exists()
+
+    @pytest.mark.asyncio
+    async def test_progress_writes_coalesced(self, store, tmp_path, monkeypatch):
+        """Test watchers see every progress tick while the database gets at most one write per interval."""
+        writes = []
+        update = store.update
+
+        def counting_update(job_id, durable=False, **values):
+            writes.append((durable, values))
+            update(job_id, durable=durable, **values)
+
+        monkeypatch.setattr(store, "update", counting_update)
+        manager = JobManager(store, fake_render, audio_dir=str(tmp_path), progress_interval=60)
+        await manager.start()
+        try:
+            job = await manager.submit("one two three four five six seven eight")
+            currents = [update.current async for update in manager.watch(job.job_id)]
+        finally:
+            await manager.stop()
+        assert currents[-1] == 8 and len(set(currents)) > 2
+        # Running, then the final state; no progress write inside the interval
+        assert [durable for durable, _ in writes] == [False, True]
+        assert writes[-1][1]["current"] == 8
+        assert store.get(job.job_id).state == JOB_SUCCEEDED
+
+
+class TestServerJobs:
+    """Job RPCs of the real servicer on stub backends."""
+
+    @pytest.mark.asyncio
+    async def test_submit_watch_fetch(self, store, tmp_path, stub_backends, grpc_server, monkeypatch):
+        """Test a story submitted as a job can be watched to completion and downloaded."""
+        import api.server
+        from api.server import StoryServiceServicer
+
+        monkeypatch.setattr(Config, "IN_MEMORY_AUDIO", True)
+        monkeypatch.setattr(Config, "CHUNK_SIZE", 20)
+        monkeypatch.setattr(Config, "RESPONSE_CHUNK_BYTES", 1024)
+        # No ffmpeg in the test environment: "encode" to raw PCM
+        monkeypatch.setattr(api.server, "encode_audio", lambda audio, **kwargs: to_pcm16(audio))
+
+        servicer = StoryServiceServicer()
+        jobs = JobManager(store, servicer._render_job, audio_dir=str(tmp_path / "audio"))
+        servicer.jobs = jobs
+        port = await grpc_server(servicer)
+        await jobs.start()
+        try:
+            story = "A brave knight went on a quest to save the kingdom. " * 8
+            async with Story2AudioClient("localhost", port) as client:
+                submitted = await client.submit_story(story)
+                updates = [status async for status in client.watch_job(submitted.job_id)]
+                final = await client.get_job_status(submitted.job_id)
+                destination = tmp_path / "story.pcm"
+                written = await client.download_job_audio(submitted.job_id, str(destination))
+
+                with pytest.raises(grpc.aio.AioRpcError) as exc_info:
+                    await client.get_job_status("missing")
+        finally:
+            await jobs.stop()
+
+        assert submitted.state == JOB_QUEUED and submitted.job_id
+        assert updates[-1].state == JOB_SUCCEEDED
+        assert final.progress_current == final.progress_total > 1
+        assert final.audio_format == "mp3"
+        assert written == final.audio_size == destination.stat().st_size > 1024
+        assert exc_info.value.code() == grpc.StatusCode.NOT_FOUND
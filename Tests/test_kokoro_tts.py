@@ -0,0 +1,94 @@
+"""
+Tests for the TTS module using a fake Kokoro pipeline.
+"""
+import numpy as np
+import pytest
+import soundfile as sf
+from config import Config
+from src import cache, kokoro_tts
+from src.cancellation import CancellationToken, RequestCancelled
+from src.kokoro_tts import synthesize_chunk, text_to_coqui_audio
+
+
+class FakePipeline:
+    """Mimics KPipeline by yielding several (graphemes, phonemes, audio) segments per call."""
+
+    def __init__(self, segment_lengths):
+        self.segment_lengths = segment_lengths
+        self.yielded = 0
+
+    def __call__(self, text, voice=None):
+        for n in self.segment_lengths:
+            self.yielded += n
+            yield text, "", np.full(n, 0.1, dtype=np.float32)
+
+
+class TestKokoroTTS:
+    """Test cases for chunk synthesis."""
+
+    def test_synthesize_chunk_keeps_all_segments(self):
+        """Test every generator segment ends up in the chunk waveform."""
+        pipeline = FakePipeline([100, 250, 75])
+        audio = synthesize_chunk("Some text.", pipeline=pipeline)
+        assert audio.dtype == np.float32
+        assert len(audio) == pipeline.yielded == 425
+
+    def test_synthesize_chunk_no_audio(self):
+        """Test a pipeline yielding nothing produces an empty waveform."""
+        audio = synthesize_chunk("Some text.", pipeline=FakePipeline([]))
+        assert len(audio) == 0
+
+    def test_synthesize_chunk_empty_text(self):
+        """Test empty text is rejected."""
+        with pytest.raises(ValueError):
+            synthesize_chunk("   ", pipeline=FakePipeline([10]))
+
+    def test_text_to_coqui_audio_writes_all_samples(self, tmp_path, monkeypatch):
+        """Test chunk files contain the samples of every segment, not just the last."""
+        pipeline = FakePipeline([300, 200])
+        monkeypatch.setattr(kokoro_tts, "_pipeline_instance", pipeline)
+
+        files = text_to_coqui_audio(["First chunk.", "Second chunk."], output_dir=str(tmp_path))
+
+        assert len(files) == 2
+        written = sum(len(sf.read(path)[0]) for path in files)
+        assert written == pipeline.yielded == 1000
+
+    def test_synthesize_chunk_uses_audio_cache(self, tmp_path, monkeypatch):
+        """Test repeated text is served from the content cache."""
+        monkeypatch.setattr(Config, "ENABLE_CACHING", True)
+        monkeypatch.setattr(Config, "CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(cache, "_content_caches", {})
+
+        pipeline = FakePipeline([100, 50])
+        first = synthesize_chunk("Repeated  intro.", pipeline=pipeline)
+        second = synthesize_chunk("Repeated intro.", pipeline=pipeline)
+
+        assert pipeline.yielded == 150
+        np.testing.assert_array_equal(first, second)
+        assert cache.get_content_cache("audio").stats()["hits"] == 1
+
+    def test_synthesize_chunk_stops_between_segments(self):
+        """Test a cancelled token stops Kokoro after the current segment."""
+        token = CancellationToken()
+        pipeline = FakePipeline([100, 100, 100])
+
+        def cancelling_pipeline(text, voice=None):
+            for segment in pipeline(text, voice):
+                token.cancel()
+                yield segment
+
+        with pytest.raises(RequestCancelled):
+            synthesize_chunk("Some text.", pipeline=cancelling_pipeline, cancel=token)
+        assert pipeline.yielded == 100
+
+    def test_text_to_coqui_audio_propagates_cancellation(self, tmp_path, monkeypatch):
+        """Test cancellation is not swallowed by the per-chunk error handling."""
+        pipeline = FakePipeline([100])
+        monkeypatch.setattr(kokoro_tts, "_pipeline_instance", pipeline)
+        token = CancellationToken()
+        token.cancel()
+
+        with pytest.raises(RequestCancelled):
+            text_to_coqui_audio(["First chunk.", "Second chunk."], output_dir=str(tmp_path), cancel=token)
+        assert pipeline.yielded == 0
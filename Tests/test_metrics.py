@@ -0,0 +1,166 @@
+"""
+Tests for metrics collection and Prometheus exposition.
+"""
+import threading
+import urllib.request
+import pytest
+from src.metrics import Histogram, MetricsCollector, QuantileSketch, parse_buckets, start_metrics_server
+
+
+class TestHistogram:
+    """Test cases for Histogram."""
+
+    def test_cumulative_buckets(self):
+        """Test bucket counts are cumulative and overflow lands in +Inf."""
+        histogram = Histogram([0.1, 1.0])
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        counts, total, count = histogram.snapshot()
+        assert counts == [2, 3, 4]
+        assert total == pytest.approx(3.65)
+        assert count == 4
+
+    def test_parse_buckets(self):
+        """Test bucket bounds parse from a comma-separated string."""
+        assert parse_buckets("0.5, 1,2") == (0.5, 1.0, 2.0)
+        assert len(parse_buckets("")) > 0
+
+
+class TestMetricsCollector:
+    """Test cases for stage timing and exposition."""
+
+    def test_time_stage(self):
+        """Test a timed block is recorded under its stage."""
+        collector = MetricsCollector(buckets=[1.0])
+        with collector.time_stage("enhance"):
+            pass
+        with pytest.raises(RuntimeError):
+            with collector.time_stage("enhance"):
+                raise RuntimeError("still timed")
+        assert collector.get_stats()["stage_times"]["enhance"]["count"] == 2
+
+    def test_in_flight(self):
+        """Test in-flight requests drop when a request ends."""
+        collector = MetricsCollector()
+        collector.start_request("a")
+        collector.start_request("b")
+        collector.end_request("a")
+        assert collector.in_flight == 1
+        collector.end_request("b", status="error", error="boom")
+        assert collector.in_flight == 0
+
+    def test_render_prometheus(self):
+        """Test the exposition contains histograms, counters and gauges."""
+        collector = MetricsCollector(buckets=[0.5])
+        collector.observe_stage("synthesize", 0.2)
+        collector.start_request("a")
+        collector.end_request("a")
+        collector.register_gauge("stage_queue_depth", "Waiting tasks", lambda: {"tts": 3})
+        collector.register_gauge("broken", "Fails", lambda: 1 / 0)
+        text = collector.render_prometheus()
+        assert '# TYPE story2audio_stage_duration_seconds histogram' in text
+        assert 'story2audio_stage_duration_seconds_bucket{stage="synthesize",le="0.5"} 1' in text
+        assert 'story2audio_stage_duration_seconds_bucket{stage="synthesize",le="+Inf"} 1' in text
+        assert 'story2audio_stage_duration_seconds_count{stage="synthesize"} 1' in text
+        assert 'story2audio_requests_total{status="success"} 1' in text
+        assert 'story2audio_stage_queue_depth{stage="tts"} 3' in text
+        assert "story2audio_broken" not in text
+
+    def test_metrics_endpoint(self):
+        """Test /metrics serves the text exposition over HTTP."""
+        collector = MetricsCollector()
+        collector.observe_stage("encode", 0.01)
+        server = start_metrics_server(0, collector=collector, host="127.0.0.1")
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                body = response.read().decode("utf-8")
+                assert response.headers["Content-Type"].startswith("text/plain")
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert 'stage="encode"' in body
+
+
+class TestQuantileSketch:
+    """Test cases for QuantileSketch."""
+
+    def test_relative_accuracy(self):
+        """Test quantiles stay within the configured relative error."""
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        values = [i / 1000 for i in range(1, 10001)]
+        for value in values:
+            sketch.add(value)
+        for q, expected in ((0.5, 5.0), (0.95, 9.5), (0.99, 9.9)):
+            assert sketch.quantile(q) == pytest.approx(expected, rel=0.02)
+
+    def test_empty_and_zero(self):
+        """Test an empty sketch reports 0 and tiny values count as zero."""
+        sketch = QuantileSketch()
+        assert sketch.quantile(0.5) == 0.0
+        sketch.add(0.0)
+        assert sketch.quantile(0.5) == 0.0
+
+
+class TestBoundedCollector:
+    """Test cases for fixed-memory, thread-safe request tracking."""
+
+    def test_finished_requests_are_bounded(self):
+        """Test only in-flight and the most recent finished requests are kept."""
+        collector = MetricsCollector(recent_size=5)
+        for i in range(50):
+            collector.start_request(str(i))
+            collector.end_request(str(i))
+        assert len(collector._requests) == 0
+        assert [m.request_id for m in collector.recent_requests()] == [str(i) for i in range(45, 50)]
+        assert collector.get_stats()["total_requests"] == 50
+
+    def test_concurrent_updates(self):
+        """Test counters stay consistent under concurrent threads."""
+        collector = MetricsCollector(recent_size=10)
+
+        def worker(n):
+            for i in range(200):
+                request_id = f"{n}-{i}"
+                collector.start_request(request_id)
+                collector.observe_stage("synthesize", 0.01)
+                collector.end_request(request_id, status="success" if i % 2 else "error")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        stats = collector.get_stats()
+        assert stats["total_requests"] == 1600
+        assert stats["successful_requests"] + stats["failed_requests"] == 1600
+        assert stats["in_flight_requests"] == 0
+        assert stats["stage_times"]["synthesize"]["count"] == 1600
+        assert set(stats["latency_percentiles"]) == {"p50", "p95", "p99"}
+
+    def test_observe_during_reset(self):
+        """Test recording stages while another thread resets and scrapes never fails."""
+        collector = MetricsCollector()
+        errors = []
+        done = threading.Event()
+
+        def observe():
+            try:
+                while not done.is_set():
+                    for stage in ("enhance", "synthesize", "encode"):
+                        collector.observe_stage(stage, 0.01)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=observe) for _ in range(4)]
+        for t in threads:
+            t.start()
+        try:
+            for _ in range(200):
+                collector.reset()
+                collector.render_prometheus()
+        finally:
+            done.set()
+            for t in threads:
+                t.join()
+        assert errors == []
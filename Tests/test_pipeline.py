@@ -0,0 +1,89 @@
+"""
+Tests for the staged processing pipeline.
+"""
+import threading
+import time
+import pytest
+from src.pipeline import Stage, run_pipeline
+
+
+async def collect(items, stages, queue_size=2):
+    return [result async for result in run_pipeline(items, stages, queue_size=queue_size)]
+
+
+class TestPipeline:
+    """Test cases for run_pipeline."""
+
+    @pytest.mark.asyncio
+    async def test_results_in_order(self):
+        """Test results come out in input order through all stages."""
+        stages = [
+            Stage("double", lambda i, x: x * 2),
+            Stage("label", lambda i, x: f"{i}:{x}"),
+        ]
+        results = await collect([1, 2, 3, 4], stages)
+        assert results == ["0:2", "1:4", "2:6", "3:8"]
+
+    @pytest.mark.asyncio
+    async def test_stages_overlap(self):
+        """Test different items are processed by different stages concurrently."""
+        active = set()
+        overlapped = threading.Event()
+        lock = threading.Lock()
+
+        def work(name):
+            def fn(i, x):
+                with lock:
+                    active.add(name)
+                    if len(active) > 1:
+                        overlapped.set()
+                time.sleep(0.05)
+                with lock:
+                    active.discard(name)
+                return x
+            return fn
+
+        stages = [Stage("a", work("a")), Stage("b", work("b"))]
+        results = await collect(range(4), stages)
+        assert results == [0, 1, 2, 3]
+        assert overlapped.is_set()
+
+    @pytest.mark.asyncio
+    async def test_stage_error_propagates(self):
+        """Test an exception in a stage is raised to the consumer."""
+        def fail_on_two(i, x):
+            if x == 2:
+                raise RuntimeError("boom")
+            return x
+
+        with pytest.raises(RuntimeError, match="boom"):
+            await collect([1, 2, 3], [Stage("fail", fail_on_two)])
+
+    @pytest.mark.asyncio
+    async def test_batch_stage(self):
+        """Test a batch stage receives several waiting items at once."""
+        batches = []
+
+        def upper_batch(indices, items):
+            batches.append(list(indices))
+            return [item.upper() for item in items]
+
+        stages = [Stage("upper", upper_batch, batch_size=3)]
+        results = await collect(["a", "b", "c", "d"], stages, queue_size=1)
+        assert results == ["A", "B", "C", "D"]
+        assert all(len(batch) <= 3 for batch in batches)
+        assert sorted(i for batch in batches for i in batch) == [0, 1, 2, 3]
+        assert any(len(batch) > 1 for batch in batches)
+
+    @pytest.mark.asyncio
+    async def test_batch_stage_wrong_result_count(self):
+        """Test a batch stage returning the wrong number of results fails."""
+        stages = [Stage("bad", lambda indices, items: items[:1], batch_size=4)]
+        with pytest.raises(RuntimeError):
+            await collect(["a", "b"], stages)
+
+    @pytest.mark.asyncio
+    async def test_no_stages(self):
+        """Test a pipeline without stages is rejected."""
+        with pytest.raises(ValueError):
+            await collect([1], [])
@@ -37,3 +37,10 @@ class TestPreprocessing:
         chunks = chunk_story(text, chunk_size=20)
         # Most chunks should end with sentence punctuation
         assert any(chunk.endswith(('.', '!', '?')) for chunk in chunks)
+    
+    def test_chunk_story_token_budget(self):
+        """Test the token budget keeps chunks short enough for one TTS pass."""
+        text = "The knight rode out at dawn. He did not look back. " * 30
+        chunks = chunk_story(text, chunk_size=150, max_tokens=200)
+        assert all(len(chunk) <= 200 for chunk in chunks)
+        assert all(chunk.endswith('.') for chunk in chunks)
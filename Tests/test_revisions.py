@@ -0,0 +1,116 @@
+"""
+Tests for edit-aware re-rendering.
+"""
+import numpy as np
+import pytest
+from config import Config
+from api.grpc_client import Story2AudioClient
+from src import kokoro_tts, revisions
+from src.backends import StubTTSPipeline
+from src.chunker import chunk_text
+from src.revisions import RevisionStore
+from src.utils import to_pcm16
+
+
+def make_story(sentences=120):
+    return " ".join(
+        f"The {i}th traveller told a {'very ' * (i % 7)}long tale." for i in range(sentences)
+    )
+
+
+def edit(story):
+    """Change one word in the middle of the story."""
+    return story.replace("The 60th traveller told", "The 60th traveller sang", 1)
+
+
+class CountingPipeline(StubTTSPipeline):
+    """Stub pipeline that records the text of every call."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.texts = []
+
+    def __call__(self, text, voice=None):
+        self.texts.append(text)
+        yield from super().__call__(text, voice)
+
+
+class TestChunkReuse:
+    """Test cases for chunking against a previous version."""
+
+    def test_edit_changes_one_chunk(self):
+        """Test a one-word edit keeps every other chunk of the previous version."""
+        story = make_story()
+        before = [chunk.text for chunk in chunk_text(story, max_words=60, max_tokens=300)]
+        after = [chunk.text for chunk in chunk_text(edit(story), max_words=60, max_tokens=300, previous=before)]
+
+        assert len(before) > 5
+        assert len(set(after) - set(before)) == 1
+        assert " ".join(after) == " ".join(edit(story).split())
+
+    def test_previous_ignored_when_absent(self):
+        """Test previous chunks that no longer occur do not affect chunking."""
+        story = make_story(20)
+        assert chunk_text(story, max_words=30, previous=["Nothing like this."]) == chunk_text(story, max_words=30)
+
+
+class TestRevisionStore:
+    """Test cases for stored layouts and chunk audio."""
+
+    def test_plan_and_commit(self):
+        """Test only chunks changed since the committed version need rendering."""
+        store = RevisionStore()
+        story = make_story()
+        first = store.plan("tales", story, max_words=60, max_tokens=300)
+        assert first.changed == list(range(len(first.chunks)))
+        store.commit(first, [np.full(10, i, dtype=np.float32) for i in range(len(first.chunks))])
+
+        second = store.plan("tales", edit(story), max_words=60, max_tokens=300)
+        assert len(second.changed) == 1
+        assert second.changed_words == second.chunks[second.changed[0]].word_count
+        reused = [audio for audio in second.audio if audio is not None]
+        assert len(reused) == len(first.chunks) - 1
+
+        # Layouts are per story id
+        assert store.plan("other", story, max_words=60, max_tokens=300).changed == []
+        assert store.layout("other") == []
+
+    def test_audio_key_covers_enhancement_settings(self, monkeypatch):
+        """Test stored chunk audio is keyed by the enhancer's generation parameters."""
+        text = "The 1th traveller told a very long tale."
+        key = RevisionStore.audio_key(text)
+        for name, value in (("ENHANCER_MODEL", "other/model"), ("ENHANCEMENT_TEMPERATURE", 0.1),
+                            ("ENHANCEMENT_TOP_P", 0.5), ("ENHANCEMENT_MAX_TOKENS", 7)):
+            with monkeypatch.context() as patch:
+                patch.setattr(Config, name, value)
+                assert RevisionStore.audio_key(text) != key
+        assert key == RevisionStore.audio_key("The 1th traveller  told a very long tale.")
+
+
+class TestServerRevisions:
+    """Edit-aware rendering in the real servicer on stub backends."""
+
+    @pytest.mark.asyncio
+    async def test_resubmitted_story_renders_changed_chunk(self, stub_backends, grpc_server, monkeypatch):
+        """Test resubmitting an edited story synthesizes only the edited chunk."""
+        import api.server
+        from api.server import StoryServiceServicer
+
+        pipeline = CountingPipeline(samples_per_char=8, ms_per_char=0)
+        monkeypatch.setattr(Config, "CHUNK_SIZE", 60)
+        monkeypatch.setattr(Config, "CHUNK_MAX_TOKENS", 300)
+        monkeypatch.setattr(kokoro_tts, "_pipeline_instance", pipeline)
+        monkeypatch.setattr(revisions, "_store", RevisionStore())
+        monkeypatch.setattr(api.server, "encode_audio", lambda audio, **kwargs: to_pcm16(audio))
+
+        port = await grpc_server(StoryServiceServicer())
+        story = make_story()
+        async with Story2AudioClient("localhost", port) as client:
+            first = await client.fetch_audio_bytes(story, story_id="tales")
+            first_calls = len(pipeline.texts)
+            second = await client.fetch_audio_bytes(edit(story), story_id="tales")
+
+        assert first_calls > 5
+        resynthesized = pipeline.texts[first_calls:]
+        assert len(resynthesized) == 1 and "sang" in resynthesized[0]
+        assert abs(len(second) - len(first)) < 0.05 * len(first)
@@ -0,0 +1,180 @@
+"""
+Tests for the cross-request batching scheduler.
+"""
+import threading
+import time
+import pytest
+from src.cancellation import CancellationToken, RequestCancelled
+from src.scheduler import BatchScheduler
+
+
+class TestBatchScheduler:
+    """Test cases for BatchScheduler."""
+
+    def test_results_routed_to_callers(self):
+        """Test each future gets the result of its own item."""
+        scheduler = BatchScheduler(lambda items: [x * 10 for x in items], max_batch_size=4, max_wait_ms=20)
+        scheduler.start()
+        try:
+            futures = [scheduler.submit(f"req-{i % 2}", i) for i in range(6)]
+            assert [f.result(timeout=2) for f in futures] == [0, 10, 20, 30, 40, 50]
+        finally:
+            scheduler.stop()
+
+    def test_batches_respect_max_size(self):
+        """Test items are grouped but never beyond max_batch_size."""
+        sizes = []
+        gate = threading.Event()
+
+        def batch_fn(items):
+            gate.wait(2)
+            sizes.append(len(items))
+            return items
+
+        scheduler = BatchScheduler(batch_fn, max_batch_size=3, max_wait_ms=50)
+        scheduler.start()
+        try:
+            futures = [scheduler.submit("req", i) for i in range(7)]
+            gate.set()
+            for f in futures:
+                f.result(timeout=2)
+        finally:
+            scheduler.stop()
+        assert max(sizes) <= 3
+        assert sum(sizes) == 7
+        assert scheduler.stats()["batches"] == len(sizes)
+
+    def test_round_robin_fairness(self):
+        """Test a request with many items cannot starve a short one."""
+        order = []
+        gate = threading.Event()
+
+        def batch_fn(items):
+            gate.wait(2)
+            order.extend(items)
+            return items
+
+        scheduler = BatchScheduler(batch_fn, max_batch_size=2, max_wait_ms=50)
+        scheduler.start()
+        try:
+            # Occupy the worker so the rest queues up behind it
+            first = scheduler.submit("big", "big-0")
+            while scheduler.pending:
+                pass
+            futures = [scheduler.submit("big", f"big-{i}") for i in range(1, 6)]
+            futures.append(scheduler.submit("small", "small-0"))
+            gate.set()
+            for f in [first] + futures:
+                f.result(timeout=2)
+        finally:
+            scheduler.stop()
+        # The short request is served in the first batch after the blocked one
+        assert order.index("small-0") <= 2
+
+    def test_per_item_failure(self):
+        """Test an exception result fails only its own item."""
+        def batch_fn(items):
+            return [ValueError("bad") if x < 0 else x for x in items]
+
+        scheduler = BatchScheduler(batch_fn, max_batch_size=4, max_wait_ms=20)
+        scheduler.start()
+        try:
+            ok = scheduler.submit("req", 1)
+            bad = scheduler.submit("req", -1)
+            assert ok.result(timeout=2) == 1
+            with pytest.raises(ValueError):
+                bad.result(timeout=2)
+        finally:
+            scheduler.stop()
+
+    def test_cancelled_items_dropped(self):
+        """Test items of a request cancelled while they wait never reach batch_fn."""
+        seen = []
+        gate = threading.Event()
+
+        def batch_fn(items):
+            gate.wait(2)
+            seen.extend(items)
+            return items
+
+        scheduler = BatchScheduler(batch_fn, max_batch_size=1, max_wait_ms=0)
+        scheduler.start()
+        try:
+            first = scheduler.submit("busy", "busy")
+            while scheduler.pending:
+                pass
+            token = CancellationToken()
+            dropped = scheduler.submit("gone", "gone", cancel=token)
+            kept = scheduler.submit("kept", "kept", cancel=CancellationToken())
+            token.cancel("client went away")
+            gate.set()
+            with pytest.raises(RequestCancelled, match="client went away"):
+                dropped.result(timeout=2)
+            assert (first.result(timeout=2), kept.result(timeout=2)) == ("busy", "kept")
+        finally:
+            scheduler.stop()
+        assert seen == ["busy", "kept"]
+
+    def test_submit_requires_running(self):
+        """Test submitting to a stopped scheduler fails."""
+        scheduler = BatchScheduler(lambda items: items)
+        with pytest.raises(RuntimeError):
+            scheduler.submit("req", 1)
+
+    def test_concurrent_batches(self):
+        """Test several workers run batches at the same time."""
+        running = []
+        overlap = threading.Event()
+        lock = threading.Lock()
+
+        def batch_fn(items):
+            with lock:
+                running.append(1)
+                if len(running) >= 2:
+                    overlap.set()
+            overlap.wait(2)
+            return items
+
+        scheduler = BatchScheduler(batch_fn, max_batch_size=1, max_wait_ms=0, workers=2)
+        scheduler.start()
+        try:
+            futures = [scheduler.submit(f"req-{i}", i) for i in range(2)]
+            assert [f.result(timeout=2) for f in futures] == [0, 1]
+        finally:
+            scheduler.stop()
+        assert overlap.is_set()
+
+
+class TestBatchedSynthesis:
+    """Batched TTS compared with the unbatched thread pool."""
+
+    def test_not_slower_than_unbatched(self, monkeypatch):
+        """Test the scheduler with TTS_WORKERS workers keeps up with TTS_WORKERS synthesis threads."""
+        from concurrent.futures import ThreadPoolExecutor
+        from config import Config
+        from src import kokoro_tts
+        from src.backends import StubTTSPipeline
+
+        monkeypatch.setattr(Config, "ENABLE_CACHING", False)
+        monkeypatch.setattr(kokoro_tts, "_pipeline_instance", StubTTSPipeline(samples_per_char=1, ms_per_char=0.5))
+        texts = [f"Chunk number {i} of the story goes here." for i in range(16)]
+        workers = 4
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            unbatched = list(pool.map(kokoro_tts.synthesize_chunk, texts))
+        unbatched_time = time.perf_counter() - start
+
+        scheduler = BatchScheduler(kokoro_tts.synthesize_batch, max_batch_size=4, max_wait_ms=1, workers=workers)
+        scheduler.start()
+        try:
+            start = time.perf_counter()
+            futures = [scheduler.submit(f"req-{i % 4}", text) for i, text in enumerate(texts)]
+            batched = [f.result(timeout=10) for f in futures]
+            batched_time = time.perf_counter() - start
+        finally:
+            scheduler.stop()
+
+        assert [len(a) for a in batched] == [len(a) for a in unbatched]
+        # Same parallelism; allow for the fill window and thread start-up
+        assert batched_time <= unbatched_time * 1.5 + 0.05
@@ -0,0 +1,80 @@
+"""
+Tests for the NumPy stitching engine.
+"""
+import numpy as np
+import pytest
+from src.stitching import stitch, peak_gains
+
+
+class TestStitching:
+    """Test cases for stitch."""
+
+    def test_butt_join_length_and_order(self):
+        """Test chunks are placed back to back in order."""
+        a = np.ones(100, dtype=np.float32)
+        b = np.full(50, -1.0, dtype=np.float32)
+        out = stitch([a, b], sample_rate=1000, fade_duration=0, normalize=False)
+        assert len(out) == 150
+        assert np.all(out[:100] == 1.0)
+        assert np.all(out[100:] == -1.0)
+
+    def test_fades_only_at_inner_boundaries(self):
+        """Test the first sample and last sample are not faded."""
+        chunks = [np.ones(100, dtype=np.float32) for _ in range(3)]
+        out = stitch(chunks, sample_rate=1000, fade_duration=10, normalize=False)
+        assert out[0] == 1.0 and out[-1] == 1.0
+        assert out[99] == pytest.approx(0.0)
+        assert out[100] == pytest.approx(0.0)
+        assert out[150] == 1.0
+
+    def test_crossfade_overlaps_chunks(self):
+        """Test crossfading shortens the output and keeps constant signals smooth."""
+        chunks = [np.ones(100, dtype=np.float32) for _ in range(3)]
+        out = stitch(chunks, sample_rate=1000, fade_duration=20, crossfade_duration=20, normalize=False)
+        assert len(out) == 300 - 2 * 20
+        # Linear ramps summed across the overlap stay at unity gain
+        np.testing.assert_allclose(out, 1.0, atol=1e-6)
+
+    def test_crossfade_limited_by_short_chunk(self):
+        """Test overlap never exceeds the shorter neighbour."""
+        out = stitch(
+            [np.ones(100, dtype=np.float32), np.ones(5, dtype=np.float32)],
+            sample_rate=1000, fade_duration=50, crossfade_duration=50, normalize=False
+        )
+        assert len(out) == 100
+
+    def test_crossfade_limited_to_fade(self):
+        """Test a crossfade longer than the fade is clamped so the overlap never sums to clipping."""
+        chunks = [np.ones(100, dtype=np.float32) for _ in range(3)]
+        out = stitch(chunks, sample_rate=1000, fade_duration=10, crossfade_duration=50, normalize=False)
+        assert len(out) == 300 - 2 * 10
+        assert np.max(np.abs(out)) <= 1.0 + 1e-6
+
+    def test_config_rejects_crossfade_longer_than_fade(self, monkeypatch):
+        """Test configuration validation rejects a crossfade longer than the fade."""
+        from config import Config
+        monkeypatch.setattr(Config, "AUDIO_FADE_DURATION", 10)
+        monkeypatch.setattr(Config, "AUDIO_CROSSFADE_DURATION", 50)
+        assert Config.validate() is False
+        monkeypatch.setattr(Config, "AUDIO_CROSSFADE_DURATION", 10)
+        assert Config.validate() is True
+
+    def test_normalization(self):
+        """Test each chunk is peak-normalized independently."""
+        out = stitch(
+            [np.full(10, 0.5, dtype=np.float32), np.full(10, 0.1, dtype=np.float32)],
+            sample_rate=1000, fade_duration=0
+        )
+        target = 10 ** (-0.1 / 20)
+        np.testing.assert_allclose(out, target, rtol=1e-6)
+
+    def test_silent_chunk_gain(self):
+        """Test silent chunks keep unit gain instead of dividing by zero."""
+        gains = peak_gains([np.zeros(10, dtype=np.float32), np.full(10, 0.5, dtype=np.float32)])
+        assert gains[0] == 1.0
+        assert gains[1] == pytest.approx(2 * 10 ** (-0.1 / 20))
+
+    def test_empty_input(self):
+        """Test stitching nothing is rejected."""
+        with pytest.raises(ValueError):
+            stitch([])
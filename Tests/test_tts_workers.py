@@ -0,0 +1,118 @@
+"""
+Tests for the multi-process TTS worker pool.
+"""
+import threading
+import numpy as np
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+from src import tts_workers
+from src.cancellation import CancellationToken, RequestCancelled
+from src.metrics import StageTotals
+from src.tts_workers import TTSWorkerPool, _export_array, _import_array
+
+
+class TestTTSWorkers:
+    """Test cases for shared-memory transfer and pool lifecycle."""
+
+    def test_shared_memory_round_trip(self):
+        """Test waveforms survive the shared memory hand-off and the block is released."""
+        audio = np.linspace(-1, 1, 1000, dtype=np.float32)
+        name, length = _export_array(audio)
+        restored = _import_array(name, length)
+        np.testing.assert_array_equal(restored, audio)
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+    def test_empty_waveform(self):
+        """Test empty waveforms are transferred as empty arrays."""
+        name, length = _export_array(np.zeros(0, dtype=np.float32))
+        assert len(_import_array(name, length)) == 0
+
+    def test_invalid_worker_count(self):
+        """Test the pool needs at least one worker."""
+        with pytest.raises(ValueError):
+            TTSWorkerPool(workers=0)
+
+    def test_submit_requires_start(self):
+        """Test submitting before start fails."""
+        with pytest.raises(RuntimeError):
+            TTSWorkerPool(workers=1).submit("text")
+
+    def test_cancelled_chunk_not_dispatched(self, monkeypatch):
+        """Test a chunk cancelled while waiting for a free worker is dropped."""
+        started = []
+        gate = threading.Event()
+
+        def fake_worker(text, voice):
+            started.append(text)
+            gate.wait(2)
+            return (*_export_array(np.ones(len(text), dtype=np.float32)), 0.0)
+
+        monkeypatch.setattr(tts_workers, "_synthesize_in_worker", fake_worker)
+        pool = TTSWorkerPool(workers=1)
+        pool._executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            busy = pool.submit("busy")
+            token = CancellationToken()
+            dropped = pool.submit("dropped", cancel=token)
+            token.cancel()
+            gate.set()
+            assert len(busy.result(timeout=2)) == 4
+            with pytest.raises(RequestCancelled):
+                dropped.result(timeout=2)
+        finally:
+            pool.shutdown()
+        assert started == ["busy"]
+        assert pool.pending == 0
+
+    def test_work_excludes_queue_wait(self, monkeypatch):
+        """Test only the synthesis time reported by the worker is added to the request's work."""
+        gate = threading.Event()
+
+        def fake_worker(text, voice):
+            gate.wait(2)
+            return (*_export_array(np.ones(len(text), dtype=np.float32)), 0.25)
+
+        monkeypatch.setattr(tts_workers, "_synthesize_in_worker", fake_worker)
+        pool = TTSWorkerPool(workers=1)
+        pool._executor = ThreadPoolExecutor(max_workers=1)
+        work = StageTotals()
+        try:
+            futures = [pool.submit(text, work=work) for text in ("first", "second")]
+            threading.Timer(0.2, gate.set).start()
+            for future in futures:
+                future.result(timeout=2)
+        finally:
+            pool.shutdown()
+        # The second chunk waited behind the first, but only 2 x 0.25s of work is counted
+        assert work.as_dict() == {"synthesize": 0.5}
+
+    def test_pool_end_to_end(self, monkeypatch):
+        """Test a started pool synthesizes in a worker process and releases the shared memory block."""
+        monkeypatch.setenv("TTS_BACKEND", "stub")
+        monkeypatch.setenv("STUB_TTS_MS_PER_CHAR", "0")
+        monkeypatch.setenv("STUB_TTS_SAMPLES_PER_CHAR", "4")
+        monkeypatch.setenv("ENABLE_CACHING", "false")
+        blocks = []
+        import_array = tts_workers._import_array
+
+        def recording_import(name, length):
+            blocks.append(name)
+            return import_array(name, length)
+
+        monkeypatch.setattr(tts_workers, "_import_array", recording_import)
+        pool = TTSWorkerPool(workers=1)
+        pool.start()
+        try:
+            pool.wait_ready(timeout=60)
+            text = "The owl hooted twice."
+            audio = pool.submit(text).result(timeout=60)
+        finally:
+            pool.shutdown()
+        assert audio.dtype == np.float32
+        assert len(audio) == 4 * len(text)
+        assert np.abs(audio).max() > 0
+        assert len(blocks) == 1
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=blocks[0])
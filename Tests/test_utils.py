@@ -1,7 +1,8 @@
 """Tests for utility functions."""
 import pytest
 import os
-from src.utils import validate_audio_file
+import numpy as np
+from src.utils import validate_audio_file, to_pcm16, combine_audio_arrays
 
 
 class TestUtils:
@@ -16,3 +17,27 @@ class TestUtils:
         empty_file = tmp_path / "empty.wav"
         empty_file.touch()
         assert validate_audio_file(str(empty_file)) is False
+    
+    def test_to_pcm16(self):
+        """Test float to 16-bit PCM conversion clips and scales."""
+        pcm = to_pcm16(np.array([0.0, 0.5, -1.0, 2.0], dtype=np.float32))
+        samples = np.frombuffer(pcm, dtype='<i2')
+        assert samples.tolist() == [0, 16383, -32767, 32767]
+    
+    def test_combine_audio_arrays(self):
+        """Test in-memory stitching keeps length, normalizes and fades."""
+        a = np.full(1000, 0.5, dtype=np.float32)
+        b = np.full(500, 0.25, dtype=np.float32)
+        combined = combine_audio_arrays([a, b], sample_rate=1000, fade_duration=100, normalize=True)
+        assert len(combined) == 1500
+        assert combined.dtype == np.float32
+        assert np.max(np.abs(combined)) <= 1.0
+        assert combined[500] == pytest.approx(10 ** (-0.1 / 20))
+        # Fade out at the end of the first chunk, fade in at the start of the second
+        assert combined[999] == pytest.approx(0.0)
+        assert combined[1000] == pytest.approx(0.0)
+    
+    def test_combine_audio_arrays_empty(self):
+        """Test stitching nothing is rejected."""
+        with pytest.raises(ValueError):
+            combine_audio_arrays([])
@@ -45,3 +45,58 @@ class TestStoryValidator:
         is_valid, error = StoryValidator.validate_story_text(long_text)
         assert is_valid is False
         assert "too long" in error.lower()
+    
+    def test_analyze(self):
+        """Test analysis normalizes whitespace and records word offsets."""
+        analysis = StoryValidator.analyze("  Once\tupon \n\n a   time, a knight.  ")
+        assert analysis.is_valid
+        assert analysis.text == "Once upon a time, a knight."
+        assert analysis.word_count == 6
+        assert [analysis.source[start:end] for start, end in analysis.word_spans] == analysis.words
+    
+    def test_chunks_follow_source_paragraphs(self):
+        """Test chunking the analyzed source keeps paragraph breaks and offsets into the raw text."""
+        from src.chunker import chunk_text
+        raw = "Chapter One\n\n  The knight   rode out at dawn."
+        analysis = StoryValidator.analyze(raw)
+        chunks = chunk_text(analysis.source, max_words=4, word_spans=analysis.word_spans)
+        assert [(chunk.text, chunk.start, chunk.end) for chunk in chunks] == [
+            ("Chapter One", 0, 11), ("The knight rode out", 15, 36), ("at dawn.", 37, 45)
+        ]
+    
+    @pytest.mark.parametrize("text, expected", [
+        ("", "Story text cannot be empty"),
+        ("   ", "Story text cannot be empty"),
+        ("123456789012", "Story cannot consist only of numbers"),
+        ("!!!@@@###$$$", "Story cannot consist only of special characters"),
+        ("a b c d e f", "Story must contain meaningful words"),
+        ("!!! ??? ...", "Story must contain meaningful words"),
+        ("x" * 50001, "Story text too long (maximum 50000 characters)"),
+        ("a1 " * 10001, "Story text too long (maximum 10000 words, found 10001)"),
+        ("Hi there, friend.", None),
+        ("  Once\tupon \n\n a   time.  ", None),
+        ("1234 5678 9012", None),
+    ])
+    def test_analyze_keeps_previous_verdicts(self, text, expected):
+        """Test analysis gives the verdicts sanitizing then validating gave before single-pass analysis."""
+        analysis = StoryValidator.analyze(text)
+        assert (analysis.is_valid, analysis.error) == (expected is None, expected)
+        assert StoryValidator.validate_story_text(StoryValidator.sanitize_text(text)) == (expected is None, expected)
+    
+    def test_short_single_token_reports_content(self):
+        """Test short all-number or all-symbol input reports that rather than being too short."""
+        # Previously both were "Story text too short"; several words are never
+        # checked for numbers or symbols, so "1234 5678 9012" stays valid
+        assert StoryValidator.analyze("12345").error == "Story cannot consist only of numbers"
+        assert StoryValidator.analyze("!!!@@@###").error == "Story cannot consist only of special characters"
+        assert StoryValidator.analyze("1 2").error == "Story text too short (minimum 10 characters)"
+    
+    def test_benchmark_paths_agree(self):
+        """Test the validation micro-benchmark's re-splitting and analyzed paths produce the same chunks."""
+        from scripts.bench_validation import analyzed_request, make_text, resplit_request, run
+        text = make_text(5000)
+        chunks = analyzed_request(text, chunk_size=40, max_tokens=480)
+        assert len(chunks) > 1
+        assert chunks == resplit_request(text, chunk_size=40, max_tokens=480)
+        results = run(chars=5000, repeat=1)
+        assert set(results) == {"legacy_validate", "analyze", "resplit_request", "analyzed_request"}
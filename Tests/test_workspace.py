@@ -0,0 +1,53 @@
+"""
+Tests for per-request workspaces.
+"""
+import os
+import time
+import pytest
+from src.workspace import RequestWorkspace, WorkspaceQuotaExceeded, cleanup_stale_workspaces
+
+
+class TestRequestWorkspace:
+    """Test cases for RequestWorkspace."""
+
+    def test_isolated_and_cleaned_up(self, tmp_path):
+        """Test concurrent workspaces use separate directories and are removed."""
+        with RequestWorkspace("req-a", root=str(tmp_path)) as a, \
+                RequestWorkspace("req-b", root=str(tmp_path)) as b:
+            assert a.file_path("final_audio.mp3") != b.file_path("final_audio.mp3")
+            assert a.path.is_dir() and b.path.is_dir()
+        assert not a.path.exists()
+        assert not b.path.exists()
+
+    def test_keep(self, tmp_path):
+        """Test keep=True leaves the directory in place."""
+        with RequestWorkspace("req", root=str(tmp_path), keep=True) as ws:
+            pass
+        assert ws.path.is_dir()
+
+    def test_quota_exceeded(self, tmp_path):
+        """Test writing past the quota raises."""
+        with RequestWorkspace("req", root=str(tmp_path), quota_bytes=10) as ws:
+            path = ws.file_path("chunk.wav")
+            with open(path, "wb") as f:
+                f.write(b"x" * 11)
+            with pytest.raises(WorkspaceQuotaExceeded):
+                ws.track(path)
+
+    def test_invalid_request_id(self, tmp_path):
+        """Test request ids cannot escape the workspace root."""
+        with pytest.raises(ValueError):
+            RequestWorkspace("..", root=str(tmp_path))
+
+    def test_cleanup_stale_workspaces(self, tmp_path):
+        """Test stale directories are removed and fresh ones kept."""
+        stale = tmp_path / "stale"
+        fresh = tmp_path / "fresh"
+        stale.mkdir()
+        fresh.mkdir()
+        old = time.time() - 7200
+        os.utime(stale, (old, old))
+
+        assert cleanup_stale_workspaces(str(tmp_path), max_age=3600) == 1
+        assert not stale.exists()
+        assert fresh.exists()
@@ -2,11 +2,16 @@
 gRPC client for Story2Audio service.
 
 Provides async client interface for generating audio from stories.
+Channels are opened once and reused for every call; with several server
+addresses the client round-robins requests across them.
 """
 import grpc
 import asyncio
+import io
+import itertools
 import logging
-from typing import Tuple, Optional
+import threading
+from typing import Tuple, Optional, AsyncIterator, BinaryIO, Union, List, Sequence, Dict
 import story2audio_pb2
 import story2audio_pb2_grpc
 from config import Config
@@ -17,22 +22,80 @@ logger = logging.getLogger(__name__)
 class Story2AudioClient:
     """Client for Story2Audio gRPC service."""
     
-    def __init__(self, host: str = "localhost", port: int = None):
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = None,
+        addresses: Optional[Sequence[str]] = None,
+        channels_per_address: int = 1
+    ):
         """
         Initialize client.
         
+        Channels are created on first use and kept open until close() is
+        called, so use the client as an async context manager or close it
+        explicitly.
+        
         Args:
             host: Server hostname
             port: Server port (defaults to Config.GRPC_PORT)
+            addresses: "host:port" targets to round-robin across (overrides host/port)
+            channels_per_address: Connections to open per address
         """
+        if channels_per_address < 1:
+            raise ValueError("channels_per_address must be at least 1")
         self.host = host
         self.port = port or Config.GRPC_PORT
-        self.address = f"{host}:{self.port}"
+        self.addresses: List[str] = list(addresses) if addresses else [f"{host}:{self.port}"]
+        self.address = self.addresses[0]
+        self.channels_per_address = channels_per_address
+        self._channels: List[grpc.aio.Channel] = []
+        self._stubs: List[story2audio_pb2_grpc.StoryServiceStub] = []
+        self._next = itertools.count()
+    
+    def _channel_options(self) -> List[Tuple[str, int]]:
+        options = [
+            ('grpc.max_message_length', Config.GRPC_MAX_MESSAGE_LENGTH),
+            ('grpc.max_receive_message_length', Config.GRPC_MAX_MESSAGE_LENGTH),
+            ('grpc.keepalive_time_ms', Config.GRPC_KEEPALIVE_TIME_MS),
+            ('grpc.keepalive_timeout_ms', Config.GRPC_KEEPALIVE_TIMEOUT_MS),
+            ('grpc.keepalive_permit_without_calls', 1),
+            ('grpc.http2.max_pings_without_data', 0),
+        ]
+        if self.channels_per_address > 1:
+            # Without a local subchannel pool, channels to the same target share one connection
+            options.append(('grpc.use_local_subchannel_pool', 1))
+        return options
+    
+    def _stub(self) -> story2audio_pb2_grpc.StoryServiceStub:
+        """Get the next stub in round-robin order, opening the channels on first use."""
+        if not self._stubs:
+            options = self._channel_options()
+            for address in self.addresses:
+                for _ in range(self.channels_per_address):
+                    channel = grpc.aio.insecure_channel(address, options=options)
+                    self._channels.append(channel)
+                    self._stubs.append(story2audio_pb2_grpc.StoryServiceStub(channel))
+            logger.debug(f"Opened {len(self._channels)} channels to {', '.join(self.addresses)}")
+        return self._stubs[next(self._next) % len(self._stubs)]
+    
+    async def close(self) -> None:
+        """Close all open channels."""
+        channels, self._channels, self._stubs = self._channels, [], []
+        for channel in channels:
+            await channel.close()
+    
+    async def __aenter__(self) -> "Story2AudioClient":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
     
     async def generate_audio(
         self, 
         story_text: str,
-        timeout: Optional[float] = None
+        timeout: Optional[float] = None,
+        story_id: str = ""
     ) -> Tuple[str, str, str]:
         """
         Generate audio from story text.
@@ -40,30 +103,26 @@ class Story2AudioClient:
         Args:
             story_text: Story text to convert
             timeout: Request timeout in seconds
+            story_id: Identifies an edited story; unchanged chunks of its
+                previous version are not rendered again
             
         Returns:
             Tuple of (audio_base64, status, message)
         """
         try:
-            options = [
-                ('grpc.max_message_length', Config.GRPC_MAX_MESSAGE_LENGTH),
-                ('grpc.max_receive_message_length', Config.GRPC_MAX_MESSAGE_LENGTH),
-            ]
+            stub = self._stub()
+            request = story2audio_pb2.StoryRequest(story_text=story_text, story_id=story_id)
+            
+            if timeout:
+                response = await asyncio.wait_for(
+                    stub.GenerateAudio(request),
+                    timeout=timeout
+                )
+            else:
+                response = await stub.GenerateAudio(request)
+            
+            return response.audio_base64, response.status, response.message
             
-            async with grpc.aio.insecure_channel(self.address, options=options) as channel:
-                stub = story2audio_pb2_grpc.StoryServiceStub(channel)
-                request = story2audio_pb2.StoryRequest(story_text=story_text)
-                
-                if timeout:
-                    response = await asyncio.wait_for(
-                        stub.GenerateAudio(request),
-                        timeout=timeout
-                    )
-                else:
-                    response = await stub.GenerateAudio(request)
-                
-                return response.audio_base64, response.status, response.message
-                
         except asyncio.TimeoutError:
             logger.error(f"Request timeout after {timeout}s")
             return "", "error", f"Request timeout after {timeout} seconds"
@@ -73,6 +132,235 @@ class Story2AudioClient:
         except Exception as e:
             logger.error(f"Unexpected error: {e}")
             return "", "error", f"Client error: {str(e)}"
+    
+    async def stream_audio(
+        self,
+        story_text: str,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[story2audio_pb2.AudioFrame]:
+        """
+        Stream audio frames for a story as each chunk is synthesized.
+        
+        Frames arrive in chunk order and carry raw PCM in ``frame.audio``;
+        the last frame has ``frame.final`` set.
+        
+        Args:
+            story_text: Story text to convert
+            timeout: Deadline for the whole stream in seconds
+            
+        Yields:
+            AudioFrame messages
+            
+        Raises:
+            grpc.RpcError: If the server rejects or fails the request
+        """
+        request = story2audio_pb2.StoryRequest(story_text=story_text)
+        async for frame in self._stub().GenerateAudioStream(request, timeout=timeout):
+            yield frame
+    
+    async def generate_many(
+        self,
+        stories: Sequence[str],
+        concurrency: int = 8,
+        timeout: Optional[float] = None
+    ) -> List[Tuple[str, str, str]]:
+        """
+        Generate audio for many stories over the shared channels.
+        
+        Args:
+            stories: Story texts to convert
+            concurrency: Maximum requests in flight at once
+            timeout: Per-request timeout in seconds
+            
+        Returns:
+            One (audio_base64, status, message) tuple per story, in input order
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def generate_one(story_text: str) -> Tuple[str, str, str]:
+            async with semaphore:
+                return await self.generate_audio(story_text, timeout=timeout)
+        
+        return await asyncio.gather(*(generate_one(story) for story in stories))
+
+
+    async def stream_audio_pieces(
+        self,
+        story_text: str,
+        timeout: Optional[float] = None,
+        story_id: str = ""
+    ) -> AsyncIterator[story2audio_pb2.AudioPiece]:
+        """
+        Receive the encoded audio for a story as fixed-size pieces.
+        
+        Each piece fits in the default gRPC message size, so stories of any
+        length can be downloaded without raising the receive limit.
+        
+        Args:
+            story_text: Story text to convert
+            timeout: Deadline for the whole stream in seconds
+            story_id: Identifies an edited story (see generate_audio)
+            
+        Yields:
+            AudioPiece messages in sequence order
+            
+        Raises:
+            grpc.RpcError: If the server rejects or fails the request
+        """
+        request = story2audio_pb2.StoryRequest(story_text=story_text, story_id=story_id)
+        async for piece in self._stub().GenerateAudioChunked(request, timeout=timeout):
+            yield piece
+    
+    async def download_audio(
+        self,
+        story_text: str,
+        destination: Union[str, BinaryIO],
+        timeout: Optional[float] = None,
+        story_id: str = ""
+    ) -> int:
+        """
+        Generate audio and write it to a file as the pieces arrive.
+        
+        Args:
+            story_text: Story text to convert
+            destination: Output file path or writable binary file object
+            timeout: Deadline for the whole transfer in seconds
+            story_id: Identifies an edited story (see generate_audio)
+            
+        Returns:
+            Number of bytes written
+            
+        Raises:
+            grpc.RpcError: If the server rejects or fails the request
+            IOError: If the transfer ended early or pieces arrived out of order
+        """
+        if isinstance(destination, str):
+            with open(destination, "wb") as f:
+                return await self.download_audio(story_text, f, timeout=timeout, story_id=story_id)
+        return await self._write_pieces(
+            self.stream_audio_pieces(story_text, timeout=timeout, story_id=story_id), destination
+        )
+    
+    @staticmethod
+    async def _write_pieces(pieces: AsyncIterator[story2audio_pb2.AudioPiece], destination: BinaryIO) -> int:
+        """Write AudioPiece data in order, checking the transfer is complete."""
+        written = 0
+        expected = 0
+        total_size = None
+        complete = False
+        async for piece in pieces:
+            if piece.sequence != expected:
+                raise IOError(f"Expected piece {expected}, got {piece.sequence}")
+            destination.write(piece.data)
+            written += len(piece.data)
+            expected += 1
+            total_size = piece.total_size
+            complete = piece.last
+        
+        if not complete or written != total_size:
+            raise IOError(f"Incomplete audio transfer: received {written} of {total_size} bytes")
+        return written
+    
+    async def fetch_audio_bytes(
+        self,
+        story_text: str,
+        timeout: Optional[float] = None,
+        story_id: str = ""
+    ) -> bytes:
+        """
+        Generate audio and return the reassembled encoded bytes.
+        
+        Args:
+            story_text: Story text to convert
+            timeout: Deadline for the whole transfer in seconds
+            story_id: Identifies an edited story (see generate_audio)
+            
+        Returns:
+            Encoded audio (MP3)
+        """
+        buffer = io.BytesIO()
+        await self.download_audio(story_text, buffer, timeout=timeout, story_id=story_id)
+        return buffer.getvalue()
+    
+    async def submit_story(self, story_text: str, timeout: Optional[float] = 30) -> story2audio_pb2.JobStatus:
+        """
+        Queue a story for background rendering.
+        
+        Returns:
+            Initial JobStatus; keep its job_id to poll, watch or fetch the audio
+            
+        Raises:
+            grpc.RpcError: INVALID_ARGUMENT for invalid stories, RESOURCE_EXHAUSTED if the queue is full
+        """
+        request = story2audio_pb2.StoryRequest(story_text=story_text)
+        return await self._stub().SubmitStory(request, timeout=timeout)
+    
+    async def get_job_status(self, job_id: str, timeout: Optional[float] = 30) -> story2audio_pb2.JobStatus:
+        """Get the current state and progress of a job."""
+        return await self._stub().GetJobStatus(story2audio_pb2.JobRequest(job_id=job_id), timeout=timeout)
+    
+    async def watch_job(
+        self,
+        job_id: str,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[story2audio_pb2.JobStatus]:
+        """
+        Follow a job until it finishes.
+        
+        Yields:
+            JobStatus on every state or progress change; the last one has
+            state "succeeded" or "failed"
+        """
+        async for status in self._stub().WatchJob(story2audio_pb2.JobRequest(job_id=job_id), timeout=timeout):
+            yield status
+    
+    async def download_job_audio(
+        self,
+        job_id: str,
+        destination: Union[str, BinaryIO],
+        timeout: Optional[float] = None
+    ) -> int:
+        """
+        Write the audio of a succeeded job to a file.
+        
+        Returns:
+            Number of bytes written
+            
+        Raises:
+            grpc.RpcError: FAILED_PRECONDITION if the job has not succeeded, NOT_FOUND if it is unknown
+            IOError: If the transfer ended early or pieces arrived out of order
+        """
+        if isinstance(destination, str):
+            with open(destination, "wb") as f:
+                return await self.download_job_audio(job_id, f, timeout=timeout)
+        pieces = self._stub().FetchAudio(story2audio_pb2.JobRequest(job_id=job_id), timeout=timeout)
+        return await self._write_pieces(pieces, destination)
+
+
+# One client per event loop that has called get_default_client()
+_default_clients: Dict[asyncio.AbstractEventLoop, Story2AudioClient] = {}
+_default_clients_lock = threading.Lock()
+
+
+def get_default_client() -> Story2AudioClient:
+    """
+    Get a shared client for the running event loop.
+    
+    aio channels are bound to the loop that created them, so each loop gets
+    its own client. Clients of loops that have since been closed are
+    released, which closes their channels.
+    """
+    loop = asyncio.get_running_loop()
+    with _default_clients_lock:
+        for closed in [other for other in _default_clients if other.is_closed()]:
+            # close() cannot run on a closed loop; grpc.aio closes a channel when it is released
+            del _default_clients[closed]
+        client = _default_clients.get(loop)
+        if client is None:
+            client = _default_clients[loop] = Story2AudioClient()
+        return client
 
 
 # Backward compatibility function
@@ -80,11 +368,12 @@ async def generate_audio(story_text: str) -> Tuple[str, str, str]:
     """
     Generate audio from story text (backward compatibility).
     
+    Reuses a shared connection to the default server across calls.
+    
     Args:
         story_text: Story text to convert
         
     Returns:
         Tuple of (audio_base64, status, message)
     """
-    client = Story2AudioClient()
-    return await client.generate_audio(story_text)
\ No newline at end of file
+    return await get_default_client().generate_audio(story_text)
@@ -1,12 +1,15 @@
 """
 Health check endpoint for Story2Audio service.
 
-Provides health status and system information.
+Provides health status and system information, plus the standard gRPC
+health service whose status tracks model warm-up (readiness).
 """
 import logging
 import psutil
 import os
 from typing import Dict, Any
+import grpc
+from grpc_health.v1 import health, health_pb2, health_pb2_grpc
 
 logger = logging.getLogger(__name__)
 
@@ -41,3 +44,65 @@ def get_health_status() -> Dict[str, Any]:
             "status": "unhealthy",
             "error": str(e)
         }
+
+
+# Name under which the story service reports its serving status
+SERVICE_NAME = "storyservice.StoryService"
+
+
+async def create_health_servicer() -> health.aio.HealthServicer:
+    """
+    Create the standard gRPC health service, initially NOT_SERVING.
+
+    The server flips it to SERVING with set_serving() once the models
+    are warmed up, so load balancers never route to a cold instance.
+    """
+    servicer = health.aio.HealthServicer()
+    await set_serving(servicer, False)
+    return servicer
+
+
+async def set_serving(servicer: health.aio.HealthServicer, serving: bool) -> None:
+    """Set the overall and story service status."""
+    status = health_pb2.HealthCheckResponse.SERVING if serving else health_pb2.HealthCheckResponse.NOT_SERVING
+    for service in ("", SERVICE_NAME):
+        await servicer.set(service, status)
+    logger.info(f"Health status: {health_pb2.HealthCheckResponse.ServingStatus.Name(status)}")
+
+
+def check_serving(address: str, service: str = SERVICE_NAME, timeout: float = 5.0) -> bool:
+    """
+    Ask a server whether a service is SERVING.
+
+    Args:
+        address: "host:port" of the server
+        service: Service name to check ("" for the whole server)
+        timeout: RPC timeout in seconds
+
+    Returns:
+        True if the server reports SERVING
+    """
+    try:
+        with grpc.insecure_channel(address) as channel:
+            response = health_pb2_grpc.HealthStub(channel).Check(
+                health_pb2.HealthCheckRequest(service=service), timeout=timeout
+            )
+        return response.status == health_pb2.HealthCheckResponse.SERVING
+    except grpc.RpcError as e:
+        logger.error(f"Health check failed: {e.code()} - {e.details()}")
+        return False
+
+
+if __name__ == "__main__":
+    # Container health probe: exit 0 only when the service is ready
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Check Story2Audio readiness over gRPC health checking")
+    parser.add_argument("--address", default=f"localhost:{os.getenv('GRPC_PORT', '50051')}", help="host:port")
+    parser.add_argument("--service", default=SERVICE_NAME, help="Service name ('' for overall)")
+    parser.add_argument("--timeout", type=float, default=5.0, help="RPC timeout in seconds")
+    args = parser.parse_args()
+    serving = check_serving(args.address, args.service, args.timeout)
+    print("SERVING" if serving else "NOT_SERVING")
+    sys.exit(0 if serving else 1)
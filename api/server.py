@@ -7,17 +7,35 @@ validation, and metrics collection.
 import grpc
 import os
 import logging
+import time
 import uuid
 from concurrent import futures
+from functools import partial
 import asyncio
+from typing import Iterator, List, Optional
+import numpy as np
 import story2audio_pb2
 import story2audio_pb2_grpc
+from grpc_health.v1 import health_pb2_grpc
+from api.health import create_health_servicer, set_serving
 from src.preprocess import chunk_story
 from src.enhancer_local import StoryEnhancer
-from src.kokoro_tts import text_to_coqui_audio
-from src.utils import combine_audio
-from src.validators import StoryValidator
-from src.metrics import metrics
+from src.backends import create_enhancer
+from src.kokoro_tts import synthesize_chunk, save_chunk_audio, warm_up as warm_up_tts
+from src.pipeline import Stage, run_pipeline
+from src.cache import content_cache_counter
+from src.executors import get_executor, queue_depths, shutdown_executors
+from src.scheduler import get_tts_scheduler, stop_tts_scheduler, tts_scheduler_pending
+from src.tts_workers import get_tts_pool, shutdown_tts_pool, tts_pool_pending
+from src.workspace import RequestWorkspace, WorkspaceQuotaExceeded, cleanup_stale_workspaces
+from src.utils import combine_audio, combine_audio_arrays, encode_audio, to_pcm16
+from src.validators import StoryAnalysis, StoryValidator
+from src.metrics import StageTotals, metrics, start_metrics_server
+from src.admission import AdmissionRejected, AdmissionTicket, get_admission_controller
+from src.cancellation import CancellationToken, RequestCancelled, raise_if_cancelled
+from src.jobs import Job, JobManager, JobQueueFull, JobStore, JOB_SUCCEEDED
+from src.progress_tracker import ProgressTracker
+from src.revisions import RevisionPlan, get_revision_store
 from src.error_handler import ErrorHandler
 import base64
 import sys
@@ -28,74 +46,249 @@ from config import Config
 Config.setup_logging()
 logger = logging.getLogger(__name__)
 
+AUDIO_FORMAT = "mp3"
+
 class StoryServiceServicer(story2audio_pb2_grpc.StoryServiceServicer):
-    def __init__(self):
+    def __init__(self, jobs: Optional[JobManager] = None):
         self.enhancer = None  # Lazy initialization
+        self._enhancer_lock = asyncio.Lock()
+        self.jobs = jobs  # Backs the asynchronous job RPCs
     
     def _get_enhancer(self):
         """Lazy initialization of enhancer to avoid loading on import"""
         if self.enhancer is None:
             logger.info("Initializing StoryEnhancer...")
-            self.enhancer = StoryEnhancer()
+            self.enhancer = create_enhancer()
         return self.enhancer
     
-    async def GenerateAudio(self, request, context):
-        request_id = str(uuid.uuid4())[:8]
-        story_text = request.story_text
+    async def _ensure_enhancer(self) -> StoryEnhancer:
+        """Load the enhancer in the enhance executor so model loading never blocks the event loop."""
+        if self.enhancer is None:
+            async with self._enhancer_lock:
+                if self.enhancer is None:
+                    loop = asyncio.get_event_loop()
+                    await loop.run_in_executor(get_executor("enhance"), self._get_enhancer)
+        return self.enhancer
+    
+    async def warm_up(self) -> None:
+        """Load both models and run one inference through each before taking traffic."""
+        loop = asyncio.get_event_loop()
+        enhancer = await self._ensure_enhancer()
+        await loop.run_in_executor(get_executor("enhance"), enhancer.warm_up)
+        if Config.TTS_PROCESS_WORKERS > 0:
+            # Each worker process warms up its own pipeline in its initializer
+            await loop.run_in_executor(None, get_tts_pool().wait_ready, Config.WARMUP_TIMEOUT)
+        else:
+            await loop.run_in_executor(get_executor("tts"), lambda: warm_up_tts(voice=Config.TTS_VOICE))
+    
+    @staticmethod
+    def _validate(story_text: str) -> StoryAnalysis:
+        """Sanitize and validate story text, timed as the 'validate' stage."""
+        with metrics.time_stage("validate"):
+            return StoryValidator.analyze(story_text)
+    
+    @staticmethod
+    def _workspace(request_id: str) -> RequestWorkspace:
+        """Create the isolated scratch directory for a request."""
+        return RequestWorkspace(
+            request_id,
+            root=Config.WORKSPACE_DIR,
+            quota_bytes=Config.WORKSPACE_QUOTA_MB * 1024 * 1024,
+            keep=Config.KEEP_WORKSPACES
+        )
+    
+    def _audio_stages(
+        self,
+        enhancer: StoryEnhancer,
+        request_id: str,
+        work: Optional[StageTotals] = None,
+        cancel: Optional[CancellationToken] = None
+    ) -> List[Stage]:
+        """
+        Build the enhance and synthesize stages shared by all RPCs.
         
-        try:
-            # Sanitize and validate input
-            story_text = StoryValidator.sanitize_text(story_text)
-            is_valid, error_message = StoryValidator.validate_story_text(story_text)
-            
-            if not is_valid:
-                logger.warning(f"[{request_id}] Validation failed: {error_message}")
-                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-                context.set_details(error_message or "Invalid input")
-                return story2audio_pb2.AudioResponse(
-                    status="error", 
-                    audio_base64="", 
-                    message=error_message or "Invalid input"
-                )
-            
-            word_count = len(story_text.split())
-            logger.info(f"[{request_id}] Processing request: {word_count} words")
-            
-            # Estimate processing time
-            estimated_time = word_count * 0.035  # ~35ms per word
-            logger.debug(f"[{request_id}] Estimated processing time: {estimated_time:.1f}s")
-            
-            # Start metrics tracking
-            metrics.start_request(request_id, word_count=word_count)
-            logger.debug(f"[{request_id}] Metrics tracking started")
-
-            # Preprocess
-            logger.info("Preprocessing story into chunks...")
-            chunks = chunk_story(story_text, chunk_size=Config.CHUNK_SIZE)
-            logger.info(f"Story split into {len(chunks)} chunks")
+        Stage time is added to work; once cancel is cancelled the stages stop
+        between chunks (and between Kokoro segments) by raising RequestCancelled.
+        """
+        def enhance(indices: List[int], chunks: List[str]) -> List[str]:
+            try:
+                with metrics.time_stage("enhance", work):
+                    return enhancer.enhance_batch(
+                        chunks,
+                        max_new_tokens=Config.ENHANCEMENT_MAX_TOKENS,
+                        temperature=Config.ENHANCEMENT_TEMPERATURE,
+                        top_p=Config.ENHANCEMENT_TOP_P,
+                        batch_size=Config.ENHANCEMENT_BATCH_SIZE,
+                        cancel=cancel
+                    )
+            except RequestCancelled:
+                raise
+            except Exception as e:
+                logger.error(f"[{request_id}] Error enhancing chunks {[i + 1 for i in indices]}: {e}")
+                # Fallback to original chunks if enhancement fails
+                return chunks
+        
+        def synthesize(index: int, text: str) -> np.ndarray:
+            try:
+                with metrics.time_stage("synthesize", work):
+                    audio = synthesize_chunk(text, voice=Config.TTS_VOICE, cancel=cancel)
+            except RequestCancelled:
+                raise
+            except Exception as e:
+                logger.error(f"[{request_id}] Error generating audio for chunk {index+1}: {e}")
+                # Continue with other chunks instead of failing completely
+                return np.zeros(0, dtype=np.float32)
+            logger.debug(f"[{request_id}] Synthesized chunk {index+1} ({len(audio)} samples)")
+            return audio
+        
+        async def synthesize_batched(index: int, text: str) -> np.ndarray:
+            raise_if_cancelled(cancel)
+            # Synthesis time is recorded by the scheduler, without the time spent queued
+            future = get_tts_scheduler().submit(request_id, (text, Config.TTS_VOICE, cancel, work), cancel=cancel)
+            try:
+                audio = await asyncio.wrap_future(future)
+            except RequestCancelled:
+                raise
+            except Exception as e:
+                logger.error(f"[{request_id}] Error generating audio for chunk {index+1}: {e}")
+                return np.zeros(0, dtype=np.float32)
+            logger.debug(f"[{request_id}] Synthesized chunk {index+1} ({len(audio)} samples)")
+            return audio
+        
+        async def synthesize_in_process(index: int, text: str) -> np.ndarray:
+            raise_if_cancelled(cancel)
+            # Synthesis time is measured in the worker process, without the time spent queued
+            future = get_tts_pool().submit(text, Config.TTS_VOICE, cancel=cancel, work=work)
+            try:
+                audio = await asyncio.wrap_future(future)
+            except RequestCancelled:
+                raise
+            except Exception as e:
+                logger.error(f"[{request_id}] Error generating audio for chunk {index+1}: {e}")
+                return np.zeros(0, dtype=np.float32)
+            logger.debug(f"[{request_id}] Synthesized chunk {index+1} ({len(audio)} samples)")
+            return audio
+        
+        if Config.TTS_PROCESS_WORKERS > 0:
+            synthesize_stage = Stage("synthesize", synthesize_in_process)
+        elif Config.TTS_BATCHING:
+            synthesize_stage = Stage("synthesize", synthesize_batched)
+        else:
+            synthesize_stage = Stage("synthesize", synthesize, executor=get_executor("tts"))
+        
+        return [
+            Stage("enhance", enhance, executor=get_executor("enhance"), batch_size=Config.ENHANCEMENT_BATCH_SIZE),
+            synthesize_stage
+        ]
+    
+    async def _render_in_memory(
+        self,
+        chunks: List[str],
+        enhancer: StoryEnhancer,
+        request_id: str,
+        work: Optional[StageTotals] = None,
+        cancel: Optional[CancellationToken] = None,
+        progress: Optional[ProgressTracker] = None
+    ) -> bytes:
+        """Synthesize, stitch and encode a story without touching disk."""
+        logger.info("Running enhance/synthesize pipeline in memory...")
+        stages = self._audio_stages(enhancer, request_id, work, cancel)
+        arrays = []
+        async for audio in run_pipeline(chunks, stages, queue_size=Config.PIPELINE_QUEUE_SIZE):
+            if len(audio) > 0:
+                arrays.append(audio)
+            if progress is not None:
+                progress.update()
+        if not arrays:
+            raise RuntimeError("No audio was generated")
+        logger.info(f"Generated audio for {len(arrays)} chunks")
+        return await self._stitch_and_encode(arrays, work, cancel)
+    
+    @staticmethod
+    async def _stitch_and_encode(
+        arrays: List[np.ndarray],
+        work: Optional[StageTotals] = None,
+        cancel: Optional[CancellationToken] = None
+    ) -> bytes:
+        """Stitch chunk waveforms and encode them in the encode executor."""
+        logger.info("Stitching and encoding audio...")
+        
+        def stitch_and_encode() -> bytes:
+            raise_if_cancelled(cancel)
+            with metrics.time_stage("stitch", work):
+                audio = combine_audio_arrays(arrays, Config.SAMPLE_RATE, fade_duration=Config.AUDIO_FADE_DURATION)
+            with metrics.time_stage("encode", work):
+                return encode_audio(audio, sample_rate=Config.SAMPLE_RATE, bitrate=Config.AUDIO_BITRATE)
+        
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(get_executor("encode"), stitch_and_encode)
+    
+    async def _render_revision(
+        self,
+        plan: RevisionPlan,
+        enhancer: StoryEnhancer,
+        request_id: str,
+        work: Optional[StageTotals] = None,
+        cancel: Optional[CancellationToken] = None,
+        progress: Optional[ProgressTracker] = None
+    ) -> bytes:
+        """Render only the chunks of a story version that changed and stitch them with stored audio."""
+        changed = plan.changed
+        logger.info(f"[{request_id}] Rendering {len(changed)} of {len(plan.chunks)} chunks of story {plan.story_id}")
+        arrays = list(plan.audio)
+        if progress is not None:
+            progress.update(len(plan.chunks) - len(changed))
+        
+        stages = self._audio_stages(enhancer, request_id, work, cancel)
+        texts = [plan.chunks[i].text for i in changed]
+        position = 0
+        async for audio in run_pipeline(texts, stages, queue_size=Config.PIPELINE_QUEUE_SIZE):
+            arrays[changed[position]] = audio
+            position += 1
+            if progress is not None:
+                progress.update()
+        
+        audible = [audio for audio in arrays if len(audio) > 0]
+        if not audible:
+            raise RuntimeError("No audio was generated")
+        audio_bytes = await self._stitch_and_encode(audible, work, cancel)
+        
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(get_executor("encode"), get_revision_store().commit, plan, arrays)
+        return audio_bytes
+    
+    async def _render_on_disk(
+        self,
+        chunks: List[str],
+        enhancer: StoryEnhancer,
+        request_id: str,
+        work: Optional[StageTotals] = None,
+        cancel: Optional[CancellationToken] = None,
+        progress: Optional[ProgressTracker] = None
+    ) -> bytes:
+        """Synthesize chunks to WAV files in a request workspace and stitch them to MP3."""
+        logger.info("Running enhance/synthesize/write pipeline...")
+        loop = asyncio.get_event_loop()
+        with self._workspace(request_id) as workspace:
+            def write(index: int, audio: np.ndarray) -> Optional[str]:
+                raise_if_cancelled(cancel)
+                with metrics.time_stage("write", work):
+                    return workspace.track(save_chunk_audio(
+                        audio, index, str(workspace.path), sample_rate=Config.SAMPLE_RATE
+                    ))
             
-            # Enhance
-            logger.info("Enhancing text chunks...")
-            enhancer = self._get_enhancer()
-            enhanced_chunks = []
-            for i, chunk in enumerate(chunks):
-                try:
-                    enhanced = enhancer.enhance_chunk(chunk)
-                    enhanced_chunks.append(enhanced)
-                    logger.debug(f"Enhanced chunk {i+1}/{len(chunks)}")
-                except Exception as e:
-                    logger.error(f"Error enhancing chunk {i+1}: {e}")
-                    # Fallback to original chunk if enhancement fails
-                    enhanced_chunks.append(chunk)
-
-            # Generate audio asynchronously
-            logger.info("Generating audio from enhanced chunks...")
-            loop = asyncio.get_event_loop()
+            stages = self._audio_stages(enhancer, request_id, work, cancel) + [
+                Stage("write", write, executor=get_executor("encode"))
+            ]
             try:
-                audio_files = await loop.run_in_executor(
-                    None, 
-                    lambda: text_to_coqui_audio(enhanced_chunks, output_dir=Config.OUTPUT_DIR)
-                )
+                audio_files = []
+                async for path in run_pipeline(chunks, stages, queue_size=Config.PIPELINE_QUEUE_SIZE):
+                    if path is not None:
+                        audio_files.append(path)
+                    if progress is not None:
+                        progress.update()
+                if not audio_files:
+                    raise RuntimeError("No audio files were generated")
                 logger.info(f"Generated {len(audio_files)} audio files")
             except Exception as e:
                 logger.error(f"Audio generation failed: {e}")
@@ -103,32 +296,191 @@ class StoryServiceServicer(story2audio_pb2_grpc.StoryServiceServicer):
 
             # Stitch audio
             logger.info("Stitching audio chunks together...")
-            output_path = Config.get_output_path()
+            output_path = workspace.file_path(Config.FINAL_AUDIO_NAME)
+            
+            def stitch_and_encode() -> None:
+                raise_if_cancelled(cancel)
+                # combine_audio reads, stitches and encodes in one call
+                with metrics.time_stage("encode", work):
+                    combine_audio(
+                        audio_files,
+                        output_path,
+                        bitrate=Config.AUDIO_BITRATE,
+                        fade_duration=Config.AUDIO_FADE_DURATION
+                    )
+            
             try:
-                await loop.run_in_executor(None, lambda: combine_audio(audio_files, output_path))
+                await loop.run_in_executor(get_executor("encode"), stitch_and_encode)
+                workspace.track(output_path)
                 logger.info(f"Audio stitched and saved to {output_path}")
             except Exception as e:
                 logger.error(f"Audio stitching failed: {e}")
                 raise
 
-            # Convert to base64
-            logger.info("Encoding audio to base64...")
             try:
                 with open(output_path, "rb") as f:
-                    audio_base64 = base64.b64encode(f.read()).decode("utf-8")
-                logger.info("Audio generation completed successfully")
+                    return f.read()
             except FileNotFoundError:
                 logger.error(f"Output file not found: {output_path}")
                 raise
-            except Exception as e:
-                logger.error(f"Error reading output file: {e}")
-                raise
+    
+    async def _render_story(
+        self,
+        story: StoryAnalysis,
+        request_id: str,
+        time_remaining: Optional[float] = None,
+        progress: Optional[ProgressTracker] = None,
+        story_id: str = ""
+    ) -> bytes:
+        """
+        Chunk, enhance, synthesize and encode a validated story.
+        
+        If progress is given, its total is set to the number of chunks and it
+        is advanced as each chunk is synthesized. If story_id is given, the
+        story is rendered as a new version of it: chunks unchanged since the
+        previous version reuse their stored audio.
+        
+        Raises:
+            AdmissionRejected: If the work budget or the client deadline (time_remaining
+                seconds) does not allow the request to start
+        """
+        word_count = story.word_count
+        logger.info(f"[{request_id}] Processing request: {word_count} words")
+        
+        plan: Optional[RevisionPlan] = None
+        if story_id:
+            # Reads stored chunk audio, so keep it off the event loop
+            loop = asyncio.get_event_loop()
+            plan = await loop.run_in_executor(
+                get_executor("encode"), get_revision_store().plan,
+                story_id, story.source, Config.CHUNK_SIZE, Config.CHUNK_MAX_TOKENS, story.word_spans
+            )
+        # Only chunks that have to be rendered count against the work budget
+        render_words = plan.changed_words if plan is not None else word_count
+        
+        # Estimate processing time
+        admission = get_admission_controller()
+        logger.debug(f"[{request_id}] Estimated processing time: {admission.estimate_duration(render_words):.1f}s")
+        
+        # Start metrics tracking
+        metrics.start_request(request_id, word_count=word_count)
+        logger.debug(f"[{request_id}] Metrics tracking started")
 
-            return story2audio_pb2.AudioResponse(
-                status="success",
-                audio_base64=audio_base64,
-                message="Audio generated successfully"
+        chunks: List[str] = []
+        cancel = CancellationToken(time_remaining)
+        ticket: Optional[AdmissionTicket] = None
+        try:
+            async with admission.admit(render_words, time_remaining) as ticket:
+                # Preprocess
+                if plan is not None:
+                    chunks = [chunk.text for chunk in plan.chunks]
+                else:
+                    logger.info("Preprocessing story into chunks...")
+                    with metrics.time_stage("chunk", ticket.work):
+                        chunks = chunk_story(
+                            story.source,
+                            chunk_size=Config.CHUNK_SIZE,
+                            max_tokens=Config.CHUNK_MAX_TOKENS,
+                            word_spans=story.word_spans
+                        )
+                logger.info(f"Story split into {len(chunks)} chunks")
+                if progress is not None:
+                    progress.total = len(chunks)
+                    progress.update(0)
+                
+                # Enhance, synthesize and encode chunks as overlapping stages
+                enhancer = await self._ensure_enhancer()
+                if plan is not None:
+                    audio_bytes = await self._render_revision(plan, enhancer, request_id, ticket.work, cancel, progress)
+                elif Config.IN_MEMORY_AUDIO:
+                    audio_bytes = await self._render_in_memory(chunks, enhancer, request_id, ticket.work, cancel, progress)
+                else:
+                    audio_bytes = await self._render_on_disk(chunks, enhancer, request_id, ticket.work, cancel, progress)
+        except BaseException as e:
+            self._abandon(request_id, cancel, ticket, e)
+            metrics.end_request(request_id, status="error", error=str(e) or type(e).__name__, chunk_count=len(chunks))
+            raise
+        metrics.end_request(request_id, status="success", chunk_count=len(chunks))
+        return audio_bytes
+    
+    def _abandon(
+        self,
+        request_id: str,
+        cancel: CancellationToken,
+        ticket: Optional[AdmissionTicket],
+        error: Optional[BaseException] = None
+    ) -> None:
+        """
+        Stop the remaining work of a cancelled or failed request.
+        
+        The time saved is only recorded for real cancellations: the client went
+        away, the RPC was cancelled or the deadline passed. A request that
+        failed on its own has no remaining work worth counting.
+        """
+        # Read the token before cancelling it; past the deadline it has already cancelled itself
+        cancelled = cancel.cancelled or isinstance(error, (RequestCancelled, asyncio.CancelledError, GeneratorExit))
+        cancel.cancel()
+        if not cancelled or ticket is None:
+            return
+        saved = max(0.0, ticket.estimate - ticket.work.total)
+        metrics.record_cancelled_work(saved)
+        logger.info(f"[{request_id}] Request abandoned, skipping ~{saved:.1f}s of remaining work")
+    
+    async def GenerateAudio(self, request, context):
+        request_id = str(uuid.uuid4())[:8]
+        
+        try:
+            # Sanitize and validate input
+            story = self._validate(request.story_text)
+            
+            if not story.is_valid:
+                logger.warning(f"[{request_id}] Validation failed: {story.error}")
+                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+                context.set_details(story.error or "Invalid input")
+                return story2audio_pb2.AudioResponse(
+                    status="error", 
+                    audio_base64="", 
+                    message=story.error or "Invalid input"
+                )
+            
+            audio_bytes = await self._render_story(
+                story, request_id, context.time_remaining(), story_id=request.story_id
             )
+            
+            with metrics.time_stage("serialize"):
+                if request.binary:
+                    response = story2audio_pb2.AudioResponse(
+                        status="success",
+                        audio=audio_bytes,
+                        audio_format=AUDIO_FORMAT,
+                        message="Audio generated successfully"
+                    )
+                else:
+                    # Convert to base64
+                    logger.info("Encoding audio to base64...")
+                    audio_base64 = base64.b64encode(audio_bytes).decode("utf-8")
+                    response = story2audio_pb2.AudioResponse(
+                        status="success",
+                        audio_base64=audio_base64,
+                        audio_format=AUDIO_FORMAT,
+                        message="Audio generated successfully"
+                    )
+            logger.info("Audio generation completed successfully")
+            return response
+        except AdmissionRejected as e:
+            context.set_code(admission_status(e))
+            context.set_details(str(e))
+            return story2audio_pb2.AudioResponse(status="error", audio_base64="", message=f"Rejected: {str(e)}")
+        except RequestCancelled as e:
+            logger.warning(f"[{request_id}] Request cancelled: {e}")
+            context.set_code(grpc.StatusCode.CANCELLED)
+            context.set_details(str(e))
+            return story2audio_pb2.AudioResponse(status="error", audio_base64="", message=f"Cancelled: {str(e)}")
+        except WorkspaceQuotaExceeded as e:
+            logger.error(f"[{request_id}] {e}")
+            context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+            context.set_details(str(e))
+            return story2audio_pb2.AudioResponse(status="error", audio_base64="", message=f"Resource error: {str(e)}")
         except ValueError as e:
             logger.error(f"Validation error: {e}")
             context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
@@ -145,18 +497,288 @@ class StoryServiceServicer(story2audio_pb2_grpc.StoryServiceServicer):
             context.set_details(str(e))
             return story2audio_pb2.AudioResponse(status="error", audio_base64="", message=f"Server error: {str(e)}")
 
+    async def GenerateAudioStream(self, request, context):
+        """Stream one AudioFrame per chunk as soon as it has been synthesized."""
+        request_id = str(uuid.uuid4())[:8]
+        story = self._validate(request.story_text)
+        
+        if not story.is_valid:
+            logger.warning(f"[{request_id}] Validation failed: {story.error}")
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, story.error or "Invalid input")
+        
+        word_count = story.word_count
+        logger.info(f"[{request_id}] Processing streaming request: {word_count} words")
+        metrics.start_request(request_id, word_count=word_count)
+        
+        chunks: List[str] = []
+        status, error = "error", "cancelled"
+        failure: Optional[BaseException] = None
+        cancel = CancellationToken(context.time_remaining())
+        ticket: Optional[AdmissionTicket] = None
+        try:
+            async with get_admission_controller().admit(word_count, context.time_remaining()) as ticket:
+                try:
+                    with metrics.time_stage("chunk", ticket.work):
+                        chunks = chunk_story(
+                            story.source,
+                            chunk_size=Config.CHUNK_SIZE,
+                            max_tokens=Config.CHUNK_MAX_TOKENS,
+                            word_spans=story.word_spans
+                        )
+                    enhancer = await self._ensure_enhancer()
+                except ValueError as e:
+                    logger.error(f"[{request_id}] Validation error: {e}")
+                    error = str(e)
+                    await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+                
+                total = len(chunks)
+                stages = self._audio_stages(enhancer, request_id, ticket.work, cancel)
+                frames = run_pipeline(chunks, stages, queue_size=Config.PIPELINE_QUEUE_SIZE)
+                i = 0
+                try:
+                    async for audio in frames:
+                        logger.debug(f"[{request_id}] Streaming chunk {i+1}/{total} ({len(audio)} samples)")
+                        with metrics.time_stage("serialize"):
+                            frame = story2audio_pb2.AudioFrame(
+                                index=i,
+                                audio=to_pcm16(audio),
+                                duration=len(audio) / Config.SAMPLE_RATE,
+                                final=i == total - 1,
+                                sample_rate=Config.SAMPLE_RATE,
+                                encoding="pcm_s16le",
+                                total_chunks=total
+                            )
+                        yield frame
+                        i += 1
+                except RequestCancelled as e:
+                    logger.warning(f"[{request_id}] Request cancelled at chunk {i+1}: {e}")
+                    error = str(e)
+                    await context.abort(grpc.StatusCode.CANCELLED, str(e))
+                except Exception as e:
+                    logger.exception(f"[{request_id}] Audio generation failed for chunk {i+1}: {e}")
+                    error = str(e)
+                    await context.abort(grpc.StatusCode.INTERNAL, f"Audio generation failed: {e}")
+                
+                status, error = "success", None
+                logger.info(f"[{request_id}] Streamed {total} audio frames")
+        except AdmissionRejected as e:
+            error = str(e)
+            await context.abort(admission_status(e), str(e))
+        except BaseException as e:
+            failure = e
+            raise
+        finally:
+            if status != "success":
+                self._abandon(request_id, cancel, ticket, failure)
+            metrics.end_request(request_id, status=status, error=error, chunk_count=len(chunks))
+
+    async def GenerateAudioChunked(self, request, context):
+        """Deliver the final audio as raw bytes in fixed-size pieces."""
+        request_id = str(uuid.uuid4())[:8]
+        story = self._validate(request.story_text)
+        
+        if not story.is_valid:
+            logger.warning(f"[{request_id}] Validation failed: {story.error}")
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, story.error or "Invalid input")
+        
+        try:
+            audio_bytes = await self._render_story(
+                story, request_id, context.time_remaining(), story_id=request.story_id
+            )
+        except AdmissionRejected as e:
+            await context.abort(admission_status(e), str(e))
+        except RequestCancelled as e:
+            await context.abort(grpc.StatusCode.CANCELLED, str(e))
+        except WorkspaceQuotaExceeded as e:
+            logger.error(f"[{request_id}] {e}")
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+        except ValueError as e:
+            logger.error(f"[{request_id}] Validation error: {e}")
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        except FileNotFoundError as e:
+            logger.error(f"[{request_id}] File not found: {e}")
+            await context.abort(grpc.StatusCode.NOT_FOUND, str(e))
+        except Exception as e:
+            logger.exception(f"[{request_id}] Unexpected error during audio generation: {e}")
+            await context.abort(grpc.StatusCode.INTERNAL, str(e))
+        
+        for piece in self._audio_pieces(audio_bytes, request_id):
+            yield piece
+    
+    @staticmethod
+    def _audio_pieces(audio_bytes: bytes, request_id: str) -> Iterator[story2audio_pb2.AudioPiece]:
+        """Split encoded audio into RESPONSE_CHUNK_BYTES pieces."""
+        piece_size = Config.RESPONSE_CHUNK_BYTES
+        total_size = len(audio_bytes)
+        count = max(1, -(-total_size // piece_size))
+        view = memoryview(audio_bytes)
+        for sequence in range(count):
+            with metrics.time_stage("serialize"):
+                piece = story2audio_pb2.AudioPiece(
+                    sequence=sequence,
+                    data=bytes(view[sequence * piece_size:(sequence + 1) * piece_size]),
+                    last=sequence == count - 1,
+                    total_size=total_size,
+                    audio_format=AUDIO_FORMAT
+                )
+            yield piece
+        logger.info(f"[{request_id}] Sent {total_size} bytes in {count} pieces")
+    
+    async def _render_job(self, story_text: str, job_id: str, progress: ProgressTracker) -> bytes:
+        """Render function used by the job manager."""
+        # Stored jobs hold validated text; analysis only recovers its words
+        return await self._render_story(StoryValidator.analyze(story_text), f"job-{job_id[:8]}", progress=progress)
+    
+    @staticmethod
+    def _job_status(job: Job) -> story2audio_pb2.JobStatus:
+        return story2audio_pb2.JobStatus(
+            job_id=job.job_id,
+            state=job.state,
+            progress_current=job.current,
+            progress_total=job.total,
+            message=job.message,
+            audio_size=job.audio_size,
+            audio_format=AUDIO_FORMAT if job.state == JOB_SUCCEEDED else "",
+            created_at=job.created_at,
+            updated_at=job.updated_at
+        )
+    
+    async def _find_job(self, job_id: str, context) -> Job:
+        """Look up a job, aborting the RPC if job RPCs are disabled or the job does not exist."""
+        if self.jobs is None:
+            await context.abort(grpc.StatusCode.UNIMPLEMENTED, "Job API is not enabled on this server")
+        job = await self.jobs.get(job_id)
+        if job is None:
+            await context.abort(grpc.StatusCode.NOT_FOUND, f"Unknown job: {job_id}")
+        return job
+    
+    async def SubmitStory(self, request, context):
+        """Queue a story for background rendering and return its job id immediately."""
+        if self.jobs is None:
+            await context.abort(grpc.StatusCode.UNIMPLEMENTED, "Job API is not enabled on this server")
+        story = self._validate(request.story_text)
+        if not story.is_valid:
+            logger.warning(f"Job validation failed: {story.error}")
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, story.error or "Invalid input")
+        try:
+            # Keep the raw text so the job is chunked along its paragraphs
+            job = await self.jobs.submit(story.source)
+        except JobQueueFull as e:
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+        return self._job_status(job)
+    
+    async def GetJobStatus(self, request, context):
+        """Return the current state and progress of a job."""
+        return self._job_status(await self._find_job(request.job_id, context))
+    
+    async def WatchJob(self, request, context):
+        """Stream a job's status on every change until it finishes."""
+        await self._find_job(request.job_id, context)
+        async for job in self.jobs.watch(request.job_id):
+            yield self._job_status(job)
+    
+    async def FetchAudio(self, request, context):
+        """Deliver a succeeded job's audio in RESPONSE_CHUNK_BYTES pieces."""
+        job = await self._find_job(request.job_id, context)
+        if job.state != JOB_SUCCEEDED:
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, f"Job {job.job_id} is {job.state}")
+        loop = asyncio.get_running_loop()
+        try:
+            audio_bytes = await loop.run_in_executor(None, self.jobs.read_audio, job.job_id)
+        except (KeyError, FileNotFoundError) as e:
+            await context.abort(grpc.StatusCode.NOT_FOUND, f"Audio for job {job.job_id} is no longer available: {e}")
+        for piece in self._audio_pieces(audio_bytes, f"job-{job.job_id[:8]}"):
+            yield piece
+
+def admission_status(error: AdmissionRejected) -> grpc.StatusCode:
+    """Map an admission rejection to the gRPC status returned to the client."""
+    if error.reason == "deadline":
+        return grpc.StatusCode.DEADLINE_EXCEEDED
+    return grpc.StatusCode.RESOURCE_EXHAUSTED
+
+def register_gauges() -> None:
+    """Expose queue depths of the shared stage executors and TTS queues."""
+    metrics.register_gauge("stage_queue_depth", "Tasks waiting for a stage executor worker", queue_depths)
+    metrics.register_gauge("tts_batch_queue_depth", "Chunks waiting in the TTS batching scheduler", tts_scheduler_pending)
+    metrics.register_gauge("tts_pool_in_flight", "Chunks in flight in the TTS worker processes", tts_pool_pending)
+    admission = get_admission_controller()
+    metrics.register_gauge(
+        "admission_work_seconds", "Estimated seconds of work admitted and in flight", lambda: admission.in_flight_work
+    )
+    metrics.register_gauge("admission_waiting", "Requests waiting for work budget", lambda: admission.queued)
+    for counter, help_text in (
+        ("hits", "Content cache lookups answered from memory or disk"),
+        ("misses", "Content cache lookups that found nothing"),
+        ("evictions", "Content cache entries evicted to stay within the size limits"),
+        ("memory_evictions", "Content cache entries evicted from the in-memory tier"),
+    ):
+        metrics.register_gauge(f"cache_{counter}", help_text, partial(content_cache_counter, counter), label="cache")
+
+async def warm_up_and_serve(servicer: StoryServiceServicer, health_servicer) -> None:
+    """Warm up the models, then report SERVING; on failure the server stays NOT_SERVING."""
+    if Config.WARMUP_ON_START:
+        logger.info("Warming up models...")
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(servicer.warm_up(), timeout=Config.WARMUP_TIMEOUT)
+        except Exception as e:
+            logger.exception(f"Warm-up failed, health stays NOT_SERVING: {e}")
+            return
+        logger.info(f"Warm-up finished in {time.perf_counter() - start:.1f}s")
+    await set_serving(health_servicer, True)
+
 async def serve():
-    server = grpc.aio.server(futures.ThreadPoolExecutor(max_workers=Config.MAX_WORKERS))
-    story2audio_pb2_grpc.add_StoryServiceServicer_to_server(StoryServiceServicer(), server)
+    cleanup_stale_workspaces(Config.WORKSPACE_DIR, max_age=Config.WORKSPACE_MAX_AGE)
+    register_gauges()
+    metrics_server = start_metrics_server(Config.METRICS_PORT) if Config.METRICS_PORT else None
+    server = grpc.aio.server(
+        futures.ThreadPoolExecutor(max_workers=Config.MAX_WORKERS),
+        options=[
+            # Accept the keepalive pings pooled clients send on idle channels
+            ('grpc.keepalive_permit_without_calls', 1),
+            ('grpc.http2.min_recv_ping_interval_without_data_ms', Config.GRPC_KEEPALIVE_TIME_MS),
+            ('grpc.http2.max_ping_strikes', 0),
+        ]
+    )
+    servicer = StoryServiceServicer()
+    jobs = JobManager(
+        JobStore(Config.JOB_DB_PATH),
+        servicer._render_job,
+        audio_dir=Config.JOB_AUDIO_DIR,
+        workers=Config.JOB_WORKERS,
+        max_queued=Config.JOB_MAX_QUEUED,
+        retention=Config.JOB_RETENTION_HOURS * 3600,
+        progress_interval=Config.JOB_PROGRESS_INTERVAL_MS / 1000.0,
+        cleanup_interval=Config.JOB_CLEANUP_INTERVAL
+    )
+    servicer.jobs = jobs
+    health_servicer = await create_health_servicer()
+    story2audio_pb2_grpc.add_StoryServiceServicer_to_server(servicer, server)
+    health_pb2_grpc.add_HealthServicer_to_server(health_servicer, server)
     server.add_insecure_port(f"[::]:{Config.GRPC_PORT}")
     await server.start()
     logger.info(f"gRPC server started on port {Config.GRPC_PORT}")
+    await jobs.start()
+    metrics.register_gauge("jobs_queued", "Jobs waiting for a job worker", lambda: jobs.queued)
+    # Health checks are answered (NOT_SERVING) while the models warm up
+    warm_up_task = asyncio.create_task(warm_up_and_serve(servicer, health_servicer))
     try:
         from src.version import __version__
         logger.info(f"Story2Audio version {__version__}")
     except ImportError:
         pass
-    await server.wait_for_termination()
+    try:
+        await server.wait_for_termination()
+    finally:
+        warm_up_task.cancel()
+        await health_servicer.enter_graceful_shutdown()
+        await jobs.stop()
+        jobs.store.close()
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        stop_tts_scheduler()
+        shutdown_tts_pool()
+        shutdown_executors(wait=False)
 
 if __name__ == "__main__":
     asyncio.run(serve())
\ No newline at end of file
@@ -23,27 +23,87 @@ class Config:
     GRPC_PORT: int = int(os.getenv("GRPC_PORT", "50051"))
     MAX_WORKERS: int = int(os.getenv("MAX_WORKERS", "10"))
     GRPC_MAX_MESSAGE_LENGTH: int = int(os.getenv("GRPC_MAX_MESSAGE_LENGTH", "4194304"))  # 4MB
+    RESPONSE_CHUNK_BYTES: int = int(os.getenv("RESPONSE_CHUNK_BYTES", "262144"))  # 256KB pieces
+    GRPC_KEEPALIVE_TIME_MS: int = int(os.getenv("GRPC_KEEPALIVE_TIME_MS", "30000"))
+    GRPC_KEEPALIVE_TIMEOUT_MS: int = int(os.getenv("GRPC_KEEPALIVE_TIMEOUT_MS", "10000"))
     
     # Pipeline settings
     CHUNK_SIZE: int = int(os.getenv("CHUNK_SIZE", "150"))
     MAX_WORDS: int = int(os.getenv("MAX_WORDS", "1000"))
     CHUNK_OVERLAP: int = int(os.getenv("CHUNK_OVERLAP", "0"))
+    # Estimated TTS tokens (characters) per chunk; Kokoro splits inputs over 510 tokens
+    CHUNK_MAX_TOKENS: int = int(os.getenv("CHUNK_MAX_TOKENS", "480"))
+    
+    PIPELINE_QUEUE_SIZE: int = int(os.getenv("PIPELINE_QUEUE_SIZE", "2"))
+    
+    # Per-stage concurrency limits (threads shared by all requests)
+    ENHANCE_WORKERS: int = int(os.getenv("ENHANCE_WORKERS", "1"))
+    TTS_WORKERS: int = int(os.getenv("TTS_WORKERS", "2"))
+    ENCODE_WORKERS: int = int(os.getenv("ENCODE_WORKERS", "2"))
     
     # Model settings
     ENHANCER_MODEL: str = os.getenv("ENHANCER_MODEL", "tiiuae/falcon-rw-1b")
     TTS_MODEL: str = os.getenv("TTS_MODEL", "hexgrad/Kokoro-82M")
     MODEL_CACHE_DIR: Optional[str] = os.getenv("MODEL_CACHE_DIR")
     
+    # Model backends ("stub" emulates model latency without loading weights)
+    ENHANCER_BACKEND: str = os.getenv("ENHANCER_BACKEND", "local")
+    TTS_BACKEND: str = os.getenv("TTS_BACKEND", "kokoro")
+    STUB_ENHANCER_MS_PER_TOKEN: float = float(os.getenv("STUB_ENHANCER_MS_PER_TOKEN", "20"))
+    STUB_TTS_MS_PER_CHAR: float = float(os.getenv("STUB_TTS_MS_PER_CHAR", "2"))
+    STUB_TTS_SAMPLES_PER_CHAR: int = int(os.getenv("STUB_TTS_SAMPLES_PER_CHAR", "1600"))
+    
+    # TTS settings
+    TTS_VOICE: str = os.getenv("TTS_VOICE", "af_heart")
+    SAMPLE_RATE: int = int(os.getenv("SAMPLE_RATE", "24000"))
+    
+    # Cross-request TTS micro-batching
+    TTS_BATCHING: bool = os.getenv("TTS_BATCHING", "false").lower() == "true"
+    TTS_MAX_BATCH_SIZE: int = int(os.getenv("TTS_MAX_BATCH_SIZE", "8"))
+    TTS_MAX_WAIT_MS: float = float(os.getenv("TTS_MAX_WAIT_MS", "5"))
+    
+    # Multi-process TTS (0 = synthesize in threads of the server process)
+    TTS_PROCESS_WORKERS: int = int(os.getenv("TTS_PROCESS_WORKERS", "0"))
+    TTS_TORCH_THREADS: int = int(os.getenv("TTS_TORCH_THREADS", "1"))
+    
     # Enhancement settings
     ENHANCEMENT_MAX_TOKENS: int = int(os.getenv("ENHANCEMENT_MAX_TOKENS", "50"))
     ENHANCEMENT_TEMPERATURE: float = float(os.getenv("ENHANCEMENT_TEMPERATURE", "0.7"))
     ENHANCEMENT_TOP_P: float = float(os.getenv("ENHANCEMENT_TOP_P", "0.9"))
+    ENHANCEMENT_BATCH_SIZE: int = int(os.getenv("ENHANCEMENT_BATCH_SIZE", "4"))
     
     # Output settings
     OUTPUT_DIR: str = os.getenv("OUTPUT_DIR", "outputs/temp")
     FINAL_AUDIO_NAME: str = os.getenv("FINAL_AUDIO_NAME", "final_audio.mp3")
     AUDIO_BITRATE: str = os.getenv("AUDIO_BITRATE", "192k")
     AUDIO_FADE_DURATION: int = int(os.getenv("AUDIO_FADE_DURATION", "100"))
+    AUDIO_CROSSFADE_DURATION: int = int(os.getenv("AUDIO_CROSSFADE_DURATION", "0"))  # overlap between chunks
+    IN_MEMORY_AUDIO: bool = os.getenv("IN_MEMORY_AUDIO", "true").lower() == "true"
+    
+    # Admission control (estimated seconds of work allowed in flight, 0 = unlimited)
+    ADMISSION_MAX_WORK: float = float(os.getenv("ADMISSION_MAX_WORK", "120"))
+    ADMISSION_QUEUE_TIMEOUT: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10"))
+    ADMISSION_COST_PER_WORD: float = float(os.getenv("ADMISSION_COST_PER_WORD", "0.035"))  # initial estimate
+    ADMISSION_SMOOTHING: float = float(os.getenv("ADMISSION_SMOOTHING", "0.2"))
+    
+    # Asynchronous jobs (SubmitStory / GetJobStatus / WatchJob / FetchAudio)
+    JOB_DB_PATH: str = os.getenv("JOB_DB_PATH", "outputs/jobs/jobs.db")
+    JOB_AUDIO_DIR: str = os.getenv("JOB_AUDIO_DIR", "outputs/jobs")
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_MAX_QUEUED: int = int(os.getenv("JOB_MAX_QUEUED", "1000"))
+    JOB_RETENTION_HOURS: float = float(os.getenv("JOB_RETENTION_HOURS", "24"))
+    JOB_PROGRESS_INTERVAL_MS: float = float(os.getenv("JOB_PROGRESS_INTERVAL_MS", "500"))  # min gap between progress writes
+    JOB_CLEANUP_INTERVAL: float = float(os.getenv("JOB_CLEANUP_INTERVAL", "300"))  # seconds between expiry sweeps
+    
+    # Startup warm-up: readiness stays NOT_SERVING until both models ran once
+    WARMUP_ON_START: bool = os.getenv("WARMUP_ON_START", "true").lower() == "true"
+    WARMUP_TIMEOUT: float = float(os.getenv("WARMUP_TIMEOUT", "600"))
+    
+    # Per-request workspaces
+    WORKSPACE_DIR: str = os.getenv("WORKSPACE_DIR", OUTPUT_DIR)
+    WORKSPACE_QUOTA_MB: int = int(os.getenv("WORKSPACE_QUOTA_MB", "200"))  # 0 = unlimited
+    WORKSPACE_MAX_AGE: int = int(os.getenv("WORKSPACE_MAX_AGE", "3600"))  # stale after 1 hour
+    KEEP_WORKSPACES: bool = os.getenv("KEEP_WORKSPACES", "false").lower() == "true"
     
     # Retry settings
     RETRY_MAX_ATTEMPTS: int = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
@@ -60,6 +120,22 @@ class Config:
     # Performance
     ENABLE_CACHING: bool = os.getenv("ENABLE_CACHING", "false").lower() == "true"
     CACHE_TTL: int = int(os.getenv("CACHE_TTL", "3600"))  # 1 hour
+    CACHE_DIR: str = os.getenv("CACHE_DIR", "outputs/cache")  # empty = memory only
+    CACHE_MEMORY_MB: int = int(os.getenv("CACHE_MEMORY_MB", "128"))
+    CACHE_MAX_DISK_MB: int = int(os.getenv("CACHE_MAX_DISK_MB", "1024"))
+    CACHE_VERSION: str = os.getenv("CACHE_VERSION", "1")  # bump to invalidate cached audio
+    
+    # Edit-aware re-rendering: chunk layouts and audio of the last version of each story_id
+    REVISION_DIR: str = os.getenv("REVISION_DIR", "outputs/revisions")  # empty = memory only
+    REVISION_MEMORY_MB: int = int(os.getenv("REVISION_MEMORY_MB", "256"))
+    REVISION_MAX_DISK_MB: int = int(os.getenv("REVISION_MAX_DISK_MB", "2048"))
+    
+    # Metrics exposition (Prometheus text format on a side port, 0 = disabled)
+    METRICS_PORT: int = int(os.getenv("METRICS_PORT", "9464"))
+    METRICS_BUCKETS: str = os.getenv(
+        "METRICS_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10,30,60"
+    )  # histogram bounds in seconds
+    METRICS_RECENT_REQUESTS: int = int(os.getenv("METRICS_RECENT_REQUESTS", "1000"))  # ring buffer size
     
     # Audio quality
     NORMALIZE_AUDIO: bool = os.getenv("NORMALIZE_AUDIO", "true").lower() == "true"
@@ -80,12 +156,59 @@ class Config:
         if cls.MAX_WORKERS < 1:
             errors.append(f"MAX_WORKERS must be at least 1, got {cls.MAX_WORKERS}")
         
+        if cls.ADMISSION_MAX_WORK < 0 or cls.ADMISSION_QUEUE_TIMEOUT < 0 or cls.ADMISSION_COST_PER_WORD <= 0:
+            errors.append("ADMISSION_MAX_WORK and ADMISSION_QUEUE_TIMEOUT must be non-negative, ADMISSION_COST_PER_WORD positive")
+        
+        if not 0 < cls.ADMISSION_SMOOTHING <= 1:
+            errors.append(f"ADMISSION_SMOOTHING must be in (0, 1], got {cls.ADMISSION_SMOOTHING}")
+        
+        if cls.JOB_WORKERS < 1 or cls.JOB_MAX_QUEUED < 1:
+            errors.append("JOB_WORKERS and JOB_MAX_QUEUED must be at least 1")
+        if cls.JOB_PROGRESS_INTERVAL_MS < 0 or cls.JOB_CLEANUP_INTERVAL <= 0:
+            errors.append("JOB_PROGRESS_INTERVAL_MS must not be negative and JOB_CLEANUP_INTERVAL must be positive")
+        
+        if cls.REVISION_MEMORY_MB < 1 or cls.REVISION_MAX_DISK_MB < 1:
+            errors.append("REVISION_MEMORY_MB and REVISION_MAX_DISK_MB must be at least 1")
+        
+        if cls.METRICS_PORT and not 1024 <= cls.METRICS_PORT <= 65535:
+            errors.append(f"METRICS_PORT must be 0 or between 1024 and 65535, got {cls.METRICS_PORT}")
+        
+        if cls.STUB_ENHANCER_MS_PER_TOKEN < 0 or cls.STUB_TTS_MS_PER_CHAR < 0 or cls.STUB_TTS_SAMPLES_PER_CHAR < 1:
+            errors.append("Stub backend latencies must be non-negative and STUB_TTS_SAMPLES_PER_CHAR at least 1")
+        
+        if not 0 < cls.RESPONSE_CHUNK_BYTES <= cls.GRPC_MAX_MESSAGE_LENGTH:
+            errors.append(
+                f"RESPONSE_CHUNK_BYTES must be between 1 and GRPC_MAX_MESSAGE_LENGTH, got {cls.RESPONSE_CHUNK_BYTES}"
+            )
+        
         if cls.CHUNK_SIZE < 10:
             errors.append(f"CHUNK_SIZE must be at least 10, got {cls.CHUNK_SIZE}")
         
+        if cls.CHUNK_MAX_TOKENS < 50:
+            errors.append(f"CHUNK_MAX_TOKENS must be at least 50, got {cls.CHUNK_MAX_TOKENS}")
+        
         if cls.MAX_WORDS < cls.CHUNK_SIZE:
             errors.append(f"MAX_WORDS ({cls.MAX_WORDS}) must be >= CHUNK_SIZE ({cls.CHUNK_SIZE})")
         
+        for name in ("ENHANCE_WORKERS", "TTS_WORKERS", "ENCODE_WORKERS"):
+            if getattr(cls, name) < 1:
+                errors.append(f"{name} must be at least 1, got {getattr(cls, name)}")
+        
+        if cls.TTS_PROCESS_WORKERS < 0:
+            errors.append(f"TTS_PROCESS_WORKERS must be non-negative, got {cls.TTS_PROCESS_WORKERS}")
+        
+        if cls.ENHANCEMENT_BATCH_SIZE < 1:
+            errors.append(f"ENHANCEMENT_BATCH_SIZE must be at least 1, got {cls.ENHANCEMENT_BATCH_SIZE}")
+        
+        if not 0 <= cls.AUDIO_CROSSFADE_DURATION <= cls.AUDIO_FADE_DURATION:
+            errors.append(
+                f"AUDIO_CROSSFADE_DURATION must be between 0 and AUDIO_FADE_DURATION ({cls.AUDIO_FADE_DURATION}), "
+                f"got {cls.AUDIO_CROSSFADE_DURATION}"
+            )
+        
+        if cls.WORKSPACE_QUOTA_MB < 0:
+            errors.append(f"WORKSPACE_QUOTA_MB must be non-negative, got {cls.WORKSPACE_QUOTA_MB}")
+        
         if errors:
             for error in errors:
                 logger.error(f"Configuration error: {error}")
@@ -94,15 +217,19 @@ class Config:
         return True
     
     @classmethod
-    def get_output_path(cls) -> str:
+    def get_output_path(cls, request_id: Optional[str] = None) -> str:
         """
         Get the full path for final audio output.
         
+        Args:
+            request_id: If given, the path is inside that request's workspace
+        
         Returns:
             Full path to output file
         """
-        os.makedirs(cls.OUTPUT_DIR, exist_ok=True)
-        return os.path.join(cls.OUTPUT_DIR, cls.FINAL_AUDIO_NAME)
+        output_dir = os.path.join(cls.WORKSPACE_DIR, request_id) if request_id else cls.OUTPUT_DIR
+        os.makedirs(output_dir, exist_ok=True)
+        return os.path.join(output_dir, cls.FINAL_AUDIO_NAME)
     
     @classmethod
     def to_dict(cls) -> Dict[str, Any]:
@@ -116,6 +243,7 @@ class Config:
             "grpc_port": cls.GRPC_PORT,
             "max_workers": cls.MAX_WORKERS,
             "chunk_size": cls.CHUNK_SIZE,
+            "chunk_max_tokens": cls.CHUNK_MAX_TOKENS,
             "max_words": cls.MAX_WORDS,
             "enhancer_model": cls.ENHANCER_MODEL,
             "tts_model": cls.TTS_MODEL,
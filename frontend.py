@@ -1,5 +1,4 @@
 import gradio as gr
-import asyncio
 import base64
 import os
 import re
@@ -86,13 +85,18 @@ with gr.Blocks(css=custom_css, title="Story2Audio") as demo:
             download_output = gr.File(label="Download Audio")
             status_output = gr.Textbox(label="Status", interactive=False)
     
-    submit_btn = gr.Button("Generate Audio", variant="primary", size="lg")
+    with gr.Row():
+        submit_btn = gr.Button("Generate Audio", variant="primary", size="lg")
+        stop_btn = gr.Button("Stop", variant="stop", size="lg")
     
-    submit_btn.click(
-        fn=lambda x: asyncio.run(process_story(x)),
+    # Run the coroutine on Gradio's event loop so Stop can cancel it; cancelling
+    # the gRPC call makes the server stop synthesizing the abandoned story
+    generate_event = submit_btn.click(
+        fn=process_story,
         inputs=story_input,
         outputs=[audio_output, download_output, status_output, status_output]
     )
+    stop_btn.click(fn=None, cancels=[generate_event])
     
     # Add word count display
     word_count = gr.Textbox(label="Word Count", value="0", interactive=False)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for request text handling.
+
+Validation: the previous sanitize and validate code (copied below: regex
+sanitize, line split/join, validation with its own word list and a second
+split for the word count) against StoryValidator.analyze.
+
+Validation plus chunking: both paths use the current chunker, so the
+comparison isolates its input. One chunks the sanitized text and lets the
+chunker split it into words again; the other passes the analysis's source
+text and word spans. The chunker itself is not benchmarked here.
+
+Usage:
+    python -m scripts.bench_validation --chars 50000 --repeat 200
+"""
+import argparse
+import re
+import statistics
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.preprocess import chunk_story
+from src.validators import StoryValidator
+
+SAMPLE = (
+    "Once upon a time, in a  quiet village by the sea, there lived an old fisherman.\n"
+    "Every morning he rowed out before dawn;  every evening he came home with his nets full.\n\n"
+    '"Why do you still go out?" asked his grandson. "Because the sea expects me," he said.\t'
+)
+
+
+def make_text(chars: int) -> str:
+    """Story text of about chars characters with irregular whitespace."""
+    return (SAMPLE * (chars // len(SAMPLE) + 1))[:chars]
+
+
+def legacy_sanitize(text: str) -> str:
+    """StoryValidator.sanitize_text before single-pass analysis."""
+    if not text:
+        return ""
+    text = re.sub(r'\s+', ' ', text.strip())
+    lines = [line.strip() for line in text.split('\n')]
+    text = '\n'.join(lines)
+    return text.strip()
+
+
+def legacy_validate(text: str) -> Tuple[bool, Optional[str]]:
+    """StoryValidator.validate_story_text before single-pass analysis."""
+    v = StoryValidator
+    if not text:
+        return False, "Story text cannot be empty"
+    text = text.strip()
+    if len(text) < v.MIN_CHARS or len(text) > v.MAX_CHARS:
+        return False, "length"
+    words = text.split()
+    if len(words) < v.MIN_WORDS or len(words) > v.MAX_WORDS:
+        return False, "words"
+    if v.ONLY_NUMBERS_PATTERN.match(text) or v.ONLY_SPECIAL_CHARS_PATTERN.match(text):
+        return False, "content"
+    if v.EXCESSIVE_WHITESPACE_PATTERN.search(text):
+        return False, "whitespace"
+    if len(text.split('\n')) > v.MAX_LINES:
+        return False, "lines"
+    meaningful_words = [w for w in words if len(w) > 1 and w.isalnum()]
+    if len(meaningful_words) < v.MIN_WORDS:
+        return False, "meaningful"
+    return True, None
+
+
+def legacy_validation(text: str) -> Tuple[str, int]:
+    """Sanitize, validate and count words the way the server used to."""
+    story = legacy_sanitize(text)
+    legacy_validate(story)
+    return story, len(story.split())
+
+
+def analyzed_validation(text: str) -> Tuple[str, int]:
+    """Sanitize, validate and count words with one analysis, including the word spans chunking reuses."""
+    story = StoryValidator.analyze(text)
+    story.word_spans
+    return story.text, story.word_count
+
+
+def resplit_request(text: str, chunk_size: int, max_tokens: int) -> List[str]:
+    """Previous validation, then chunking that splits the sanitized text into words again."""
+    story, _ = legacy_validation(text)
+    return chunk_story(story, chunk_size=chunk_size, max_tokens=max_tokens)
+
+
+def analyzed_request(text: str, chunk_size: int, max_tokens: int) -> List[str]:
+    """One analysis whose word spans the chunker reuses."""
+    story = StoryValidator.analyze(text)
+    return chunk_story(story.source, chunk_size=chunk_size, max_tokens=max_tokens, word_spans=story.word_spans)
+
+
+def time_call(fn: Callable[[], object], repeat: int) -> float:
+    """Median seconds per call."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def run(chars: int = 50000, repeat: int = 200, chunk_size: int = 150, max_tokens: int = 480) -> Dict[str, float]:
+    """
+    Time validation alone and validation plus chunking for both paths.
+
+    Raises:
+        RuntimeError: If the two paths disagree on the text, word count or chunks
+    """
+    text = make_text(chars)
+    if legacy_validation(text) != analyzed_validation(text):
+        raise RuntimeError("Legacy and analyzed validation disagree on the normalized text or word count")
+    if resplit_request(text, chunk_size, max_tokens) != analyzed_request(text, chunk_size, max_tokens):
+        raise RuntimeError("Re-splitting and analyzed requests produce different chunks")
+    return {
+        "legacy_validate": time_call(lambda: legacy_validation(text), repeat),
+        "analyze": time_call(lambda: analyzed_validation(text), repeat),
+        "resplit_request": time_call(lambda: resplit_request(text, chunk_size, max_tokens), repeat),
+        "analyzed_request": time_call(lambda: analyzed_request(text, chunk_size, max_tokens), repeat),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark story validation and chunking")
+    parser.add_argument("--chars", type=int, default=50000, help="Input size in characters")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed runs per variant")
+    args = parser.parse_args()
+
+    results = run(args.chars, args.repeat)
+    print(f"{args.chars} characters, median of {args.repeat} runs")
+    print(f"  validate   legacy {results['legacy_validate'] * 1000:7.3f} ms   "
+          f"analyze {results['analyze'] * 1000:7.3f} ms   "
+          f"({results['legacy_validate'] / results['analyze']:.1f}x)")
+    print(f"  + chunking resplit {results['resplit_request'] * 1000:6.3f} ms   "
+          f"analyze {results['analyzed_request'] * 1000:7.3f} ms   "
+          f"({results['resplit_request'] / results['analyzed_request']:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,108 +1,341 @@
 #!/usr/bin/env python3
 """
-Benchmark script for Story2Audio service.
+Load-test harness for Story2Audio service.
 
-Measures performance metrics for audio generation.
+Drives the gRPC service at several concurrency levels (closed loop) or
+arrival rates (open loop) and records latency percentiles, time to first
+byte, throughput and error rate for each level. Results are written as JSON
+and can be plotted with Tests/plot_performance.py.
+
+Usage:
+    python -m scripts.benchmark --concurrency 1,2,4,8 -n 20 --output results.json
+    python -m scripts.benchmark --mode open --rates 0.5,1,2 --duration 60 --rpc stream
 """
 import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
 import time
-import statistics
-from typing import List
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Sequence
+
 from api.grpc_client import Story2AudioClient
 
+DEFAULT_STORY = "Once upon a time, in a magical forest, there lived a wise old owl. " * 10
+RPC_MODES = ("unary", "stream", "chunked")
+
+
+@dataclass
+class RequestResult:
+    """Outcome of a single request."""
+    start: float
+    latency: float
+    ttfb: float
+    success: bool
+    audio_size: int = 0
+    error: Optional[str] = None
+
+
+async def measure_request(
+    client: Story2AudioClient,
+    story_text: str,
+    rpc: str = "unary",
+    timeout: Optional[float] = 300
+) -> RequestResult:
+    """
+    Send one request and time it.
 
-async def benchmark_request(client: Story2AudioClient, story_text: str) -> dict:
-    """Benchmark a single request."""
-    start_time = time.time()
+    For the streaming RPCs the time to first byte is the arrival of the first
+    message; for the unary RPC it equals the full latency.
+    """
+    start = time.perf_counter()
+    ttfb = None
+    size = 0
     try:
-        audio_base64, status, message = await client.generate_audio(story_text, timeout=300)
-        duration = time.time() - start_time
-        
-        return {
-            "duration": duration,
-            "status": status,
-            "success": status == "success",
-            "audio_size": len(audio_base64) if audio_base64 else 0,
-            "error": message if status != "success" else None
-        }
+        if rpc == "unary":
+            audio_base64, status, message = await client.generate_audio(story_text, timeout=timeout)
+            if status != "success":
+                raise RuntimeError(message)
+            size = len(audio_base64)
+        else:
+            if rpc == "stream":
+                messages = client.stream_audio(story_text, timeout=timeout)
+            else:
+                messages = client.stream_audio_pieces(story_text, timeout=timeout)
+            async for message in messages:
+                if ttfb is None:
+                    ttfb = time.perf_counter() - start
+                size += len(message.audio if rpc == "stream" else message.data)
+        latency = time.perf_counter() - start
+        return RequestResult(start, latency, ttfb if ttfb is not None else latency, True, size)
     except Exception as e:
-        return {
-            "duration": time.time() - start_time,
-            "status": "error",
-            "success": False,
-            "audio_size": 0,
-            "error": str(e)
-        }
+        latency = time.perf_counter() - start
+        return RequestResult(start, latency, ttfb if ttfb is not None else latency, False, size, str(e))
+
+
+async def run_closed_loop(
+    client: Story2AudioClient,
+    stories: Sequence[str],
+    concurrency: int,
+    num_requests: int,
+    rpc: str = "unary",
+    timeout: Optional[float] = 300
+) -> List[RequestResult]:
+    """
+    Keep `concurrency` requests in flight until `num_requests` have completed.
+
+    Each virtual user sends its next request as soon as the previous one
+    returns, so load adapts to how fast the server responds.
+    """
+    results: List[RequestResult] = []
+    counter = iter(range(num_requests))
+
+    async def user() -> None:
+        for i in counter:
+            results.append(await measure_request(client, stories[i % len(stories)], rpc, timeout))
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return results
+
+
+async def run_open_loop(
+    client: Story2AudioClient,
+    stories: Sequence[str],
+    rate: float,
+    duration: float,
+    rpc: str = "unary",
+    timeout: Optional[float] = 300,
+    seed: Optional[int] = None
+) -> List[RequestResult]:
+    """
+    Start requests with Poisson arrivals at `rate` per second for `duration` seconds.
+
+    Arrivals do not wait for earlier requests, so queueing delay shows up in
+    the latency once the offered load exceeds the server's capacity.
+    """
+    rng = random.Random(seed)
+    tasks = []
+    end = time.perf_counter() + duration
+    i = 0
+    while True:
+        await asyncio.sleep(rng.expovariate(rate))
+        if time.perf_counter() >= end:
+            break
+        tasks.append(asyncio.create_task(measure_request(client, stories[i % len(stories)], rpc, timeout)))
+        i += 1
+    return list(await asyncio.gather(*tasks))
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Linear-interpolated percentile (q in 0..100) of a non-empty sequence."""
+    ordered = sorted(values)
+    if not ordered:
+        raise ValueError("percentile of empty sequence")
+    position = (len(ordered) - 1) * q / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(results: Sequence[RequestResult], elapsed: float) -> Dict[str, float]:
+    """Aggregate request results of one load level."""
+    successful = [r for r in results if r.success]
+    summary: Dict[str, float] = {
+        "requests": len(results),
+        "successful": len(successful),
+        "error_rate": (len(results) - len(successful)) / len(results) if results else 0.0,
+        "elapsed": elapsed,
+        "throughput_rps": len(successful) / elapsed if elapsed > 0 else 0.0,
+    }
+    if successful:
+        latencies = [r.latency for r in successful]
+        ttfbs = [r.ttfb for r in successful]
+        summary.update({
+            "latency_mean": sum(latencies) / len(latencies),
+            "latency_max": max(latencies),
+            "audio_bytes_mean": sum(r.audio_size for r in successful) / len(successful),
+        })
+        for q in (50, 90, 99):
+            summary[f"latency_p{q}"] = percentile(latencies, q)
+            summary[f"ttfb_p{q}"] = percentile(ttfbs, q)
+    return summary
 
 
 async def run_benchmark(
+    addresses: Sequence[str],
+    mode: str = "closed",
+    levels: Sequence[float] = (1,),
     num_requests: int = 10,
-    story_text: str = None,
-    host: str = "localhost",
-    port: int = 50051
-):
-    """Run benchmark tests."""
-    if story_text is None:
-        story_text = "Once upon a time, in a magical forest, there lived a wise old owl. " * 10
-    
-    client = Story2AudioClient(host=host, port=port)
-    
-    print(f"Running benchmark: {num_requests} requests")
-    print(f"Story length: {len(story_text.split())} words")
-    print("-" * 50)
-    
-    results: List[dict] = []
-    
-    for i in range(num_requests):
-        print(f"Request {i+1}/{num_requests}...", end=" ", flush=True)
-        result = await benchmark_request(client, story_text)
-        results.append(result)
-        
-        if result["success"]:
-            print(f"✓ {result['duration']:.2f}s")
-        else:
-            print(f"✗ {result['error']}")
-    
-    # Calculate statistics
-    successful = [r for r in results if r["success"]]
-    
-    if successful:
-        durations = [r["duration"] for r in successful]
-        audio_sizes = [r["audio_size"] for r in successful]
-        
-        print("\n" + "=" * 50)
-        print("Benchmark Results")
-        print("=" * 50)
-        print(f"Total requests: {num_requests}")
-        print(f"Successful: {len(successful)}")
-        print(f"Failed: {num_requests - len(successful)}")
-        print(f"Success rate: {len(successful)/num_requests*100:.1f}%")
-        print(f"\nDuration Statistics:")
-        print(f"  Min: {min(durations):.2f}s")
-        print(f"  Max: {max(durations):.2f}s")
-        print(f"  Mean: {statistics.mean(durations):.2f}s")
-        print(f"  Median: {statistics.median(durations):.2f}s")
-        print(f"  Std Dev: {statistics.stdev(durations):.2f}s")
-        print(f"\nAudio Size Statistics:")
-        print(f"  Mean: {statistics.mean(audio_sizes)/1024:.2f} KB")
-        print(f"  Min: {min(audio_sizes)/1024:.2f} KB")
-        print(f"  Max: {max(audio_sizes)/1024:.2f} KB")
+    duration: float = 30.0,
+    rpc: str = "unary",
+    stories: Optional[Sequence[str]] = None,
+    timeout: Optional[float] = 300,
+    warmup: int = 1
+) -> Dict:
+    """
+    Run one load level after another and collect their summaries.
 
+    Args:
+        addresses: "host:port" targets of the service
+        mode: "closed" (levels are concurrency) or "open" (levels are requests/s)
+        levels: Concurrency levels or arrival rates to test
+        num_requests: Requests per level in closed-loop mode
+        duration: Seconds per level in open-loop mode
+        rpc: "unary", "stream" or "chunked"
+        stories: Story texts to cycle through
+        timeout: Per-request timeout in seconds
+        warmup: Requests sent (and discarded) before measuring
 
-if __name__ == "__main__":
+    Returns:
+        Dict with the run configuration and one entry per level
+    """
+    if mode not in ("closed", "open"):
+        raise ValueError(f"Unknown mode: {mode}")
+    if rpc not in RPC_MODES:
+        raise ValueError(f"Unknown rpc: {rpc}")
+    stories = list(stories or [DEFAULT_STORY])
+
+    runs = []
+    async with Story2AudioClient(addresses=addresses) as client:
+        for _ in range(warmup):
+            await measure_request(client, stories[0], rpc, timeout)
+
+        for level in levels:
+            start = time.perf_counter()
+            if mode == "closed":
+                results = await run_closed_loop(client, stories, int(level), num_requests, rpc, timeout)
+            else:
+                results = await run_open_loop(client, stories, float(level), duration, rpc, timeout)
+            summary = summarize(results, time.perf_counter() - start)
+            errors = sorted({r.error for r in results if r.error})
+            runs.append({"level": level, **summary, "errors": errors[:5]})
+            print(format_summary(mode, level, summary), flush=True)
+
+    return {
+        "mode": mode,
+        "rpc": rpc,
+        "addresses": list(addresses),
+        "story_words": [len(story.split()) for story in stories],
+        "num_requests": num_requests if mode == "closed" else None,
+        "duration": duration if mode == "open" else None,
+        "timestamp": time.time(),
+        "runs": runs,
+    }
+
+
+def format_summary(mode: str, level: float, summary: Dict[str, float]) -> str:
+    """One-line human-readable summary of a load level."""
+    label = f"concurrency={int(level)}" if mode == "closed" else f"rate={level}/s"
+    line = (
+        f"{label:<16} requests={summary['requests']:<5} errors={summary['error_rate'] * 100:5.1f}% "
+        f"throughput={summary['throughput_rps']:.2f}/s"
+    )
+    if "latency_p50" in summary:
+        line += (
+            f" p50={summary['latency_p50']:.2f}s p90={summary['latency_p90']:.2f}s"
+            f" p99={summary['latency_p99']:.2f}s ttfb_p50={summary['ttfb_p50']:.2f}s"
+        )
+    return line
+
+
+def spawn_server(port: int, env: Dict[str, str], startup_timeout: float = 120.0) -> subprocess.Popen:
+    """
+    Start a local server process and wait until its port accepts connections.
+
+    Args:
+        port: Port for the server to listen on
+        env: Extra environment variables for the server (e.g. backend selection)
+        startup_timeout: Seconds to wait for the port to open
+    """
+    server_env = {**os.environ, **env, "GRPC_PORT": str(port)}
+    process = subprocess.Popen([sys.executable, "-m", "api.server"], env=server_env)
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            with socket.create_connection(("localhost", port), timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"Server did not start within {startup_timeout}s")
+
+
+def _parse_levels(value: str) -> List[float]:
+    return [float(level) for level in value.split(",") if level.strip()]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
     import argparse
-    
-    parser = argparse.ArgumentParser(description="Benchmark Story2Audio service")
-    parser.add_argument("-n", "--num-requests", type=int, default=10, help="Number of requests")
+
+    parser = argparse.ArgumentParser(description="Load-test Story2Audio service")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed",
+                        help="closed: fixed concurrency, open: fixed arrival rate")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Comma-separated concurrency levels (closed loop)")
+    parser.add_argument("--rates", default="0.5,1,2", help="Comma-separated arrival rates in requests/s (open loop)")
+    parser.add_argument("-n", "--num-requests", type=int, default=10, help="Requests per level (closed loop)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per level (open loop)")
+    parser.add_argument("--rpc", choices=RPC_MODES, default="unary", help="RPC to exercise")
     parser.add_argument("--host", default="localhost", help="Server host")
     parser.add_argument("--port", type=int, default=50051, help="Server port")
+    parser.add_argument("--address", action="append", help="host:port target (repeat to round-robin)")
     parser.add_argument("--story", help="Custom story text")
-    
-    args = parser.parse_args()
-    
-    asyncio.run(run_benchmark(
-        num_requests=args.num_requests,
-        story_text=args.story,
-        host=args.host,
-        port=args.port
-    ))
+    parser.add_argument("--story-file", help="File with one story per line")
+    parser.add_argument("--timeout", type=float, default=300, help="Per-request timeout in seconds")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured warm-up requests")
+    parser.add_argument("--output", help="Write results JSON to this path")
+    parser.add_argument("--plot", help="Write a latency graph (PNG) to this path")
+    parser.add_argument("--spawn-server", action="store_true", help="Start a local server for the run")
+    parser.add_argument("--server-env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Environment variable for the spawned server (repeatable)")
+    args = parser.parse_args(argv)
+
+    stories = None
+    if args.story_file:
+        with open(args.story_file, encoding="utf-8") as f:
+            stories = [line.strip() for line in f if line.strip()]
+    elif args.story:
+        stories = [args.story]
+
+    levels = _parse_levels(args.concurrency if args.mode == "closed" else args.rates)
+    addresses = args.address or [f"{args.host}:{args.port}"]
+
+    server = None
+    if args.spawn_server:
+        env = dict(item.split("=", 1) for item in args.server_env)
+        server = spawn_server(args.port, env)
+        addresses = [f"localhost:{args.port}"]
+    try:
+        results = asyncio.run(run_benchmark(
+            addresses,
+            mode=args.mode,
+            levels=levels,
+            num_requests=args.num_requests,
+            duration=args.duration,
+            rpc=args.rpc,
+            stories=stories,
+            timeout=args.timeout,
+            warmup=args.warmup
+        ))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    if args.plot:
+        from Tests.plot_performance import plot_results
+        plot_results(results, args.plot)
+        print(f"Graph written to {args.plot}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
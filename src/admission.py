@@ -0,0 +1,239 @@
+"""
+Admission control for Story2Audio.
+
+Each request is charged an estimated amount of work (word count times a
+per-word cost) while it is in flight. Requests that would push the total
+over a budget wait in a FIFO queue for a bounded time and are then rejected,
+and requests whose client deadline cannot be met are dropped before any
+inference starts. Two per-word costs calibrate themselves from finished
+requests: the summed stage time charges the work budget, while the measured
+wall time (stages overlap, so it is usually shorter) is what gets compared
+with the client's deadline.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+from config import Config
+from src.metrics import StageTotals
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when a request is not admitted."""
+
+    def __init__(self, message: str, reason: str):
+        """
+        Args:
+            message: Human-readable explanation
+            reason: "overloaded" (budget exhausted) or "deadline" (cannot finish in time)
+        """
+        super().__init__(message)
+        self.reason = reason
+
+
+class AdmissionTicket:
+    """An admitted request; stage time recorded in ``work`` feeds cost calibration."""
+
+    def __init__(self, word_count: int, estimate: float, duration: float):
+        self.word_count = word_count
+        self.estimate = estimate
+        self.duration = duration
+        self.work = StageTotals()
+
+
+class AdmissionController:
+    """Bounds the estimated work in flight across all requests."""
+
+    def __init__(
+        self,
+        max_work: float = 120.0,
+        queue_timeout: float = 10.0,
+        cost_per_word: float = 0.035,
+        smoothing: float = 0.2
+    ):
+        """
+        Initialize controller.
+
+        Args:
+            max_work: Budget of estimated work in flight, in seconds (0 = unlimited)
+            queue_timeout: Maximum time a request waits for budget before rejection
+            cost_per_word: Initial estimated processing seconds per word, also the
+                initial wall-clock seconds per word until requests are observed
+            smoothing: Weight of each new observation in the cost average (0-1]
+        """
+        if not 0 < smoothing <= 1:
+            raise ValueError("smoothing must be in (0, 1]")
+        self.max_work = max_work
+        self.queue_timeout = queue_timeout
+        self.cost_per_word = cost_per_word
+        self.seconds_per_word = cost_per_word
+        self.smoothing = smoothing
+        self._in_flight_work = 0.0
+        self._active = 0
+        self._waiters: Deque[Tuple[float, asyncio.Future]] = deque()
+        self._stats: Dict[str, int] = {"admitted": 0, "queued": 0, "rejected_overloaded": 0, "rejected_deadline": 0}
+
+    def estimate(self, word_count: int) -> float:
+        """Estimated processing seconds for a story of word_count words."""
+        return word_count * self.cost_per_word
+
+    def estimate_duration(self, word_count: int) -> float:
+        """Estimated wall-clock seconds for a story of word_count words."""
+        return word_count * self.seconds_per_word
+
+    @property
+    def in_flight_work(self) -> float:
+        """Estimated seconds of work currently admitted."""
+        return self._in_flight_work
+
+    @property
+    def queued(self) -> int:
+        """Number of requests waiting for budget."""
+        return len(self._waiters)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get admission counters and current state."""
+        return {
+            **self._stats,
+            "in_flight_work": self._in_flight_work,
+            "active": self._active,
+            "waiting": self.queued,
+            "cost_per_word": self.cost_per_word,
+            "seconds_per_word": self.seconds_per_word,
+        }
+
+    def observe(self, word_count: int, work_seconds: float, wall_seconds: float) -> None:
+        """
+        Fold a finished request into the per-word estimates.
+
+        Args:
+            word_count: Number of words in the story
+            work_seconds: Stage time summed across stages, which may overlap
+            wall_seconds: Elapsed time from admission to completion
+        """
+        if word_count <= 0:
+            return
+        if work_seconds > 0:
+            observed = work_seconds / word_count
+            self.cost_per_word += self.smoothing * (observed - self.cost_per_word)
+            logger.debug(f"Calibrated cost per word: {self.cost_per_word * 1000:.1f}ms (observed {observed * 1000:.1f}ms)")
+        if wall_seconds > 0:
+            observed = wall_seconds / word_count
+            self.seconds_per_word += self.smoothing * (observed - self.seconds_per_word)
+            logger.debug(f"Calibrated wall time per word: {self.seconds_per_word * 1000:.1f}ms (observed {observed * 1000:.1f}ms)")
+
+    def _fits(self, estimate: float) -> bool:
+        # A request always fits an idle server, so oversized stories are never starved
+        return self.max_work <= 0 or self._active == 0 or self._in_flight_work + estimate <= self.max_work
+
+    def _take(self, estimate: float) -> None:
+        self._in_flight_work += estimate
+        self._active += 1
+        self._stats["admitted"] += 1
+
+    def _release(self, estimate: float) -> None:
+        self._in_flight_work = max(0.0, self._in_flight_work - estimate)
+        self._active -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        """Admit waiters in arrival order while the head of the queue fits."""
+        while self._waiters and self._fits(self._waiters[0][0]):
+            estimate, future = self._waiters.popleft()
+            if future.done():
+                continue
+            self._take(estimate)
+            future.set_result(None)
+
+    def _reject(self, reason: str, message: str) -> AdmissionRejected:
+        self._stats[f"rejected_{reason}"] += 1
+        logger.warning(f"Request rejected ({reason}): {message}")
+        return AdmissionRejected(message, reason)
+
+    async def _acquire(self, estimate: float, duration: float, time_remaining: Optional[float]) -> None:
+        wait_limit = self.queue_timeout
+        reason = "overloaded"
+        if time_remaining is not None:
+            slack = time_remaining - duration
+            if slack <= 0:
+                raise self._reject(
+                    "deadline", f"Estimated {duration:.1f}s exceeds remaining deadline of {time_remaining:.1f}s"
+                )
+            if slack < wait_limit:
+                wait_limit, reason = slack, "deadline"
+
+        if not self._waiters and self._fits(estimate):
+            self._take(estimate)
+            return
+        if wait_limit <= 0:
+            raise self._reject(reason, f"Work budget exhausted ({self._in_flight_work:.1f}s of {self.max_work:.1f}s in flight)")
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (estimate, future)
+        self._waiters.append(entry)
+        self._stats["queued"] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=wait_limit)
+        except asyncio.TimeoutError:
+            if future.done():
+                return
+            future.cancel()
+            self._waiters.remove(entry)
+            raise self._reject(reason, f"No work budget within {wait_limit:.1f}s")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(estimate)
+            else:
+                future.cancel()
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+            raise
+
+    @asynccontextmanager
+    async def admit(self, word_count: int, time_remaining: Optional[float] = None) -> AsyncIterator[AdmissionTicket]:
+        """
+        Admit a request for the duration of the block.
+
+        Args:
+            word_count: Number of words in the story
+            time_remaining: Seconds until the client's deadline, if any
+
+        Yields:
+            AdmissionTicket; stage time recorded in ``ticket.work`` and the
+            elapsed time of the block calibrate the per-word estimates when the
+            block finishes without error
+
+        Raises:
+            AdmissionRejected: If the budget or the deadline does not allow the request
+        """
+        ticket = AdmissionTicket(word_count, self.estimate(word_count), self.estimate_duration(word_count))
+        await self._acquire(ticket.estimate, ticket.duration, time_remaining)
+        started = time.perf_counter()
+        try:
+            yield ticket
+        except BaseException:
+            self._release(ticket.estimate)
+            raise
+        self._release(ticket.estimate)
+        self.observe(word_count, ticket.work.total, time.perf_counter() - started)
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the shared admission controller configured from Config."""
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController(
+            max_work=Config.ADMISSION_MAX_WORK,
+            queue_timeout=Config.ADMISSION_QUEUE_TIMEOUT,
+            cost_per_word=Config.ADMISSION_COST_PER_WORD,
+            smoothing=Config.ADMISSION_SMOOTHING
+        )
+    return _controller
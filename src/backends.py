@@ -0,0 +1,190 @@
+"""
+Model backend registry for Story2Audio.
+
+The enhancer and TTS implementations are looked up by name from
+``Config.ENHANCER_BACKEND`` and ``Config.TTS_BACKEND``. Besides the real
+Hugging Face / Kokoro models, deterministic "stub" backends are registered
+that load no weights but emulate model latency and output size, so the
+server, stitching, caching and scheduling layers can be exercised offline.
+"""
+import logging
+import re
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from config import Config
+from src.enhancer_local import StoryEnhancer
+
+logger = logging.getLogger(__name__)
+
+_enhancer_backends: Dict[str, Callable[[], Any]] = {}
+_tts_backends: Dict[str, Callable[[str], Any]] = {}
+
+# Sentence-sized pieces that together cover the whole text
+_SEGMENT_RE = re.compile(r".+?(?:[.!?]+\s*|$)", re.S)
+
+
+def register_enhancer_backend(name: str, factory: Callable[[], Any]) -> None:
+    """
+    Register an enhancer implementation.
+
+    Args:
+        name: Backend name used in ENHANCER_BACKEND
+        factory: Called without arguments; returns an object with the
+            StoryEnhancer interface (enhance_chunk, enhance_batch)
+    """
+    _enhancer_backends[name] = factory
+
+
+def register_tts_backend(name: str, factory: Callable[[str], Any]) -> None:
+    """
+    Register a TTS implementation.
+
+    Args:
+        name: Backend name used in TTS_BACKEND
+        factory: Called with a language code; returns a KPipeline-like
+            callable ``pipeline(text, voice=...)`` yielding
+            (graphemes, phonemes, audio) segments
+    """
+    _tts_backends[name] = factory
+
+
+def available_backends() -> Dict[str, List[str]]:
+    """Get the registered backend names."""
+    return {"enhancer": sorted(_enhancer_backends), "tts": sorted(_tts_backends)}
+
+
+def create_enhancer(name: Optional[str] = None) -> Any:
+    """
+    Create the configured enhancer.
+
+    Args:
+        name: Backend name (defaults to Config.ENHANCER_BACKEND)
+
+    Raises:
+        ValueError: If the backend is not registered
+    """
+    name = name or Config.ENHANCER_BACKEND
+    if name not in _enhancer_backends:
+        raise ValueError(f"Unknown enhancer backend '{name}', expected one of {sorted(_enhancer_backends)}")
+    logger.info(f"Creating '{name}' enhancer backend")
+    return _enhancer_backends[name]()
+
+
+def create_tts_pipeline(lang_code: str = 'a', name: Optional[str] = None) -> Any:
+    """
+    Create the configured TTS pipeline.
+
+    Args:
+        lang_code: Language code passed to the backend
+        name: Backend name (defaults to Config.TTS_BACKEND)
+
+    Raises:
+        ValueError: If the backend is not registered
+    """
+    name = name or Config.TTS_BACKEND
+    if name not in _tts_backends:
+        raise ValueError(f"Unknown TTS backend '{name}', expected one of {sorted(_tts_backends)}")
+    logger.info(f"Creating '{name}' TTS backend")
+    return _tts_backends[name](lang_code)
+
+
+class StubEnhancer(StoryEnhancer):
+    """
+    Enhancer that echoes each chunk back after a model-like delay.
+
+    Generation sleeps ``ms_per_token`` for every new token; a batch costs the
+    same as a single prompt, as with padded batched decoding. Caching and
+    fallback behaviour are inherited from StoryEnhancer.
+    """
+
+    def __init__(self, ms_per_token: Optional[float] = None):
+        """
+        Initialize stub enhancer.
+
+        Args:
+            ms_per_token: Emulated decode time per generated token
+                (defaults to Config.STUB_ENHANCER_MS_PER_TOKEN)
+        """
+        self.model_name = "stub"
+        self.cache_dir = None
+        self.tokenizer = self.model = self.generator = None
+        self.ms_per_token = Config.STUB_ENHANCER_MS_PER_TOKEN if ms_per_token is None else ms_per_token
+
+    def _is_loaded(self) -> bool:
+        return True
+
+    def _decode(self, max_new_tokens: int) -> None:
+        if self.ms_per_token > 0:
+            time.sleep(self.ms_per_token * max_new_tokens / 1000.0)
+
+    @staticmethod
+    def _echo(prompt: str) -> str:
+        """Recover the chunk from a prompt built by _build_prompt."""
+        return prompt.split("\n", 1)[1].rsplit("\nEnhanced version:", 1)[0]
+
+    def _generate_one(self, prompt: str, max_new_tokens: int, temperature: float, top_p: float) -> str:
+        self._decode(max_new_tokens)
+        return self._echo(prompt)
+
+    def _generate_batch(self, prompts: List[str], max_new_tokens: int, temperature: float, top_p: float) -> List[str]:
+        self._decode(max_new_tokens)
+        return [self._echo(prompt) for prompt in prompts]
+
+
+class StubTTSPipeline:
+    """
+    KPipeline stand-in that renders a deterministic tone.
+
+    Each sentence becomes one segment of ``samples_per_char`` samples per
+    character, generated after ``ms_per_char`` of emulated inference time.
+    The tone's pitch depends on the voice, so different voices are
+    distinguishable in the output.
+    """
+
+    def __init__(
+        self,
+        samples_per_char: Optional[int] = None,
+        ms_per_char: Optional[float] = None,
+        sample_rate: Optional[int] = None
+    ):
+        """
+        Initialize stub pipeline.
+
+        Args:
+            samples_per_char: Output length per input character
+                (defaults to Config.STUB_TTS_SAMPLES_PER_CHAR)
+            ms_per_char: Emulated inference time per input character
+                (defaults to Config.STUB_TTS_MS_PER_CHAR)
+            sample_rate: Sample rate used for the tone (defaults to Config.SAMPLE_RATE)
+        """
+        self.samples_per_char = Config.STUB_TTS_SAMPLES_PER_CHAR if samples_per_char is None else samples_per_char
+        self.ms_per_char = Config.STUB_TTS_MS_PER_CHAR if ms_per_char is None else ms_per_char
+        self.sample_rate = sample_rate or Config.SAMPLE_RATE
+
+    def __call__(self, text: str, voice: Optional[str] = None) -> Iterator[Tuple[str, str, np.ndarray]]:
+        frequency = 180.0 + zlib.crc32((voice or "").encode("utf-8")) % 200
+        for match in _SEGMENT_RE.finditer(text):
+            segment = match.group(0)
+            if self.ms_per_char > 0:
+                time.sleep(self.ms_per_char * len(segment) / 1000.0)
+            t = np.arange(len(segment) * self.samples_per_char, dtype=np.float32) / self.sample_rate
+            yield segment, "", (0.1 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def _create_local_enhancer() -> StoryEnhancer:
+    return StoryEnhancer(model_name=Config.ENHANCER_MODEL, cache_dir=Config.MODEL_CACHE_DIR)
+
+
+def _create_kokoro_pipeline(lang_code: str) -> Any:
+    from kokoro import KPipeline
+    return KPipeline(lang_code=lang_code)
+
+
+register_enhancer_backend("local", _create_local_enhancer)
+register_enhancer_backend("stub", StubEnhancer)
+register_tts_backend("kokoro", _create_kokoro_pipeline)
+register_tts_backend("stub", lambda lang_code: StubTTSPipeline())
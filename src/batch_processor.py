@@ -1,10 +1,48 @@
-"""Batch processing utilities for multiple stories."""
+"""
+Batch processing utilities for multiple stories.
+
+Besides the asyncio helper ``process_batch``, this module renders whole
+corpora offline, in-process and without the gRPC server:
+
+    python -m src.batch_processor stories.jsonl outputs/catalog --workers 4
+    python -m src.batch_processor stories/ outputs/catalog --format wav
+
+Input is a JSONL file (one ``{"id": ..., "text": ...}`` object per line) or a
+directory of ``.txt`` files. Every story is chunked up front and identical
+chunks are rendered only once for the whole corpus. Enhancement and
+synthesis run in a pool of worker processes, and each story is stitched and
+written as soon as its last chunk is ready. Rendered chunks are kept in
+``<output>/.chunks`` and finished stories are appended to
+``<output>/manifest.jsonl``, so a rerun after a crash skips finished stories
+and reuses every chunk already rendered.
+"""
 import asyncio
-from typing import List, Callable, Any
+import hashlib
+import io
+import json
 import logging
+import multiprocessing
+import os
+import sys
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Executor, FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from config import Config
+from src.cache import rendered_audio_key
+from src.preprocess import chunk_story
 
 logger = logging.getLogger(__name__)
 
+MANIFEST_NAME = "manifest.jsonl"
+CHUNK_DIR_NAME = ".chunks"
+AUDIO_FORMATS = ("mp3", "wav")
+
 
 async def process_batch(
     items: List[Any],
@@ -13,10 +51,384 @@ async def process_batch(
 ) -> List[Any]:
     """Process items in batches with concurrency control."""
     semaphore = asyncio.Semaphore(max_concurrent)
-    
+
     async def process_with_semaphore(item):
         async with semaphore:
             return await processor(item)
-    
+
     tasks = [process_with_semaphore(item) for item in items]
     return await asyncio.gather(*tasks)
+
+
+@dataclass
+class BatchStory:
+    """A story of the corpus and the chunk keys it is assembled from."""
+    story_id: str
+    text: str
+    source_hash: str = ""
+    chunk_keys: List[str] = field(default_factory=list)
+
+
+def load_stories(path: str) -> List[BatchStory]:
+    """
+    Read stories from a JSONL file or a directory of .txt files.
+
+    JSONL lines need a "text" (or "story_text") field and may have an "id";
+    lines without an id are numbered. Files in a directory are identified
+    by their path relative to it, without the extension.
+
+    Raises:
+        ValueError: If a JSONL line is not an object with text, or ids repeat
+    """
+    source = Path(path)
+    stories: List[BatchStory] = []
+    if source.is_dir():
+        for file in sorted(source.rglob("*.txt")):
+            story_id = file.relative_to(source).with_suffix("").as_posix()
+            stories.append(BatchStory(story_id, file.read_text(encoding="utf-8")))
+    else:
+        with open(source, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                text = record.get("text", record.get("story_text")) if isinstance(record, dict) else None
+                if not isinstance(text, str):
+                    raise ValueError(f"{path}:{line_number}: expected an object with a 'text' field")
+                stories.append(BatchStory(str(record.get("id", line_number)), text))
+
+    seen: Set[str] = set()
+    for story in stories:
+        if story.story_id in seen:
+            raise ValueError(f"Duplicate story id: {story.story_id}")
+        seen.add(story.story_id)
+    return stories
+
+
+class BatchManifest:
+    """Append-only record of finished stories, used to resume an interrupted run."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A crash can leave a partial last line
+                        continue
+                    self.entries[entry["id"]] = entry
+
+    def is_done(self, story: BatchStory, output_dir: Path) -> bool:
+        """Whether the story was rendered from the same text and its output still exists."""
+        entry = self.entries.get(story.story_id)
+        return (
+            entry is not None
+            and entry.get("status") == "done"
+            and entry.get("source_hash") == story.source_hash
+            and (output_dir / entry["output"]).exists()
+        )
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """Append an entry and flush it to disk."""
+        self.entries[entry["id"]] = entry
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def chunk_key(text: str, enhance: bool) -> str:
+    """Content key of a rendered chunk; identical chunks share one key across the corpus."""
+    return rendered_audio_key("batch", text, enhance)
+
+
+def output_name(story_id: str, audio_format: str) -> str:
+    """
+    Relative output path for a story id.
+
+    Empty, "." and ".." path parts are dropped. Ids changed by that get a
+    short hash of the raw id appended, so "x", "./x" and "../x" do not
+    overwrite each other.
+    """
+    safe = "/".join(part for part in story_id.replace("\\", "/").split("/") if part not in ("", ".", ".."))
+    if safe != story_id:
+        safe = f"{safe or 'story'}-{hashlib.sha256(story_id.encode('utf-8')).hexdigest()[:8]}"
+    return f"{safe}.{audio_format}"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+# Models loaded once per worker process
+_worker_enhancer = None
+
+
+def _init_worker(torch_threads: int) -> None:
+    try:
+        import torch
+        torch.set_num_threads(max(1, torch_threads))
+    except ImportError:
+        pass
+
+
+def _render_chunks(chunks: List[Tuple[str, str]], chunk_dir: str, enhance: bool) -> List[str]:
+    """Enhance and synthesize (key, text) chunks in a worker and store each waveform under its key."""
+    global _worker_enhancer
+    from src.kokoro_tts import synthesize_chunk
+
+    texts = [text for _, text in chunks]
+    if enhance:
+        if _worker_enhancer is None:
+            from src.backends import create_enhancer
+            _worker_enhancer = create_enhancer()
+        texts = _worker_enhancer.enhance_batch(
+            texts,
+            max_new_tokens=Config.ENHANCEMENT_MAX_TOKENS,
+            temperature=Config.ENHANCEMENT_TEMPERATURE,
+            top_p=Config.ENHANCEMENT_TOP_P,
+            batch_size=Config.ENHANCEMENT_BATCH_SIZE
+        )
+    for (key, _), text in zip(chunks, texts):
+        audio = synthesize_chunk(text, voice=Config.TTS_VOICE)
+        _write_atomic(Path(chunk_dir) / f"{key}.f32", audio.astype('<f4', copy=False).tobytes())
+    return [key for key, _ in chunks]
+
+
+def _encode(audio: np.ndarray, audio_format: str) -> bytes:
+    if audio_format == "wav":
+        import soundfile as sf
+        buffer = io.BytesIO()
+        sf.write(buffer, audio, Config.SAMPLE_RATE, format="WAV")
+        return buffer.getvalue()
+    from src.utils import encode_audio
+    return encode_audio(audio, sample_rate=Config.SAMPLE_RATE, bitrate=Config.AUDIO_BITRATE, audio_format=audio_format)
+
+
+def _assemble_story(chunk_keys: List[str], chunk_dir: str, output_path: str, audio_format: str) -> Tuple[int, float]:
+    """Stitch a story's stored chunks, encode it and write the output file; returns (bytes, seconds)."""
+    from src.utils import combine_audio_arrays
+
+    arrays = [np.fromfile(Path(chunk_dir) / f"{key}.f32", dtype='<f4') for key in chunk_keys]
+    arrays = [audio for audio in arrays if len(audio) > 0]
+    if not arrays:
+        raise RuntimeError("No audio was generated")
+    audio = combine_audio_arrays(arrays, Config.SAMPLE_RATE, fade_duration=Config.AUDIO_FADE_DURATION)
+    data = _encode(audio, audio_format)
+    _write_atomic(Path(output_path), data)
+    return len(data), len(audio) / Config.SAMPLE_RATE
+
+
+def run_batch(
+    stories: Sequence[BatchStory],
+    output_dir: str,
+    workers: int = 2,
+    batch_size: Optional[int] = None,
+    audio_format: str = "mp3",
+    enhance: bool = True,
+    chunk_size: Optional[int] = None,
+    on_story: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Render a corpus of stories to audio files.
+
+    Args:
+        stories: Stories to render (see load_stories)
+        output_dir: Directory for audio files, the manifest and the chunk store
+        workers: Worker processes (0 renders in a single thread of this process)
+        batch_size: Chunks per enhancement batch (defaults to Config.ENHANCEMENT_BATCH_SIZE)
+        audio_format: "mp3" or "wav"
+        enhance: Run the enhancer before synthesis
+        chunk_size: Words per chunk (defaults to Config.CHUNK_SIZE)
+        on_story: Called with each manifest entry as stories finish or fail
+
+    Returns:
+        Summary with counts of rendered, skipped and failed stories and chunks
+    """
+    if audio_format not in AUDIO_FORMATS:
+        raise ValueError(f"Unknown audio format '{audio_format}', expected one of {AUDIO_FORMATS}")
+    batch_size = batch_size or Config.ENHANCEMENT_BATCH_SIZE
+    chunk_size = chunk_size or Config.CHUNK_SIZE
+    start = time.perf_counter()
+
+    out = Path(output_dir)
+    chunk_dir = out / CHUNK_DIR_NAME
+    chunk_dir.mkdir(parents=True, exist_ok=True)
+    manifest = BatchManifest(out / MANIFEST_NAME)
+    summary = {"stories": len(stories), "done": 0, "skipped": 0, "failed": 0,
+               "chunks": 0, "unique_chunks": 0, "rendered_chunks": 0}
+
+    def finish(story: BatchStory, entry: Dict[str, Any]) -> None:
+        entry = {"id": story.story_id, "source_hash": story.source_hash, **entry}
+        manifest.record(entry)
+        summary[entry["status"] if entry["status"] == "failed" else "done"] += 1
+        if on_story is not None:
+            on_story(entry)
+
+    names: Dict[str, str] = {}
+    for story in stories:
+        name = output_name(story.story_id, audio_format).casefold()
+        if name in names:
+            raise ValueError(f"Stories '{names[name]}' and '{story.story_id}' would be written to the same file")
+        names[name] = story.story_id
+
+    # Chunk everything first so identical chunks are found across the whole corpus
+    pending: List[BatchStory] = []
+    texts: Dict[str, str] = {}
+    for story in stories:
+        story.source_hash = hashlib.sha256(story.text.encode("utf-8")).hexdigest()
+        if manifest.is_done(story, out):
+            summary["skipped"] += 1
+            continue
+        if not story.text.strip():
+            finish(story, {"status": "failed", "error": "Story text cannot be empty"})
+            continue
+        # Chunk the raw text like the server does, so paragraph breaks end sentences
+        # and the same story produces the same chunks (and keys) in both
+        for chunk in chunk_story(story.text, chunk_size=chunk_size, max_tokens=Config.CHUNK_MAX_TOKENS):
+            key = chunk_key(chunk, enhance)
+            story.chunk_keys.append(key)
+            texts.setdefault(key, chunk)
+        pending.append(story)
+    summary["chunks"] = sum(len(story.chunk_keys) for story in pending)
+    summary["unique_chunks"] = len(texts)
+
+    ready = {key for key in texts if (chunk_dir / f"{key}.f32").exists()}
+    todo = [key for key in texts if key not in ready]
+    batches = deque(todo[i:i + batch_size] for i in range(0, len(todo), batch_size))
+    logger.info(
+        f"{len(pending)} stories to render ({summary['skipped']} already done): {summary['chunks']} chunks, "
+        f"{len(texts)} unique, {len(todo)} to synthesize"
+    )
+
+    executor: Executor
+    if workers > 0:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(Config.TTS_TORCH_THREADS,)
+        )
+    else:
+        executor = ThreadPoolExecutor(max_workers=1)
+
+    chunk_futures: Dict[Future, List[str]] = {}
+    story_futures: Dict[Future, Tuple[BatchStory, str]] = {}
+    # Only a few chunk batches are queued at a time so finished stories can
+    # be assembled and written while the rest of the corpus is rendered
+    max_in_flight = max(2, workers * 2)
+
+    # Chunks each waiting story still needs, and the stories waiting on each chunk
+    remaining: Dict[str, int] = {}
+    waiting_on: Dict[str, List[BatchStory]] = defaultdict(list)
+
+    def assemble(story: BatchStory) -> None:
+        name = output_name(story.story_id, audio_format)
+        future = executor.submit(_assemble_story, story.chunk_keys, str(chunk_dir), str(out / name), audio_format)
+        story_futures[future] = (story, name)
+
+    def chunks_done(keys: List[str], error: Optional[str] = None) -> None:
+        for key in keys:
+            for story in waiting_on.pop(key, ()):
+                if story.story_id not in remaining:
+                    continue  # already failed on another chunk
+                if error is not None:
+                    del remaining[story.story_id]
+                    finish(story, {"status": "failed", "error": error})
+                    continue
+                remaining[story.story_id] -= 1
+                if not remaining[story.story_id]:
+                    del remaining[story.story_id]
+                    assemble(story)
+
+    try:
+        for story in pending:
+            missing = {key for key in story.chunk_keys if key not in ready}
+            if not missing:
+                assemble(story)
+                continue
+            remaining[story.story_id] = len(missing)
+            for key in missing:
+                waiting_on[key].append(story)
+
+        while batches or chunk_futures or story_futures:
+            while batches and len(chunk_futures) < max_in_flight:
+                keys = batches.popleft()
+                future = executor.submit(_render_chunks, [(key, texts[key]) for key in keys], str(chunk_dir), enhance)
+                chunk_futures[future] = keys
+
+            done, _ = wait(list(chunk_futures) + list(story_futures), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in chunk_futures:
+                    keys = chunk_futures.pop(future)
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.error(f"Rendering {len(keys)} chunks failed: {e}")
+                        chunks_done(keys, error=str(e) or type(e).__name__)
+                    else:
+                        summary["rendered_chunks"] += len(keys)
+                        chunks_done(keys)
+                else:
+                    story, name = story_futures.pop(future)
+                    try:
+                        size, duration = future.result()
+                        finish(story, {"status": "done", "output": name, "bytes": size,
+                                       "duration": round(duration, 3), "chunks": len(story.chunk_keys)})
+                    except Exception as e:
+                        logger.error(f"Assembling story {story.story_id} failed: {e}")
+                        finish(story, {"status": "failed", "error": str(e) or type(e).__name__})
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    summary["elapsed"] = time.perf_counter() - start
+    return summary
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Render a corpus of stories to audio files")
+    parser.add_argument("input", help="JSONL file ({\"id\", \"text\"} per line) or directory of .txt files")
+    parser.add_argument("output_dir", help="Directory for audio files, manifest and chunk store")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Worker processes (0 = render in this process)")
+    parser.add_argument("--batch-size", type=int, default=Config.ENHANCEMENT_BATCH_SIZE, help="Chunks per enhancement batch")
+    parser.add_argument("--chunk-size", type=int, default=Config.CHUNK_SIZE, help="Words per chunk")
+    parser.add_argument("--format", choices=AUDIO_FORMATS, default="mp3", help="Output audio format")
+    parser.add_argument("--no-enhance", action="store_true", help="Synthesize the original text without enhancement")
+    args = parser.parse_args(argv)
+
+    Config.setup_logging()
+    stories = load_stories(args.input)
+
+    def report(entry: Dict[str, Any]) -> None:
+        detail = entry.get("output") if entry["status"] == "done" else entry.get("error")
+        print(f"{entry['status']:<6} {entry['id']}: {detail}", flush=True)
+
+    summary = run_batch(
+        stories,
+        args.output_dir,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        audio_format=args.format,
+        enhance=not args.no_enhance,
+        chunk_size=args.chunk_size,
+        on_story=report
+    )
+    print(
+        f"{summary['done']} rendered, {summary['skipped']} skipped, {summary['failed']} failed in "
+        f"{summary['elapsed']:.1f}s ({summary['unique_chunks']} unique of {summary['chunks']} chunks, "
+        f"{summary['rendered_chunks']} synthesized)"
+    )
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,18 @@
 """
 Caching mechanism for Story2Audio.
 
-Provides in-memory caching for enhanced text chunks and audio generation.
+Provides in-memory caching for enhanced text chunks and a persistent
+content-addressed cache for synthesized audio.
 """
 import hashlib
 import logging
+import os
+import threading
 import time
+from collections import OrderedDict
+from pathlib import Path
 from typing import Optional, Dict, Any
+from config import Config
 
 logger = logging.getLogger(__name__)
 
@@ -64,3 +70,236 @@ class SimpleCache:
 
 # Global cache instance
 text_cache = SimpleCache(ttl=3600)
+
+
+def normalize_cache_text(text: str) -> str:
+    """Normalize text for use in a cache key (collapse whitespace, strip)."""
+    return " ".join(text.split())
+
+
+def rendered_audio_key(kind: str, text: str, enhance: bool = True) -> str:
+    """
+    Content key of a chunk's rendered audio (enhanced if enhance, then synthesized).
+    
+    Covers every setting that changes how the chunk sounds, including the
+    enhancer and its generation parameters when the chunk is enhanced.
+    
+    Args:
+        kind: Key prefix of the caller's cache ("chunk", "batch", ...)
+        text: Chunk text before enhancement
+        enhance: Whether the chunk is enhanced before synthesis
+    """
+    enhancement = (
+        Config.ENHANCER_BACKEND, Config.ENHANCER_MODEL, Config.ENHANCEMENT_MAX_TOKENS,
+        Config.ENHANCEMENT_TEMPERATURE, Config.ENHANCEMENT_TOP_P
+    ) if enhance else ()
+    return ContentCache.make_key(
+        kind, normalize_cache_text(text), Config.TTS_VOICE, Config.SAMPLE_RATE, enhance, *enhancement,
+        Config.TTS_BACKEND, Config.TTS_MODEL, Config.CACHE_VERSION
+    )
+
+
+class ContentCache:
+    """
+    Content-addressed cache with an in-memory LRU front and a disk store.
+    
+    Values are raw bytes addressed by a SHA-256 key built from everything
+    that determines them (text, voice, model, ...). Both tiers are bounded
+    by size and evict least recently used entries first.
+    """
+    
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_memory_bytes: int = 128 * 1024 * 1024,
+        max_disk_bytes: int = 1024 * 1024 * 1024
+    ):
+        """
+        Initialize cache.
+        
+        Args:
+            directory: Directory for persisted entries (None = memory only)
+            max_memory_bytes: Size limit of the in-memory tier
+            max_disk_bytes: Size limit of the disk tier
+        """
+        self.directory = Path(directory) if directory else None
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        # evictions: entries dropped from the cache altogether (from the disk
+        # tier, or from memory when there is no disk tier); memory_evictions:
+        # entries dropped from the memory tier, which may still be on disk
+        self._stats = {
+            "hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0, "evictions": 0, "memory_evictions": 0
+        }
+        
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._load_disk_index()
+    
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a content address from the parts that determine a value."""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(str(part).encode("utf-8"))
+            digest.update(b"\x1f")
+        return digest.hexdigest()
+    
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.bin"
+    
+    def _load_disk_index(self) -> None:
+        """Index existing entries, oldest access first."""
+        entries = []
+        for path in self.directory.glob("*/*.bin"):
+            stat = path.stat()
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+        if entries:
+            logger.info(f"Loaded cache index: {len(entries)} entries, {self._disk_bytes / 1024 / 1024:.1f} MB")
+    
+    def _remember(self, key: str, value: bytes) -> None:
+        """Insert into the memory tier and evict to stay within its limit."""
+        if len(value) > self.max_memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = value
+        self._memory_bytes += len(value)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._stats["memory_evictions"] += 1
+            if self.directory is None:
+                self._stats["evictions"] += 1
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Get a value, promoting disk hits into memory."""
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self._stats["hits"] += 1
+                self._stats["memory_hits"] += 1
+                return value
+            on_disk = self.directory is not None and key in self._disk
+        
+        if on_disk:
+            path = self._entry_path(key)
+            try:
+                value = path.read_bytes()
+                os.utime(path)
+            except OSError:
+                value = None
+            with self._lock:
+                if value is None:
+                    self._disk_bytes -= self._disk.pop(key, 0)
+                else:
+                    self._disk.move_to_end(key)
+                    self._remember(key, value)
+                    self._stats["hits"] += 1
+                    self._stats["disk_hits"] += 1
+                    return value
+        
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+    
+    def set(self, key: str, value: bytes) -> None:
+        """Store a value in memory and, if configured, on disk."""
+        with self._lock:
+            self._remember(key, value)
+        
+        if self.directory is None or len(value) > self.max_disk_bytes:
+            return
+        
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_bytes(value)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to persist cache entry {key[:12]}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+        
+        with self._lock:
+            self._disk_bytes += len(value) - self._disk.pop(key, 0)
+            self._disk[key] = len(value)
+            while self._disk_bytes > self.max_disk_bytes and self._disk:
+                old_key, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                self._stats["evictions"] += 1
+                self._entry_path(old_key).unlink(missing_ok=True)
+    
+    def clear(self) -> None:
+        """Remove all entries from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self.directory:
+                for key in self._disk:
+                    self._entry_path(key).unlink(missing_ok=True)
+            self._disk.clear()
+            self._disk_bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and tier sizes."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+            }
+
+
+_content_caches: Dict[str, ContentCache] = {}
+_content_caches_lock = threading.Lock()
+
+
+def content_cache_counter(counter: str) -> Dict[str, float]:
+    """
+    Get one stats() counter of every shared content cache.
+    
+    Args:
+        counter: "hits", "misses", "evictions", ...
+    
+    Returns:
+        Counter value per namespace, for caches created so far
+    """
+    with _content_caches_lock:
+        caches = list(_content_caches.items())
+    return {namespace: cache.stats()[counter] for namespace, cache in caches}
+
+
+def get_content_cache(namespace: str) -> Optional[ContentCache]:
+    """
+    Get the shared content cache for a namespace ("audio", "enhance", ...).
+    
+    Returns:
+        The cache, or None if caching is disabled in Config
+    """
+    if not Config.ENABLE_CACHING:
+        return None
+    with _content_caches_lock:
+        cache = _content_caches.get(namespace)
+        if cache is None:
+            cache = ContentCache(
+                directory=os.path.join(Config.CACHE_DIR, namespace) if Config.CACHE_DIR else None,
+                max_memory_bytes=Config.CACHE_MEMORY_MB * 1024 * 1024,
+                max_disk_bytes=Config.CACHE_MAX_DISK_MB * 1024 * 1024
+            )
+            _content_caches[namespace] = cache
+        return cache
@@ -0,0 +1,75 @@
+"""
+Cooperative cancellation for Story2Audio.
+
+A CancellationToken is created per request and passed down to the code
+that runs in executor threads (pipeline stages, enhancement batches,
+Kokoro segment loops). The server cancels it when the RPC is cancelled,
+the client disconnects or the request fails, and the token also expires
+on its own at the client's deadline. Long-running loops call
+``raise_if_cancelled()`` between units of work, so abandoned requests stop
+consuming CPU after the current chunk or segment.
+"""
+import threading
+import time
+from typing import Optional
+
+
+class RequestCancelled(Exception):
+    """Raised inside a worker when its request has been cancelled."""
+
+
+class CancellationToken:
+    """Thread-safe cancellation flag with an optional deadline."""
+
+    def __init__(self, time_remaining: Optional[float] = None):
+        """
+        Initialize token.
+
+        Args:
+            time_remaining: Seconds until the token expires by itself (None = never)
+        """
+        self._event = threading.Event()
+        self._reason = "cancelled"
+        self._deadline = time.monotonic() + time_remaining if time_remaining is not None else None
+
+    def cancel(self, reason: str = "cancelled") -> bool:
+        """
+        Cancel the token.
+
+        Returns:
+            True if this call cancelled it, False if it was already cancelled
+        """
+        if self._event.is_set():
+            return False
+        self._reason = reason
+        self._event.set()
+        return True
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the token was cancelled or its deadline has passed."""
+        if self._event.is_set():
+            return True
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            self.cancel("deadline exceeded")
+            return True
+        return False
+
+    @property
+    def reason(self) -> str:
+        """Why the token was cancelled."""
+        return self._reason
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Raises:
+            RequestCancelled: If the token has been cancelled
+        """
+        if self.cancelled:
+            raise RequestCancelled(self._reason)
+
+
+def raise_if_cancelled(token: Optional[CancellationToken]) -> None:
+    """Check an optional token; no-op when token is None."""
+    if token is not None:
+        token.raise_if_cancelled()
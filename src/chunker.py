@@ -0,0 +1,260 @@
+"""
+Sentence-aware chunking for Story2Audio.
+
+Stories are segmented into sentences in a single left-to-right pass that
+keeps abbreviations ("Dr.", "e.g."), initials, decimal numbers, ellipses
+and dialogue ("Stop!" she cried.) inside their sentence. Sentences are then
+packed into chunks under a word limit and a token budget. The budget
+approximates the TTS model's phoneme count by characters: Kokoro splits
+anything longer than its 510-token context into extra segments, so chunks
+that stay under it are synthesized in one forward pass. Sentences longer
+than a chunk are split at a clause break (, ; :) where possible.
+
+Each Chunk records its character offsets in the source text and a content
+digest, for cache keys and for aligning audio with the text.
+"""
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Kokoro's context is 510 phoneme tokens; leave room for punctuation and
+# words that phonemize longer than they are spelled
+DEFAULT_MAX_TOKENS = 480
+
+_WORD = re.compile(r'\S+')
+_TERMINATORS = frozenset('.!?…')
+_CLOSERS = frozenset('"\'”’)]»')
+_OPENERS = '"\'“‘([«'
+_CLAUSE_BREAKS = (',', ';', ':', '—', '–')
+_ABBREVIATIONS = frozenset({
+    'mr', 'mrs', 'ms', 'mx', 'dr', 'prof', 'rev', 'hon', 'sr', 'jr', 'st', 'mt', 'ft',
+    'gen', 'col', 'capt', 'cpt', 'lt', 'sgt', 'cmdr', 'adm', 'gov', 'pres', 'sen', 'rep',
+    'vs', 'etc', 'al', 'approx', 'dept', 'est', 'fig', 'inc', 'ltd', 'co', 'corp', 'no', 'vol',
+    'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec',
+})
+
+Span = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A chunk of a story and where it came from."""
+    index: int
+    text: str
+    start: int
+    end: int
+    word_count: int
+    tokens: int
+
+    @property
+    def digest(self) -> str:
+        """Content hash of the chunk text, stable across edits elsewhere in the story."""
+        return hashlib.sha256(self.text.encode('utf-8')).hexdigest()
+
+
+def _is_abbreviation(text: str, period: int) -> bool:
+    """Whether the word ending at text[period] == '.' is an abbreviation or initial."""
+    begin = period
+    while begin > 0 and not text[begin - 1].isspace():
+        begin -= 1
+    word = text[begin:period].lstrip(_OPENERS).lower()
+    if word in _ABBREVIATIONS or word in ('e.g', 'i.e', 'a.m', 'p.m'):
+        return True
+    # Initials and acronyms: "J." and "U.S."
+    return bool(word) and all(len(part) == 1 and part.isalpha() for part in word.split('.'))
+
+
+def split_sentences(text: str) -> List[Span]:
+    """
+    Find sentence spans in text in one pass.
+
+    A sentence ends at terminal punctuation (plus any closing quotes or
+    brackets) that is followed by whitespace and then something other than
+    a lowercase letter, unless the word before a single period is an
+    abbreviation or initial. Blank lines also end a sentence.
+
+    Returns:
+        (start, end) character offsets, without surrounding whitespace
+    """
+    spans: List[Span] = []
+    n = len(text)
+    start = -1
+    end = 0
+    i = 0
+    while i < n:
+        ch = text[i]
+        if ch.isspace():
+            if ch == '\n' and start >= 0:
+                j = i + 1
+                while j < n and text[j].isspace() and text[j] != '\n':
+                    j += 1
+                if j < n and text[j] == '\n':
+                    spans.append((start, end))
+                    start = -1
+                    i = j
+                    continue
+            i += 1
+            continue
+        if start < 0:
+            start = i
+        if ch not in _TERMINATORS:
+            i += 1
+            end = i
+            continue
+
+        j = i
+        while j < n and text[j] in _TERMINATORS:
+            j += 1
+        run_end = j
+        while j < n and text[j] in _CLOSERS:
+            j += 1
+        end = j
+        if j < n and not text[j].isspace():
+            # "3.14", "...and", "Yahoo!com"
+            i = j
+            continue
+
+        k = j
+        while k < n and text[k].isspace():
+            k += 1
+        if k < n and (text[k].islower() or (run_end - i == 1 and ch == '.' and _is_abbreviation(text, i))):
+            i = j
+            continue
+        spans.append((start, end))
+        start = -1
+        i = j
+    if start >= 0:
+        spans.append((start, end))
+    return spans
+
+
+def _clause_cut(words: Sequence[str], first: int, limit: int) -> int:
+    """Index after the last clause break in the second half of words[first:limit], else limit."""
+    for j in range(limit - 1, first + (limit - first) // 2 - 1, -1):
+        if words[j].endswith(_CLAUSE_BREAKS):
+            return j + 1
+    return limit
+
+
+def chunk_text(
+    text: str,
+    max_words: int = 150,
+    max_tokens: Optional[int] = DEFAULT_MAX_TOKENS,
+    word_spans: Optional[Sequence[Span]] = None,
+    previous: Optional[Sequence[str]] = None
+) -> List[Chunk]:
+    """
+    Split text into sentence-aligned chunks.
+
+    Given the chunk texts of an earlier version of the story, any of them
+    that still occurs unchanged at a sentence start is kept as one chunk,
+    so an edit only changes the chunks around it instead of shifting every
+    boundary after it.
+
+    Args:
+        text: Story text
+        max_words: Maximum words per chunk
+        max_tokens: Maximum estimated TTS tokens (characters) per chunk, None for no limit
+        word_spans: Precomputed (start, end) offsets of the words in text
+        previous: Chunk texts of a previous version of the story
+
+    Returns:
+        Chunks in story order; their text has whitespace collapsed
+
+    Raises:
+        ValueError: If max_words or max_tokens is not positive
+    """
+    if max_words <= 0:
+        raise ValueError("Chunk size must be positive")
+    if max_tokens is not None and max_tokens <= 0:
+        raise ValueError("Chunk token budget must be positive")
+    if word_spans is None:
+        word_spans = [m.span() for m in _WORD.finditer(text)]
+    if not word_spans:
+        return []
+    budget = max_tokens if max_tokens is not None else float('inf')
+    words = [text[a:b] for a, b in word_spans]
+
+    # Index of the first word after each sentence (two-pointer walk over both span lists)
+    sentence_ends: List[int] = []
+    w = 0
+    for _, sentence_end in split_sentences(text):
+        while w < len(words) and word_spans[w][0] < sentence_end:
+            w += 1
+        if not sentence_ends or w > sentence_ends[-1]:
+            sentence_ends.append(w)
+    if sentence_ends[-1] < len(words):
+        sentence_ends.append(len(words))
+
+    # Previous chunks by their first word
+    anchors: Dict[str, List[List[str]]] = {}
+    for chunk_str in previous or ():
+        previous_words = chunk_str.split()
+        if previous_words:
+            anchors.setdefault(previous_words[0], []).append(previous_words)
+
+    def match(position: int) -> int:
+        """End of the longest previous chunk that starts at words[position], or 0."""
+        best = 0
+        for candidate in anchors.get(words[position], ()):
+            end = position + len(candidate)
+            if end > best and words[position:end] == candidate:
+                best = end
+        return best
+
+    chunks: List[Chunk] = []
+
+    def emit(first: int, last: int) -> None:
+        piece = words[first:last]
+        chunk_str = ' '.join(piece)
+        chunks.append(Chunk(
+            index=len(chunks),
+            text=chunk_str,
+            start=word_spans[first][0],
+            end=word_spans[last - 1][1],
+            word_count=len(piece),
+            tokens=len(chunk_str),
+        ))
+
+    first = 0          # first word of the open chunk
+    tokens = -1        # tokens in the open chunk (words plus separating spaces)
+    position = 0       # first word not yet packed
+    s = 0              # first sentence ending after position
+    while position < len(words):
+        reused_end = match(position) if anchors else 0
+        if reused_end:
+            if first < position:
+                emit(first, position)
+            emit(position, reused_end)
+            first, tokens, position = reused_end, -1, reused_end
+            while s < len(sentence_ends) and sentence_ends[s] <= position:
+                s += 1
+            continue
+
+        sentence_start, sentence_end = position, sentence_ends[s]
+        sentence_tokens = sum(len(words[j]) + 1 for j in range(sentence_start, sentence_end))
+        if sentence_end - first <= max_words and tokens + sentence_tokens <= budget:
+            tokens += sentence_tokens
+        elif sentence_end - sentence_start <= max_words and sentence_tokens - 1 <= budget:
+            if first < sentence_start:
+                emit(first, sentence_start)
+            first, tokens = sentence_start, sentence_tokens - 1
+        else:
+            # Sentence too long for any chunk: close the open chunk and split the sentence
+            if first < sentence_start:
+                emit(first, sentence_start)
+            first, tokens = sentence_start, -1
+            for j in range(sentence_start, sentence_end):
+                size = len(words[j]) + 1
+                if j > first and (j - first >= max_words or tokens + size > budget):
+                    cut = _clause_cut(words, first, j)
+                    emit(first, cut)
+                    tokens = sum(len(words[k]) + 1 for k in range(cut, j)) - 1
+                    first = cut
+                tokens += size
+        position = sentence_end
+        s += 1
+    if first < len(words):
+        emit(first, len(words))
+    return chunks
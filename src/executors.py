@@ -0,0 +1,72 @@
+"""
+Dedicated thread pools for the blocking pipeline stages.
+
+Each stage (enhance, tts, encode) gets its own size-limited executor so a
+slow stage cannot starve the others and blocking model calls never run on
+the asyncio event loop. The pool size is the stage's concurrency limit
+across all in-flight requests.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_lock = threading.Lock()
+
+
+def stage_limits() -> Dict[str, int]:
+    """Get the configured worker count per stage."""
+    return {
+        "enhance": Config.ENHANCE_WORKERS,
+        "tts": Config.TTS_WORKERS,
+        "encode": Config.ENCODE_WORKERS,
+    }
+
+
+def get_executor(stage: str) -> ThreadPoolExecutor:
+    """
+    Get the shared executor for a pipeline stage, creating it on first use.
+
+    Args:
+        stage: Stage name ("enhance", "tts" or "encode")
+
+    Returns:
+        ThreadPoolExecutor sized from Config
+
+    Raises:
+        ValueError: If the stage name is unknown
+    """
+    limits = stage_limits()
+    if stage not in limits:
+        raise ValueError(f"Unknown pipeline stage: {stage}")
+
+    with _lock:
+        executor = _executors.get(stage)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max(1, limits[stage]), thread_name_prefix=f"s2a-{stage}")
+            _executors[stage] = executor
+            logger.info(f"Created '{stage}' executor with {limits[stage]} workers")
+        return executor
+
+
+def queue_depths() -> Dict[str, int]:
+    """Get the number of tasks waiting for a worker in each started executor."""
+    with _lock:
+        executors = list(_executors.items())
+    # ThreadPoolExecutor exposes no public backlog size
+    return {stage: executor._work_queue.qsize() for stage, executor in executors}
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """Shut down all stage executors."""
+    with _lock:
+        executors = list(_executors.items())
+        _executors.clear()
+    for stage, executor in executors:
+        executor.shutdown(wait=wait)
+        logger.debug(f"Shut down '{stage}' executor")
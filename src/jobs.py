@@ -0,0 +1,461 @@
+"""
+Asynchronous story jobs for Story2Audio.
+
+Stories submitted as jobs are recorded in a SQLite database and rendered
+by a small pool of worker tasks, independently of the client connection.
+Clients poll or watch a job's progress and fetch the audio once it has
+succeeded. Jobs survive a server restart: anything queued or running when
+the process stopped is queued again on start-up, and finished jobs are
+deleted after a retention period.
+
+Database access runs on a single dedicated thread so it never blocks the
+event loop. Progress of running jobs is kept in memory for watchers and
+written to the database at most once per progress interval; only state
+changes such as a job finishing are synced to disk right away.
+"""
+import asyncio
+import dataclasses
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from src.admission import AdmissionRejected
+from src.progress_tracker import ProgressTracker
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED)
+
+# Renders a story to encoded audio, reporting per-chunk progress
+RenderFn = Callable[[str, str, ProgressTracker], Awaitable[bytes]]
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when too many jobs are waiting to be processed."""
+
+
+@dataclass
+class Job:
+    """State of one submitted story."""
+    job_id: str
+    story_text: str
+    state: str = JOB_QUEUED
+    current: int = 0
+    total: int = 0
+    message: str = ""
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    audio_path: Optional[str] = None
+    audio_size: int = 0
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job has succeeded or failed."""
+        return self.state in FINISHED_STATES
+
+
+_COLUMNS = [f.name for f in fields(Job)]
+
+
+class JobStore:
+    """Durable job records in a SQLite database."""
+
+    def __init__(self, path: str):
+        """
+        Open (and create if needed) the job database.
+
+        Args:
+            path: Database file path, or ":memory:"
+        """
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL with NORMAL only syncs at checkpoints; durable writes opt in to FULL
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, story_text TEXT NOT NULL, state TEXT NOT NULL, "
+            "current INTEGER NOT NULL, total INTEGER NOT NULL, message TEXT NOT NULL, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, audio_path TEXT, audio_size INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, created_at)")
+
+    def create(self, story_text: str) -> Job:
+        """Insert a new queued job."""
+        now = time.time()
+        job = Job(job_id=uuid.uuid4().hex, story_text=story_text, created_at=now, updated_at=now)
+        with self._lock, self._durable():
+            self._conn.execute(
+                f"INSERT INTO jobs ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                [getattr(job, name) for name in _COLUMNS]
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by id, or None if it does not exist."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return Job(*row) if row else None
+
+    def update(self, job_id: str, durable: bool = False, **values) -> None:
+        """
+        Update fields of a job and its modification time.
+
+        Args:
+            job_id: Job to update
+            durable: Sync the change to disk before returning
+            **values: Job fields to set
+        """
+        values["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in values)
+        with self._lock:
+            if durable:
+                with self._durable():
+                    self._conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", [*values.values(), job_id])
+            else:
+                self._conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", [*values.values(), job_id])
+
+    def _durable(self) -> "_FullSync":
+        """Context manager making the statements inside it durable (caller holds the lock)."""
+        return _FullSync(self._conn)
+
+    def requeue_unfinished(self) -> List[str]:
+        """Put jobs interrupted by a shutdown back in the queue; returns queued ids, oldest first."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, current = 0, updated_at = ? WHERE state = ?",
+                (JOB_QUEUED, time.time(), JOB_RUNNING)
+            )
+            rows = self._conn.execute(
+                "SELECT job_id FROM jobs WHERE state = ? ORDER BY created_at", (JOB_QUEUED,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def delete_finished_before(self, timestamp: float) -> List[Job]:
+        """Delete finished jobs last updated before timestamp and return them."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE state IN (?, ?) AND updated_at < ?",
+                (*FINISHED_STATES, timestamp)
+            ).fetchall()
+            self._conn.executemany("DELETE FROM jobs WHERE job_id = ?", [(row[0],) for row in rows])
+        return [Job(*row) for row in rows]
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
+
+
+class _FullSync:
+    """Switch a connection to synchronous=FULL for the duration of a block."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self) -> None:
+        self._conn.execute("PRAGMA synchronous=FULL")
+
+    def __exit__(self, *exc) -> None:
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+
+class JobManager:
+    """Runs queued jobs on a pool of worker tasks and notifies watchers of changes."""
+
+    def __init__(
+        self,
+        store: JobStore,
+        render: RenderFn,
+        audio_dir: str,
+        workers: int = 2,
+        max_queued: int = 1000,
+        retention: float = 86400,
+        retry_delay: float = 1.0,
+        progress_interval: float = 0.5,
+        cleanup_interval: float = 300
+    ):
+        """
+        Initialize manager.
+
+        Args:
+            store: Job records
+            render: Coroutine function rendering (story_text, job_id, progress) to audio bytes
+            audio_dir: Directory for finished audio files
+            workers: Number of jobs processed concurrently
+            max_queued: Maximum number of queued jobs before submissions are rejected
+            retention: Seconds finished jobs and their audio are kept
+            retry_delay: Wait before retrying a job the server was too busy to admit
+            progress_interval: Minimum seconds between progress writes of a job
+            cleanup_interval: Seconds between deletions of expired jobs
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.store = store
+        self.render = render
+        self.audio_dir = Path(audio_dir)
+        self.workers = workers
+        self.max_queued = max_queued
+        self.retention = retention
+        self.retry_delay = retry_delay
+        self.progress_interval = progress_interval
+        self.cleanup_interval = cleanup_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._changed: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._db: Optional[ThreadPoolExecutor] = None
+        # Current state of running jobs, ahead of the database for progress
+        self._live: Dict[str, Job] = {}
+        self._flush_handles: Dict[str, asyncio.TimerHandle] = {}
+
+    async def _run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a store call on the database thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._db, lambda: fn(*args, **kwargs))
+
+    async def start(self) -> None:
+        """Clean up expired jobs, re-queue interrupted ones and start the workers."""
+        self._db = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jobs-db")
+        self.audio_dir.mkdir(parents=True, exist_ok=True)
+        self._queue = asyncio.Queue()
+        self._changed = asyncio.Event()
+        await self.cleanup_expired()
+        pending = await self._run(self.store.requeue_unfinished)
+        for job_id in pending:
+            self._queue.put_nowait(job_id)
+        if pending:
+            logger.info(f"Re-queued {len(pending)} unfinished jobs")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._cleanup_loop()))
+        logger.info(f"Started {self.workers} job workers")
+
+    async def stop(self) -> None:
+        """Stop the workers; running jobs are re-queued on the next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for handle in self._flush_handles.values():
+            handle.cancel()
+        self._flush_handles.clear()
+        self._live.clear()
+        if self._db is not None:
+            self._db.shutdown(wait=True)
+            self._db = None
+
+    @property
+    def queued(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, story_text: str) -> Job:
+        """
+        Record a validated story as a new job and queue it.
+
+        Raises:
+            JobQueueFull: If max_queued jobs are already waiting
+        """
+        if self._queue is None:
+            raise RuntimeError("Job manager is not running")
+        if self.queued >= self.max_queued:
+            raise JobQueueFull(f"{self.queued} jobs are already queued")
+        job = await self._run(self.store.create, story_text)
+        self._queue.put_nowait(job.job_id)
+        logger.info(f"[job {job.job_id[:8]}] Queued ({len(story_text.split())} words)")
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Get a job's current state."""
+        live = self._live.get(job_id)
+        if live is not None:
+            return dataclasses.replace(live)
+        return await self._run(self.store.get, job_id)
+
+    async def watch(self, job_id: str) -> AsyncIterator[Job]:
+        """
+        Yield a job's state now and after every change until it finishes.
+
+        Raises:
+            KeyError: If the job does not exist
+        """
+        job = await self.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        yield job
+        while not job.finished:
+            # Take the event before reading so a change in between is not missed
+            changed = self._changed
+            latest = await self.get(job_id)
+            if latest is None:
+                return
+            if (latest.state, latest.current, latest.total) == (job.state, job.current, job.total):
+                await changed.wait()
+                continue
+            job = latest
+            yield job
+
+    def read_audio(self, job_id: str) -> bytes:
+        """
+        Read the audio of a succeeded job (blocking; call from an executor).
+
+        Raises:
+            KeyError: If the job does not exist
+            ValueError: If the job has not succeeded
+        """
+        job = self.store.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        if job.state != JOB_SUCCEEDED or not job.audio_path:
+            raise ValueError(f"Job {job_id} is {job.state}")
+        with open(job.audio_path, "rb") as f:
+            return f.read()
+
+    async def cleanup_expired(self) -> int:
+        """Delete finished jobs older than the retention period and their audio."""
+        return await self._run(self._delete_expired)
+
+    def _delete_expired(self) -> int:
+        expired = self.store.delete_finished_before(time.time() - self.retention)
+        for job in expired:
+            if job.audio_path:
+                Path(job.audio_path).unlink(missing_ok=True)
+        if expired:
+            logger.info(f"Deleted {len(expired)} expired jobs")
+        return len(expired)
+
+    async def _cleanup_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            try:
+                await self.cleanup_expired()
+            except Exception as e:
+                logger.error(f"Job cleanup failed: {e}")
+
+    def _notify(self) -> None:
+        """Wake up watchers."""
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def _update(self, job_id: str, durable: bool = False, **values) -> None:
+        """Write fields of a job on the database thread and wake up its watchers."""
+        await self._run(self.store.update, job_id, durable=durable, **values)
+        live = self._live.get(job_id)
+        if live is not None:
+            for name, value in values.items():
+                setattr(live, name, value)
+        self._notify()
+
+    def _report_progress(self, job_id: str, current: int, total: int) -> None:
+        """Progress callback: update watchers now and the database at most once per interval."""
+        live = self._live.get(job_id)
+        if live is None:
+            return
+        live.current, live.total = current, total
+        self._notify()
+        if job_id not in self._flush_handles:
+            loop = asyncio.get_running_loop()
+            self._flush_handles[job_id] = loop.call_later(self.progress_interval, self._flush_progress, job_id)
+
+    def _flush_progress(self, job_id: str) -> None:
+        self._flush_handles.pop(job_id, None)
+        live = self._live.get(job_id)
+        if live is not None and self._db is not None:
+            # Fire and forget: the single database thread keeps writes in order
+            self._db.submit(self.store.update, job_id, current=live.current, total=live.total)
+
+    async def _finish(self, job_id: str, **values) -> None:
+        """Durably record a job leaving the running state and stop tracking it in memory."""
+        handle = self._flush_handles.pop(job_id, None)
+        if handle is not None:
+            handle.cancel()
+        live = self._live.get(job_id)
+        if live is not None:
+            values.setdefault("current", live.current)
+            values.setdefault("total", live.total)
+        await self._run(self.store.update, job_id, durable=True, **values)
+        self._live.pop(job_id, None)
+        self._notify()
+
+    def _save_audio(self, job_id: str, audio: bytes) -> str:
+        path = self.audio_dir / f"{job_id}.mp3"
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(audio)
+        os.replace(tmp_path, path)
+        return str(path)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._process(job_id)
+            except asyncio.CancelledError:
+                self._live.pop(job_id, None)
+                raise
+            except Exception as e:
+                # The job's own bookkeeping failed (database locked, disk full, ...);
+                # give up on this job but keep the worker running
+                logger.exception(f"[job {job_id[:8]}] Bookkeeping failed: {e}")
+                await self._fail_bookkeeping(job_id, e)
+
+    async def _fail_bookkeeping(self, job_id: str, error: Exception) -> None:
+        """Mark a job failed after its bookkeeping raised, without letting a second failure escape."""
+        handle = self._flush_handles.pop(job_id, None)
+        if handle is not None:
+            handle.cancel()
+        self._live.pop(job_id, None)
+        try:
+            await self._run(
+                self.store.update, job_id, durable=True, state=JOB_FAILED, message=f"Internal error: {error}"
+            )
+        except Exception as e:
+            # Still marked running in the database, so it is re-queued on the next start
+            logger.error(f"[job {job_id[:8]}] Could not mark job failed: {e}")
+        self._notify()
+
+    async def _process(self, job_id: str) -> None:
+        """Render one queued job and record its outcome."""
+        loop = asyncio.get_running_loop()
+        job = await self._run(self.store.get, job_id)
+        if job is None or job.finished:
+            return
+        tag = f"[job {job_id[:8]}]"
+        self._live[job_id] = dataclasses.replace(job)
+        await self._update(job_id, state=JOB_RUNNING, current=0, total=0, message="")
+
+        def report(current: int, total: int) -> None:
+            self._report_progress(job_id, current, total)
+
+        try:
+            audio = await self.render(job.story_text, job_id, ProgressTracker(0, callback=report))
+            path = await loop.run_in_executor(None, self._save_audio, job_id, audio)
+        except AdmissionRejected as e:
+            # The server is busy; try again later instead of failing the job
+            logger.info(f"{tag} Not admitted ({e}), retrying in {self.retry_delay:.1f}s")
+            await self._finish(job_id, state=JOB_QUEUED, current=0, message=str(e))
+            await asyncio.sleep(self.retry_delay)
+            self._queue.put_nowait(job_id)
+            return
+        except Exception as e:
+            logger.error(f"{tag} Failed: {e}")
+            await self._finish(job_id, state=JOB_FAILED, message=str(e) or type(e).__name__)
+        else:
+            logger.info(f"{tag} Succeeded ({len(audio)} bytes)")
+            await self._finish(
+                job_id, state=JOB_SUCCEEDED, audio_path=path, audio_size=len(audio), message="Audio generated successfully"
+            )
@@ -3,20 +3,26 @@ Text-to-Speech module for Story2Audio.
 
 Uses Kokoro-82M for high-quality TTS generation with voice options.
 """
-from kokoro import KPipeline
+import numpy as np
 import soundfile as sf
 import logging
 import os
-from typing import List, Optional
+from typing import List, Optional, Union, TYPE_CHECKING
 from pathlib import Path
+from config import Config
+from src.cache import get_content_cache, normalize_cache_text
+from src.cancellation import CancellationToken, RequestCancelled, raise_if_cancelled
+
+if TYPE_CHECKING:
+    from kokoro import KPipeline
 
 logger = logging.getLogger(__name__)
 
 # Global pipeline instance for reuse
-_pipeline_instance: Optional[KPipeline] = None
+_pipeline_instance: Optional['KPipeline'] = None
 
 
-def get_pipeline(lang_code: str = 'a') -> KPipeline:
+def get_pipeline(lang_code: str = 'a') -> 'KPipeline':
     """
     Get or create TTS pipeline instance (singleton pattern).
     
@@ -24,21 +30,170 @@ def get_pipeline(lang_code: str = 'a') -> KPipeline:
         lang_code: Language code ('a' for auto-detect)
         
     Returns:
-        KPipeline instance
+        KPipeline instance (or the configured backend's equivalent)
     """
     global _pipeline_instance
     if _pipeline_instance is None:
-        logger.info("Initializing Kokoro TTS pipeline...")
-        _pipeline_instance = KPipeline(lang_code=lang_code)
+        from src.backends import create_tts_pipeline
+        
+        logger.info(f"Initializing {Config.TTS_BACKEND} TTS pipeline...")
+        _pipeline_instance = create_tts_pipeline(lang_code)
         logger.info("TTS pipeline initialized successfully")
     return _pipeline_instance
 
 
+def warm_up(voice: str = 'af_heart', text: str = "The old lighthouse keeper lit the lamp.") -> int:
+    """
+    Load the pipeline and run one synthesis, bypassing the audio cache.
+    
+    The first inference pays one-time costs (weight loading, kernel
+    selection); running it at startup keeps them off the first request.
+
+    Args:
+        voice: Voice to load
+        text: Short text to synthesize
+
+    Returns:
+        Number of samples produced
+    """
+    pipeline = get_pipeline()
+    samples = sum(len(audio) for _, _, audio in pipeline(text, voice=voice) if audio is not None)
+    logger.info(f"TTS warm-up produced {samples} samples")
+    return samples
+
+
+def synthesize_chunk(
+    text: str,
+    voice: str = 'af_heart',
+    pipeline: Optional['KPipeline'] = None,
+    cancel: Optional[CancellationToken] = None
+) -> np.ndarray:
+    """
+    Synthesize a single text chunk to a mono float32 waveform.
+    
+    Kokoro may split a chunk into several segments internally; all of
+    them are concatenated so the returned array covers the whole chunk.
+    When caching is enabled, audio is looked up by content first.
+
+    Args:
+        text: Text chunk to synthesize
+        voice: Voice style to use (default: 'af_heart')
+        pipeline: Pipeline to use (defaults to the shared instance)
+        cancel: Token checked before each Kokoro segment
+
+    Returns:
+        Float32 waveform, empty if the pipeline produced no audio
+
+    Raises:
+        ValueError: If text is empty
+        RequestCancelled: If cancel is cancelled before all segments are generated
+    """
+    if not text or not text.strip():
+        raise ValueError("Text chunk cannot be empty")
+    
+    cache = get_content_cache("audio")
+    if cache is not None:
+        key = cache.make_key(
+            "tts", normalize_cache_text(text), voice, Config.SAMPLE_RATE,
+            Config.TTS_BACKEND, Config.TTS_MODEL, Config.CACHE_VERSION
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            logger.debug(f"Audio cache hit for chunk ({len(text)} chars)")
+            return np.frombuffer(cached, dtype='<f4')
+    
+    raise_if_cancelled(cancel)
+    pipeline = pipeline or get_pipeline()
+    segments = []
+    # Segments are generated lazily, so stopping here skips the rest of the chunk
+    for _, _, audio in pipeline(text, voice=voice):
+        if audio is not None:
+            segments.append(np.asarray(audio, dtype=np.float32).reshape(-1))
+        raise_if_cancelled(cancel)
+    if not segments:
+        return np.zeros(0, dtype=np.float32)
+    
+    audio = np.concatenate(segments)
+    if cache is not None:
+        cache.set(key, audio.astype('<f4', copy=False).tobytes())
+    return audio
+
+
+def synthesize_batch(
+    texts: List[str],
+    voices: Optional[List[str]] = None,
+    cancels: Optional[List[Optional[CancellationToken]]] = None
+) -> List[Union[np.ndarray, Exception]]:
+    """
+    Synthesize a micro-batch of chunks through the shared pipeline.
+    
+    Kokoro has no batched inference API, so items run back to back on
+    the calling thread; the batching scheduler runs up to TTS_WORKERS of
+    these batches at once, matching the parallelism of the unbatched
+    path. Failures are returned per item instead of failing the whole
+    batch.
+
+    Args:
+        texts: Text chunks to synthesize
+        voices: Voice per chunk (defaults to 'af_heart' for all)
+        cancels: Cancellation token per chunk; a cancelled chunk's result is RequestCancelled
+
+    Returns:
+        Waveform or exception for each chunk, in input order
+    """
+    voices = voices or ['af_heart'] * len(texts)
+    cancels = cancels or [None] * len(texts)
+    pipeline = get_pipeline()
+    results: List[Union[np.ndarray, Exception]] = []
+    for text, voice, cancel in zip(texts, voices, cancels):
+        try:
+            results.append(synthesize_chunk(text, voice=voice, pipeline=pipeline, cancel=cancel))
+        except RequestCancelled as e:
+            results.append(e)
+        except Exception as e:
+            logger.error(f"Error synthesizing batched chunk: {e}")
+            results.append(e)
+    return results
+
+
+def save_chunk_audio(
+    audio: np.ndarray,
+    index: int,
+    output_dir: str = "outputs/temp",
+    sample_rate: int = 24000
+) -> Optional[str]:
+    """
+    Write a synthesized chunk to ``chunk_{index:04d}.wav`` in output_dir.
+
+    Args:
+        audio: Float32 waveform for the chunk
+        index: Chunk index used in the file name
+        output_dir: Directory to save the file in
+        sample_rate: Audio sample rate in Hz (default: 24000)
+
+    Returns:
+        Path to the written file, or None if the waveform is empty
+    """
+    if audio is None or len(audio) == 0:
+        logger.warning(f"No audio generated for chunk {index+1}")
+        return None
+    
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    out_path = str(output_path / f"chunk_{index:04d}.wav")
+    sf.write(out_path, audio, sample_rate)
+    
+    file_size_kb = os.path.getsize(out_path) / 1024
+    logger.info(f"Audio saved: {out_path} ({file_size_kb:.2f} KB)")
+    return out_path
+
+
 def text_to_coqui_audio(
     chunks: List[str], 
     output_dir: str = "outputs/temp",
     voice: str = 'af_heart',
-    sample_rate: int = 24000
+    sample_rate: int = 24000,
+    cancel: Optional[CancellationToken] = None
 ) -> List[str]:
     """
     Generate audio files from enhanced text chunks using Kokoro-82M.
@@ -48,6 +203,7 @@ def text_to_coqui_audio(
         output_dir: Directory to save temporary audio files
         voice: Voice style to use (default: 'af_heart')
         sample_rate: Audio sample rate in Hz (default: 24000)
+        cancel: Token checked between chunks and Kokoro segments
 
     Returns:
         List of paths to generated audio files
@@ -55,6 +211,7 @@ def text_to_coqui_audio(
     Raises:
         ValueError: If chunks list is empty
         RuntimeError: If audio generation fails
+        RequestCancelled: If cancel is cancelled before all chunks are generated
     """
     if not chunks:
         raise ValueError("Chunks list cannot be empty")
@@ -63,10 +220,6 @@ def text_to_coqui_audio(
         raise ValueError("Chunks must be a list")
     
     try:
-        # Ensure output directory exists
-        output_path = Path(output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
-        
         # Get pipeline instance
         pipeline = get_pipeline()
         audio_files: List[str] = []
@@ -81,30 +234,15 @@ def text_to_coqui_audio(
                 continue
             
             try:
-                out_path = str(output_path / f"chunk_{i:04d}.wav")
-                
-                # Generate audio
-                generator = pipeline(chunk, voice=voice)
-                audio_generated = False
-                
-                for j, (gs, ps, audio) in enumerate(generator):
-                    sf.write(out_path, audio, sample_rate)
-                    audio_generated = True
-                    if j == 0:  # Log only first iteration
-                        logger.debug(
-                            f"Generated audio for chunk {i+1}/{len(chunks)} - "
-                            f"Graphemes: {gs}, Phonemes: {ps}"
-                        )
-                
-                if audio_generated:
+                # Keep every segment Kokoro yields for the chunk
+                audio = synthesize_chunk(chunk, voice=voice, pipeline=pipeline, cancel=cancel)
+                out_path = save_chunk_audio(audio, i, output_dir, sample_rate=sample_rate)
+                if out_path:
                     audio_files.append(out_path)
-                    file_size_kb = os.path.getsize(out_path) / 1024
-                    logger.info(
-                        f"Audio saved: {out_path} ({file_size_kb:.2f} KB) [{i+1}/{total_chunks}]"
-                    )
-                else:
-                    logger.warning(f"No audio generated for chunk {i+1}")
+                    logger.debug(f"Generated audio for chunk {i+1}/{total_chunks} ({len(audio)} samples)")
                     
+            except RequestCancelled:
+                raise
             except Exception as e:
                 logger.error(f"Error generating audio for chunk {i+1}: {e}")
                 # Continue with other chunks instead of failing completely
@@ -116,6 +254,9 @@ def text_to_coqui_audio(
         logger.info(f"Successfully generated {len(audio_files)} audio files")
         return audio_files
         
+    except RequestCancelled:
+        logger.info(f"Audio generation cancelled after {len(audio_files)} of {len(chunks)} chunks")
+        raise
     except Exception as e:
         logger.error(f"Error in audio generation: {e}")
         raise RuntimeError(f"Audio generation failed: {e}") from e
\ No newline at end of file
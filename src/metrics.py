@@ -2,16 +2,176 @@
 Metrics and monitoring for Story2Audio.
 
 Tracks performance metrics, request statistics, and system health.
+Memory use is fixed: only in-flight requests and a ring buffer of recent
+ones are kept, and latency quantiles come from streaming sketches.
+
+Per-stage latency histograms and gauges can be scraped in the Prometheus
+text format from a small HTTP server on a side port.
 """
+import math
 import time
 import logging
-from typing import Dict, Optional
-from collections import defaultdict
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from collections import defaultdict, deque
 from dataclasses import dataclass, field
 from datetime import datetime
+from config import Config
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# A gauge callback returns one value, or one value per label (e.g. per stage)
+GaugeValue = Union[float, Dict[str, float]]
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observed values (Prometheus semantics)."""
+    
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Initialize histogram.
+        
+        Args:
+            buckets: Upper bounds of the buckets; +Inf is added implicitly
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float) -> None:
+        """Record one value."""
+        with self._lock:
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+                    break
+            else:
+                self._counts[-1] += 1
+            self.sum += value
+            self.count += 1
+    
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        """Get (cumulative bucket counts ending with +Inf, sum, count)."""
+        with self._lock:
+            counts, total_sum, count = list(self._counts), self.sum, self.count
+        cumulative = []
+        running = 0
+        for c in counts:
+            running += c
+            cumulative.append(running)
+        return cumulative, total_sum, count
+
+
+class QuantileSketch:
+    """
+    Streaming quantile estimator with bounded relative error (DDSketch-style).
+    
+    Values are counted in logarithmically sized buckets, so memory depends
+    only on the value range and accuracy, never on the number of values.
+    """
+    
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-6):
+        """
+        Initialize sketch.
+        
+        Args:
+            relative_accuracy: Maximum relative error of returned quantiles
+            min_value: Values at or below this are counted together as ~0
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._min_value = min_value
+        self._buckets: Dict[int, int] = defaultdict(int)
+        self._zero_count = 0
+        self.count = 0
+        self._lock = threading.Lock()
+    
+    def add(self, value: float) -> None:
+        """Record one value."""
+        with self._lock:
+            if value <= self._min_value:
+                self._zero_count += 1
+            else:
+                self._buckets[math.ceil(math.log(value) / self._log_gamma)] += 1
+            self.count += 1
+    
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile.
+        
+        Args:
+            q: Quantile in [0, 1]
+        
+        Returns:
+            Estimated value, or 0.0 if nothing was recorded
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        with self._lock:
+            if self.count == 0:
+                return 0.0
+            rank = q * (self.count - 1)
+            seen = self._zero_count
+            if rank < seen:
+                return 0.0
+            for index in sorted(self._buckets):
+                seen += self._buckets[index]
+                if rank < seen:
+                    # Midpoint of the bucket (gamma^(i-1), gamma^i] in relative terms
+                    return 2 * self._gamma ** index / (self._gamma + 1)
+            return 2 * self._gamma ** max(self._buckets) / (self._gamma + 1)
+    
+    def percentiles(self) -> Dict[str, float]:
+        """Get p50, p95 and p99."""
+        return {"p50": self.quantile(0.50), "p95": self.quantile(0.95), "p99": self.quantile(0.99)}
+
+
+class StageTotals:
+    """Thread-safe accumulator of the stage time spent on one request."""
+    
+    def __init__(self):
+        self._totals: Dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+    
+    def add(self, stage: str, seconds: float) -> None:
+        """Add time spent in a stage."""
+        with self._lock:
+            self._totals[stage] += seconds
+    
+    @property
+    def total(self) -> float:
+        """Total seconds across all stages."""
+        with self._lock:
+            return sum(self._totals.values())
+    
+    def as_dict(self) -> Dict[str, float]:
+        """Seconds per stage."""
+        with self._lock:
+            return dict(self._totals)
+
+
+def _labels(**labels: str) -> str:
+    """Format a Prometheus label set."""
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _bound(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
 
 @dataclass
 class RequestMetrics:
@@ -35,23 +195,42 @@ class RequestMetrics:
 class MetricsCollector:
     """Collects and aggregates metrics for the service."""
     
-    def __init__(self):
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, recent_size: int = 1000):
+        """
+        Initialize collector.
+        
+        Args:
+            buckets: Histogram bucket bounds in seconds
+            recent_size: Number of finished requests kept for inspection
+        """
+        # In-flight requests only; finished ones move to the ring buffer
         self._requests: Dict[str, RequestMetrics] = {}
+        self._recent: Deque[RequestMetrics] = deque(maxlen=recent_size)
         self._stats = defaultdict(int)
         self._total_requests = 0
         self._successful_requests = 0
         self._failed_requests = 0
         self._total_processing_time = 0.0
+        self._cancelled_work_saved = 0.0
+        self._buckets = tuple(buckets)
+        self._request_histogram = Histogram(self._buckets)
+        self._request_sketch = QuantileSketch()
+        self._stage_histograms: Dict[str, Histogram] = {}
+        self._stage_sketches: Dict[str, QuantileSketch] = {}
+        self._gauges: Dict[str, Tuple[str, Callable[[], GaugeValue], str]] = {}
+        self._lock = threading.Lock()
     
     def start_request(self, request_id: str, word_count: int = 0) -> None:
         """Start tracking a request."""
-        self._requests[request_id] = RequestMetrics(
+        metric = RequestMetrics(
             request_id=request_id,
             start_time=time.time(),
             word_count=word_count
         )
-        self._total_requests += 1
-        self._stats["requests_started"] += 1
+        with self._lock:
+            self._requests[request_id] = metric
+            self._total_requests += 1
+            self._stats["requests_started"] += 1
     
     def end_request(
         self, 
@@ -61,59 +240,272 @@ class MetricsCollector:
         chunk_count: int = 0
     ) -> None:
         """End tracking a request."""
-        if request_id not in self._requests:
-            logger.warning(f"Request {request_id} not found in metrics")
-            return
+        with self._lock:
+            metric = self._requests.pop(request_id, None)
+            if metric is None:
+                logger.warning(f"Request {request_id} not found in metrics")
+                return
+            
+            metric.end_time = time.time()
+            metric.status = status
+            metric.error = error
+            metric.chunk_count = chunk_count
+            self._recent.append(metric)
+            
+            duration = metric.duration
+            if duration:
+                self._total_processing_time += duration
+            
+            if status == "success":
+                self._successful_requests += 1
+                self._stats["requests_succeeded"] += 1
+            else:
+                self._failed_requests += 1
+                self._stats["requests_failed"] += 1
         
-        metric = self._requests[request_id]
-        metric.end_time = time.time()
-        metric.status = status
-        metric.error = error
-        metric.chunk_count = chunk_count
-        
-        duration = metric.duration
         if duration:
-            self._total_processing_time += duration
+            self._request_histogram.observe(duration)
+            self._request_sketch.add(duration)
+    
+    def record_cancelled_work(self, seconds: float) -> None:
+        """Record the estimated processing time skipped because a request was cancelled."""
+        with self._lock:
+            self._stats["requests_cancelled"] += 1
+            self._cancelled_work_saved += seconds
+    
+    @property
+    def in_flight(self) -> int:
+        """Number of requests started but not yet ended."""
+        return len(self._requests)
+    
+    def recent_requests(self) -> List[RequestMetrics]:
+        """Get the most recently finished requests, oldest first."""
+        with self._lock:
+            return list(self._recent)
+    
+    def observe_stage(self, stage: str, seconds: float) -> None:
+        """Record the time spent in one pipeline stage."""
+        # Look both up together so a concurrent reset() cannot remove one in between
+        with self._lock:
+            histogram = self._stage_histograms.get(stage)
+            if histogram is None:
+                histogram = self._stage_histograms[stage] = Histogram(self._buckets)
+            sketch = self._stage_sketches.get(stage)
+            if sketch is None:
+                sketch = self._stage_sketches[stage] = QuantileSketch()
+        histogram.observe(seconds)
+        sketch.add(seconds)
+    
+    @contextmanager
+    def time_stage(self, stage: str, totals: Optional[StageTotals] = None) -> Iterator[None]:
+        """
+        Context manager that records the duration of its block under a stage name.
+        
+        Args:
+            stage: Stage name
+            totals: Optional per-request accumulator that also receives the duration
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(stage, time.perf_counter() - start, totals)
+    
+    def record_stage(self, stage: str, seconds: float, totals: Optional[StageTotals] = None) -> None:
+        """
+        Record a stage duration measured elsewhere, e.g. by the worker that ran it.
+        
+        Args:
+            stage: Stage name
+            seconds: Execution time, excluding any time spent queued
+            totals: Optional per-request accumulator that also receives the duration
+        """
+        self.observe_stage(stage, seconds)
+        if totals is not None:
+            totals.add(stage, seconds)
+    
+    def register_gauge(self, name: str, help_text: str, fn: Callable[[], GaugeValue], label: str = "stage") -> None:
+        """
+        Register a gauge whose value is read at scrape time.
         
-        if status == "success":
-            self._successful_requests += 1
-            self._stats["requests_succeeded"] += 1
-        else:
-            self._failed_requests += 1
-            self._stats["requests_failed"] += 1
+        Args:
+            name: Metric name (without the service prefix)
+            help_text: Description shown in the exposition
+            fn: Returns the current value, or a dict of label value -> value
+            label: Label name used for the keys of a dict value
+        """
+        with self._lock:
+            self._gauges[name] = (help_text, fn, label)
     
     def get_stats(self) -> Dict:
         """Get aggregated statistics."""
+        with self._lock:
+            total_requests = self._total_requests
+            successful_requests = self._successful_requests
+            failed_requests = self._failed_requests
+            total_processing_time = self._total_processing_time
+            cancelled_work_saved = self._cancelled_work_saved
+            in_flight = len(self._requests)
+            stats = dict(self._stats)
+            stages = [(stage, h, self._stage_sketches[stage]) for stage, h in self._stage_histograms.items()]
+        
         avg_time = (
-            self._total_processing_time / self._successful_requests
-            if self._successful_requests > 0
+            total_processing_time / successful_requests
+            if successful_requests > 0
             else 0
         )
         
+        stage_times = {}
+        for stage, histogram, sketch in stages:
+            _, total_sum, count = histogram.snapshot()
+            stage_times[stage] = {
+                "count": count,
+                "total": total_sum,
+                "average": total_sum / count if count else 0,
+                **sketch.percentiles()
+            }
+        
         return {
-            "total_requests": self._total_requests,
-            "successful_requests": self._successful_requests,
-            "failed_requests": self._failed_requests,
+            "total_requests": total_requests,
+            "successful_requests": successful_requests,
+            "failed_requests": failed_requests,
+            "in_flight_requests": in_flight,
             "success_rate": (
-                self._successful_requests / self._total_requests
-                if self._total_requests > 0
+                successful_requests / total_requests
+                if total_requests > 0
                 else 0
             ),
             "average_processing_time": avg_time,
-            "total_processing_time": self._total_processing_time,
-            "additional_stats": dict(self._stats)
+            "total_processing_time": total_processing_time,
+            "cancelled_work_seconds_saved": cancelled_work_saved,
+            "latency_percentiles": self._request_sketch.percentiles(),
+            "stage_times": stage_times,
+            "additional_stats": stats
         }
     
+    def render_prometheus(self, prefix: str = "story2audio") -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        
+        def histogram_lines(name: str, histogram: Histogram, **labels: str) -> None:
+            cumulative, total_sum, count = histogram.snapshot()
+            for bound, value in zip(list(histogram.buckets) + [float("inf")], cumulative):
+                lines.append(f"{name}_bucket{_labels(**labels, le=_bound(bound))} {value}")
+            lines.append(f"{name}_sum{_labels(**labels)} {total_sum!r}")
+            lines.append(f"{name}_count{_labels(**labels)} {count}")
+        
+        # Consistent snapshot of the counters; histograms and gauges are read after releasing the lock
+        with self._lock:
+            successful_requests = self._successful_requests
+            failed_requests = self._failed_requests
+            in_flight = len(self._requests)
+            cancelled_work_saved = self._cancelled_work_saved
+            request_histogram = self._request_histogram
+            stage_histograms = sorted(self._stage_histograms.items())
+            gauges = sorted(self._gauges.items())
+        
+        name = f"{prefix}_requests_total"
+        lines += [f"# HELP {name} Finished requests by status", f"# TYPE {name} counter"]
+        lines.append(f"{name}{_labels(status='success')} {successful_requests}")
+        lines.append(f"{name}{_labels(status='error')} {failed_requests}")
+        
+        name = f"{prefix}_requests_in_flight"
+        lines += [f"# HELP {name} Requests currently being processed", f"# TYPE {name} gauge"]
+        lines.append(f"{name} {in_flight}")
+        
+        name = f"{prefix}_cancelled_work_seconds_total"
+        lines += [f"# HELP {name} Estimated CPU seconds skipped by cancelling abandoned requests", f"# TYPE {name} counter"]
+        lines.append(f"{name} {cancelled_work_saved!r}")
+        
+        name = f"{prefix}_request_duration_seconds"
+        lines += [f"# HELP {name} End-to-end request processing time", f"# TYPE {name} histogram"]
+        histogram_lines(name, request_histogram)
+        
+        name = f"{prefix}_stage_duration_seconds"
+        lines += [f"# HELP {name} Time spent per pipeline stage", f"# TYPE {name} histogram"]
+        for stage, histogram in stage_histograms:
+            histogram_lines(name, histogram, stage=stage)
+        
+        for gauge_name, (help_text, fn, label) in gauges:
+            name = f"{prefix}_{gauge_name}"
+            try:
+                value = fn()
+            except Exception as e:
+                logger.warning(f"Gauge {gauge_name} failed: {e}")
+                continue
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            if isinstance(value, dict):
+                for key, v in sorted(value.items()):
+                    lines.append(f"{name}{_labels(**{label: key})} {v}")
+            else:
+                lines.append(f"{name} {value}")
+        
+        return "\n".join(lines) + "\n"
+    
     def reset(self) -> None:
         """Reset all metrics."""
-        self._requests.clear()
-        self._stats.clear()
-        self._total_requests = 0
-        self._successful_requests = 0
-        self._failed_requests = 0
-        self._total_processing_time = 0.0
+        with self._lock:
+            self._requests.clear()
+            self._recent.clear()
+            self._stats.clear()
+            self._total_requests = 0
+            self._successful_requests = 0
+            self._failed_requests = 0
+            self._total_processing_time = 0.0
+            self._cancelled_work_saved = 0.0
+            self._request_histogram = Histogram(self._buckets)
+            self._request_sketch = QuantileSketch()
+            self._stage_histograms.clear()
+            self._stage_sketches.clear()
         logger.info("Metrics reset")
 
 
+class _MetricsHandler(BaseHTTPRequestHandler):
+    collector: "MetricsCollector"
+    
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.collector.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(f"Metrics scrape: {format % args}")
+
+
+def start_metrics_server(
+    port: int,
+    collector: Optional[MetricsCollector] = None,
+    host: str = "0.0.0.0"
+) -> ThreadingHTTPServer:
+    """
+    Serve /metrics in the Prometheus text format from a daemon thread.
+    
+    Args:
+        port: Port to listen on (0 picks a free port)
+        collector: Collector to expose (defaults to the global one)
+        host: Interface to bind
+    
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+    handler = type("MetricsHandler", (_MetricsHandler,), {"collector": collector or metrics})
+    server = ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, name="s2a-metrics", daemon=True)
+    thread.start()
+    logger.info(f"Metrics endpoint listening on {host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def parse_buckets(value: str) -> Tuple[float, ...]:
+    """Parse a comma-separated list of bucket bounds (empty = DEFAULT_BUCKETS)."""
+    return tuple(float(v) for v in value.split(",") if v.strip()) or DEFAULT_BUCKETS
+
+
 # Global metrics collector instance
-metrics = MetricsCollector()
+metrics = MetricsCollector(buckets=parse_buckets(Config.METRICS_BUCKETS), recent_size=Config.METRICS_RECENT_REQUESTS)
@@ -0,0 +1,151 @@
+"""
+Staged processing pipeline for Story2Audio.
+
+Runs the per-chunk stages (enhance, synthesize, encode) concurrently so
+that chunk N+1 can be enhanced while chunk N is being synthesized. Stages
+are connected by bounded asyncio queues, which provide backpressure when
+a downstream stage falls behind.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the item stream on a queue
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """A single pipeline stage.
+
+    ``fn`` is called as ``fn(index, item)`` in a worker thread and its
+    return value is passed on to the next stage. Coroutine functions are
+    awaited on the event loop instead. With ``batch_size`` > 1
+    the stage takes up to that many items that are already waiting and
+    calls ``fn(indices, items)``, which must return one result per item.
+    """
+    name: str
+    fn: Callable[[Any, Any], Any]
+    executor: Optional[Any] = None
+    batch_size: int = 1
+
+
+class _Failure:
+    """Carries a stage exception downstream to the consumer."""
+
+    def __init__(self, stage: str, index: int, error: BaseException):
+        self.stage = stage
+        self.index = index
+        self.error = error
+
+
+def _take_batch(first: Any, inbox: asyncio.Queue, batch_size: int) -> List[Any]:
+    """Collect ``first`` plus up to ``batch_size - 1`` entries already queued."""
+    batch = [first]
+    while len(batch) < batch_size and batch[-1] is not _DONE:
+        try:
+            batch.append(inbox.get_nowait())
+        except asyncio.QueueEmpty:
+            break
+    return batch
+
+
+async def _call(loop: asyncio.AbstractEventLoop, stage: Stage, *args: Any) -> Any:
+    """Run a stage function: await coroutines, offload everything else."""
+    if asyncio.iscoroutinefunction(stage.fn):
+        return await stage.fn(*args)
+    return await loop.run_in_executor(stage.executor, stage.fn, *args)
+
+
+async def _run_stage(stage: Stage, inbox: asyncio.Queue, outbox: asyncio.Queue) -> None:
+    """Process items from ``inbox`` in order and forward results to ``outbox``."""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = _take_batch(await inbox.get(), inbox, max(1, stage.batch_size))
+        done = batch[-1] is _DONE
+        if done:
+            batch.pop()
+
+        # Failures from earlier stages pass through untouched
+        work = [(index, item) for index, item in batch if not isinstance(item, _Failure)]
+        results = {}
+        if work:
+            indices = [index for index, _ in work]
+            try:
+                if stage.batch_size > 1:
+                    outputs = await _call(loop, stage, indices, [item for _, item in work])
+                    if len(outputs) != len(work):
+                        raise RuntimeError(f"Stage returned {len(outputs)} results for {len(work)} items")
+                else:
+                    index, item = work[0]
+                    outputs = [await _call(loop, stage, index, item)]
+                results = dict(zip(indices, outputs))
+            except Exception as e:
+                logger.error(f"Stage '{stage.name}' failed on items {indices}: {e}")
+                results = {index: _Failure(stage.name, index, e) for index in indices}
+
+        for index, item in batch:
+            await outbox.put((index, results.get(index, item)))
+        if done:
+            await outbox.put(_DONE)
+            return
+
+
+async def run_pipeline(
+    items: Iterable[Any],
+    stages: List[Stage],
+    queue_size: int = 2
+) -> AsyncIterator[Any]:
+    """
+    Push items through the stages and yield final results in input order.
+
+    Each stage runs as its own task, so different items can be in different
+    stages at the same time. Queues hold at most ``queue_size`` items, so a
+    slow stage throttles the stages feeding it.
+
+    Args:
+        items: Inputs for the first stage
+        stages: Stages to run, in order
+        queue_size: Capacity of each inter-stage queue
+
+    Yields:
+        Output of the last stage for each item, in input order
+
+    Raises:
+        ValueError: If no stages are given
+        Exception: The first exception raised by any stage
+    """
+    if not stages:
+        raise ValueError("Pipeline requires at least one stage")
+
+    # A stage's inbox must be able to hold a full batch
+    capacities = [max(1, queue_size, stage.batch_size) for stage in stages] + [max(1, queue_size)]
+    queues = [asyncio.Queue(maxsize=capacity) for capacity in capacities]
+
+    async def feed() -> None:
+        for index, item in enumerate(items):
+            await queues[0].put((index, item))
+        await queues[0].put(_DONE)
+
+    tasks = [asyncio.ensure_future(feed())]
+    tasks += [
+        asyncio.ensure_future(_run_stage(stage, queues[i], queues[i + 1]))
+        for i, stage in enumerate(stages)
+    ]
+
+    try:
+        while True:
+            entry = await queues[-1].get()
+            if entry is _DONE:
+                break
+            _, result = entry
+            if isinstance(result, _Failure):
+                raise result.error
+            yield result
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
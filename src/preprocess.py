@@ -6,7 +6,9 @@ normalization, and intelligent chunking for optimal processing.
 """
 import re
 import logging
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple
+
+from src.chunker import chunk_text
 
 logger = logging.getLogger(__name__)
 
@@ -28,16 +30,26 @@ def clean_text(text: str) -> str:
     return cleaned
 
 
-def chunk_story(text: str, chunk_size: int = 150, overlap: int = 0) -> List[str]:
+def chunk_story(
+    text: str,
+    chunk_size: int = 150,
+    overlap: int = 0,
+    max_tokens: Optional[int] = None,
+    word_spans: Optional[Sequence[Tuple[int, int]]] = None
+) -> List[str]:
     """
-    Split a story into chunks of approximately chunk_size words.
+    Split a story into chunks of at most chunk_size words.
     
-    Uses intelligent chunking to preserve sentence boundaries when possible.
+    Chunks are packed from whole sentences (see src.chunker); only
+    sentences longer than a chunk are split mid-sentence.
 
     Args:
         text: Input story text
-        chunk_size: Approximate number of words per chunk (default: 150)
-        overlap: Number of words to overlap between chunks (default: 0)
+        chunk_size: Maximum number of words per chunk (default: 150)
+        overlap: Number of words to overlap between chunks (default: 0);
+            overlapping chunks are plain word windows
+        max_tokens: Maximum estimated TTS tokens per chunk (default: no limit)
+        word_spans: Word offsets in text if already known (see StoryAnalysis)
 
     Returns:
         List of text chunks
@@ -52,44 +64,21 @@ def chunk_story(text: str, chunk_size: int = 150, overlap: int = 0) -> List[str]
     if overlap < 0 or overlap >= chunk_size:
         raise ValueError("Overlap must be non-negative and less than chunk_size")
 
-    # Clean text
-    cleaned_text = clean_text(text)
-    words = cleaned_text.split()
-    
-    # Filter out empty strings
-    words = [w for w in words if w]
-    
-    if not words:
-        logger.warning("Empty word list after cleaning")
-        return []
+    if overlap == 0:
+        chunks = [chunk.text for chunk in chunk_text(text, max_words=chunk_size, max_tokens=max_tokens, word_spans=word_spans)]
+        avg_words = sum(len(chunk.split()) for chunk in chunks) // len(chunks) if chunks else 0
+        logger.info(f"Split story into {len(chunks)} chunks (avg {avg_words} words/chunk)")
+        return chunks
 
+    words = clean_text(text).split()
     chunks: List[str] = []
     i = 0
-    
     while i < len(words):
-        # Calculate chunk end
         chunk_end = min(i + chunk_size, len(words))
-        chunk_words = words[i:chunk_end]
-        
-        # Try to end at sentence boundary if not at end
-        if chunk_end < len(words) and chunk_size > 20:
-            # Look for sentence endings in the last 20% of chunk
-            lookback_start = max(0, len(chunk_words) - int(chunk_size * 0.2))
-            for j in range(len(chunk_words) - 1, lookback_start - 1, -1):
-                if chunk_words[j].endswith(('.', '!', '?')):
-                    chunk_words = chunk_words[:j + 1]
-                    chunk_end = i + len(chunk_words)
-                    break
-        
-        chunk = ' '.join(chunk_words)
-        chunks.append(chunk)
-        
-        # Move to next chunk with overlap
-        i = chunk_end - overlap if overlap > 0 else chunk_end
-        
-        if i >= len(words):
+        chunks.append(' '.join(words[i:chunk_end]))
+        if chunk_end >= len(words):
             break
+        i = chunk_end - overlap
 
-    avg_words = len(words) // len(chunks) if chunks else 0
-    logger.info(f"Split story into {len(chunks)} chunks (avg {avg_words} words/chunk)")
-    return chunks
\ No newline at end of file
+    logger.info(f"Split story into {len(chunks)} overlapping chunks")
+    return chunks
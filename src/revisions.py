@@ -0,0 +1,134 @@
+"""
+Edit-aware re-rendering for Story2Audio.
+
+Requests that carry a story_id are treated as versions of the same story.
+The store remembers the chunk layout of the last version rendered under
+each id and the synthesized audio of its chunks, keyed by chunk content.
+A resubmitted story is chunked against the previous layout (see
+src.chunker.chunk_text), so an edited sentence only changes the chunk
+that contains it; every other chunk is stitched from stored audio instead
+of being enhanced and synthesized again.
+"""
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import Config
+from src.cache import ContentCache, rendered_audio_key
+from src.chunker import Chunk, chunk_text
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RevisionPlan:
+    """Chunks of a story version and the stored audio that can be reused for them."""
+    story_id: str
+    chunks: List[Chunk]
+    audio: List[Optional[np.ndarray]]
+
+    @property
+    def changed(self) -> List[int]:
+        """Indices of chunks that have to be rendered."""
+        return [i for i, audio in enumerate(self.audio) if audio is None]
+
+    @property
+    def changed_words(self) -> int:
+        """Words in the chunks that have to be rendered."""
+        return sum(self.chunks[i].word_count for i in self.changed)
+
+
+class RevisionStore:
+    """Chunk layouts of story versions and the audio of their chunks."""
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_memory_bytes: int = 256 * 1024 * 1024,
+        max_disk_bytes: int = 2048 * 1024 * 1024
+    ):
+        """
+        Initialize store.
+
+        Args:
+            directory: Directory for persisted layouts and audio (None = memory only)
+            max_memory_bytes: Size limit of the in-memory tier
+            max_disk_bytes: Size limit of the disk tier
+        """
+        self._cache = ContentCache(directory, max_memory_bytes=max_memory_bytes, max_disk_bytes=max_disk_bytes)
+
+    @staticmethod
+    def _layout_key(story_id: str) -> str:
+        return ContentCache.make_key("layout", story_id)
+
+    @staticmethod
+    def audio_key(text: str) -> str:
+        """Key of a chunk's rendered audio; covers everything that changes how it sounds."""
+        return rendered_audio_key("chunk", text)
+
+    def layout(self, story_id: str) -> List[str]:
+        """Chunk texts of the last version rendered under story_id (empty if unknown)."""
+        stored = self._cache.get(self._layout_key(story_id))
+        return json.loads(stored) if stored is not None else []
+
+    def plan(
+        self,
+        story_id: str,
+        text: str,
+        max_words: int,
+        max_tokens: Optional[int] = None,
+        word_spans: Optional[Sequence[Tuple[int, int]]] = None
+    ) -> RevisionPlan:
+        """
+        Chunk a story version and look up stored audio for its chunks.
+
+        word_spans are the word offsets in text, if already known.
+
+        Raises:
+            ValueError: If the text has no words
+        """
+        chunks = chunk_text(
+            text, max_words=max_words, max_tokens=max_tokens, word_spans=word_spans, previous=self.layout(story_id)
+        )
+        if not chunks:
+            raise ValueError("Input text cannot be empty")
+        audio = []
+        for chunk in chunks:
+            stored = self._cache.get(self.audio_key(chunk.text))
+            audio.append(np.frombuffer(stored, dtype='<f4') if stored is not None else None)
+        plan = RevisionPlan(story_id, chunks, audio)
+        logger.info(f"Story {story_id}: reusing {len(chunks) - len(plan.changed)} of {len(chunks)} chunks")
+        return plan
+
+    def commit(self, plan: RevisionPlan, audio: Sequence[np.ndarray]) -> None:
+        """Store the audio of newly rendered chunks and make plan the latest layout of its story."""
+        for i in plan.changed:
+            if len(audio[i]) > 0:
+                self._cache.set(self.audio_key(plan.chunks[i].text), audio[i].astype('<f4', copy=False).tobytes())
+        layout = [chunk.text for chunk in plan.chunks]
+        self._cache.set(self._layout_key(plan.story_id), json.dumps(layout).encode("utf-8"))
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and sizes of the underlying cache."""
+        return self._cache.stats()
+
+
+_store: Optional[RevisionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_revision_store() -> RevisionStore:
+    """Get the shared revision store configured from Config."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = RevisionStore(
+                directory=Config.REVISION_DIR or None,
+                max_memory_bytes=Config.REVISION_MEMORY_MB * 1024 * 1024,
+                max_disk_bytes=Config.REVISION_MAX_DISK_MB * 1024 * 1024
+            )
+        return _store
@@ -0,0 +1,258 @@
+"""
+Cross-request micro-batching scheduler for shared model inference.
+
+Work items from all in-flight requests are collected into micro-batches
+(bounded by size and by how long the first item may wait) and run through
+a batch function on a small pool of dedicated worker threads, so several
+batches can be in flight at once. Items are picked round-robin across
+requests so one long story cannot starve short ones, and items whose
+request was cancelled while they waited are dropped instead of run.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from config import Config
+from src.cancellation import CancellationToken, RequestCancelled
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Queued item, its future and the submitting request's cancellation token
+_Entry = Tuple[Any, Future, Optional[CancellationToken]]
+
+
+class BatchScheduler:
+    """Collects items from many owners into fair micro-batches for one model."""
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        name: str = "batch",
+        workers: int = 1
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            batch_fn: Called with a list of items; returns one result per item.
+                A result that is an Exception fails only that item.
+            max_batch_size: Maximum items per batch
+            max_wait_ms: Maximum time to wait for a batch to fill once the
+                first item has arrived
+            name: Name used for the worker threads and logs
+            workers: Number of batches run concurrently
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self.workers = workers
+        self._queues: "OrderedDict[str, Deque[_Entry]]" = OrderedDict()
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._running = False
+        self._threads: List[threading.Thread] = []
+        self._stats = {"batches": 0, "items": 0, "max_batch": 0}
+
+    def start(self) -> None:
+        """Start the worker threads (idempotent)."""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"s2a-{self.name}-scheduler-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(
+            f"Started '{self.name}' scheduler ({self.workers} workers, max batch {self.max_batch_size}, "
+            f"max wait {self.max_wait * 1000:.0f}ms)"
+        )
+
+    def stop(self) -> None:
+        """Stop the worker threads and fail any items still queued."""
+        with self._cond:
+            self._running = False
+            leftovers = [future for queue in self._queues.values() for _, future, _ in queue]
+            self._queues.clear()
+            self._pending = 0
+            self._cond.notify_all()
+        for future in leftovers:
+            future.set_exception(RuntimeError(f"Scheduler '{self.name}' stopped"))
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def submit(self, owner: str, item: Any, cancel: Optional[CancellationToken] = None) -> Future:
+        """
+        Queue an item for batched processing.
+
+        Args:
+            owner: Identifier of the submitting request (used for fairness)
+            item: Item passed to batch_fn
+            cancel: Token of the submitting request; the item is dropped with
+                RequestCancelled if it is cancelled before the item is batched
+
+        Returns:
+            Future resolved with the item's result (await it with asyncio.wrap_future)
+        """
+        future: Future = Future()
+        with self._cond:
+            if not self._running:
+                raise RuntimeError(f"Scheduler '{self.name}' is not running")
+            self._queues.setdefault(owner, deque()).append((item, future, cancel))
+            self._pending += 1
+            self._cond.notify()
+        return future
+
+    @property
+    def pending(self) -> int:
+        """Number of items waiting to be batched."""
+        return self._pending
+
+    def stats(self) -> Dict[str, Any]:
+        """Get batch counters."""
+        with self._cond:
+            batches = self._stats["batches"]
+            return {
+                **self._stats,
+                "pending": self._pending,
+                "avg_batch": self._stats["items"] / batches if batches else 0.0,
+            }
+
+    def _take_batch(self) -> List["_Entry"]:
+        """Pick up to max_batch_size items, one per owner per round. Caller holds the lock."""
+        batch: List[_Entry] = []
+        while self._queues and len(batch) < self.max_batch_size:
+            for owner in list(self._queues):
+                queue = self._queues[owner]
+                batch.append(queue.popleft())
+                if queue:
+                    # Owner goes to the back so the next pick starts with someone else
+                    self._queues.move_to_end(owner)
+                else:
+                    del self._queues[owner]
+                if len(batch) >= self.max_batch_size:
+                    break
+        self._pending -= len(batch)
+        return batch
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and not self._pending:
+                    self._cond.wait()
+                if not self._running:
+                    return
+
+                # Give the batch a short window to fill up
+                deadline = time.monotonic() + self.max_wait
+                while self._running and self._pending < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._take_batch()
+
+            runnable = []
+            for item, future, cancel in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                if cancel is not None and cancel.cancelled:
+                    future.set_exception(RequestCancelled(cancel.reason))
+                    continue
+                runnable.append((item, future))
+            if runnable:
+                self._run_batch(runnable)
+
+    def _run_batch(self, batch: List[Tuple[Any, Future]]) -> None:
+        items = [item for item, _ in batch]
+        try:
+            results = self.batch_fn(items)
+            if len(results) != len(items):
+                raise RuntimeError(f"batch_fn returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            logger.error(f"Scheduler '{self.name}' batch of {len(items)} failed: {e}")
+            results = [e] * len(items)
+
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+        with self._cond:
+            self._stats["batches"] += 1
+            self._stats["items"] += len(items)
+            self._stats["max_batch"] = max(self._stats["max_batch"], len(items))
+        logger.debug(f"Scheduler '{self.name}' ran batch of {len(items)}")
+
+
+def _synthesize_tts_batch(items: List[Any]) -> List[Any]:
+    """
+    Batch function of the TTS scheduler.
+
+    Items are (text, voice, cancel, work) tuples. The batch's execution time
+    is split evenly across its items and recorded as synthesize stage time,
+    so time spent waiting in the scheduler is not counted as work.
+    """
+    from src.kokoro_tts import synthesize_batch
+
+    start = time.perf_counter()
+    results = synthesize_batch(
+        [text for text, _, _, _ in items],
+        voices=[voice for _, voice, _, _ in items],
+        cancels=[cancel for _, _, cancel, _ in items]
+    )
+    share = (time.perf_counter() - start) / len(items)
+    for _, _, _, work in items:
+        metrics.record_stage("synthesize", share, work)
+    return results
+
+
+_tts_scheduler: Optional[BatchScheduler] = None
+_tts_scheduler_lock = threading.Lock()
+
+
+def get_tts_scheduler() -> BatchScheduler:
+    """Get the shared TTS scheduler, starting it on first use."""
+    global _tts_scheduler
+    with _tts_scheduler_lock:
+        if _tts_scheduler is None:
+            _tts_scheduler = BatchScheduler(
+                _synthesize_tts_batch,
+                max_batch_size=Config.TTS_MAX_BATCH_SIZE,
+                max_wait_ms=Config.TTS_MAX_WAIT_MS,
+                name="tts",
+                workers=Config.TTS_WORKERS
+            )
+            _tts_scheduler.start()
+        return _tts_scheduler
+
+
+def tts_scheduler_pending() -> int:
+    """Number of chunks waiting in the shared TTS scheduler (0 if not started)."""
+    scheduler = _tts_scheduler
+    return scheduler.pending if scheduler is not None else 0
+
+
+def stop_tts_scheduler() -> None:
+    """Stop the shared TTS scheduler if it was started."""
+    global _tts_scheduler
+    with _tts_scheduler_lock:
+        if _tts_scheduler is not None:
+            _tts_scheduler.stop()
+            _tts_scheduler = None
@@ -0,0 +1,126 @@
+"""
+Linear-time audio stitching for Story2Audio.
+
+Combines per-chunk waveforms into a single preallocated buffer and applies
+gain normalization and fade/crossfade ramps as vectorized NumPy operations,
+instead of growing an AudioSegment chunk by chunk.
+"""
+import logging
+from functools import lru_cache
+from typing import List, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=32)
+def _ramp(length: int) -> np.ndarray:
+    """Linear 0 -> 1 gain ramp of the given length (cached, read-only)."""
+    ramp = np.linspace(0.0, 1.0, length, dtype=np.float32)
+    ramp.setflags(write=False)
+    return ramp
+
+
+def peak_gains(arrays: Sequence[np.ndarray], headroom_db: float = 0.1) -> np.ndarray:
+    """
+    Compute per-chunk gains that bring each peak to ``headroom_db`` below full scale.
+
+    Args:
+        arrays: Float waveforms
+        headroom_db: Headroom below 0 dBFS in decibels (default: 0.1)
+
+    Returns:
+        Gain factor per chunk (1.0 for silent chunks)
+    """
+    peaks = np.array([float(np.max(np.abs(a))) if len(a) else 0.0 for a in arrays], dtype=np.float64)
+    target = 10 ** (-headroom_db / 20)
+    gains = np.ones_like(peaks)
+    np.divide(target, peaks, out=gains, where=peaks > 0)
+    return gains.astype(np.float32)
+
+
+def stitch(
+    arrays: List[np.ndarray],
+    sample_rate: int = 24000,
+    fade_duration: int = 100,
+    crossfade_duration: int = 0,
+    normalize: bool = True,
+    headroom_db: float = 0.1
+) -> np.ndarray:
+    """
+    Stitch chunk waveforms into one float32 waveform.
+
+    The output buffer is allocated once from the known chunk lengths and each
+    chunk is written into its slot, so total work is linear in the output
+    length. Chunks are faded in/out at every inner boundary; with a non-zero
+    ``crossfade_duration`` neighbouring chunks also overlap by that amount so
+    the fades blend into each other. The overlap is limited to the fade
+    length: beyond it the chunks would be summed at full gain and clip.
+
+    Args:
+        arrays: Float waveforms, one per chunk
+        sample_rate: Audio sample rate in Hz (default: 24000)
+        fade_duration: Fade ramp length in milliseconds at each boundary (default: 100)
+        crossfade_duration: Overlap between neighbouring chunks in milliseconds, at most
+            fade_duration (default: 0)
+        normalize: Peak-normalize each chunk before stitching (default: True)
+        headroom_db: Headroom used for normalization in decibels (default: 0.1)
+
+    Returns:
+        Stitched float32 waveform
+
+    Raises:
+        ValueError: If arrays list is empty or a duration is negative
+    """
+    if not arrays:
+        raise ValueError("Audio arrays list cannot be empty")
+    if fade_duration < 0 or crossfade_duration < 0:
+        raise ValueError("Fade and crossfade durations must be non-negative")
+
+    arrays = [np.asarray(a, dtype=np.float32).reshape(-1) for a in arrays]
+    lengths = np.array([len(a) for a in arrays], dtype=np.int64)
+    fade = int(sample_rate * fade_duration / 1000)
+    overlap = int(sample_rate * crossfade_duration / 1000)
+    if overlap > fade:
+        logger.warning(f"Crossfade of {crossfade_duration}ms limited to the {fade_duration}ms fade")
+        overlap = fade
+
+    # Overlap at each inner boundary, limited by the shorter neighbour
+    overlaps = np.minimum(overlap, np.minimum(lengths[:-1], lengths[1:])) if len(arrays) > 1 else np.zeros(0, np.int64)
+    starts = np.concatenate(([0], np.cumsum(lengths[:-1] - overlaps))).astype(np.int64)
+    total = int(starts[-1] + lengths[-1])
+
+    gains = peak_gains(arrays, headroom_db) if normalize else np.ones(len(arrays), dtype=np.float32)
+    out = np.zeros(total, dtype=np.float32)
+    last = len(arrays) - 1
+
+    for i, audio in enumerate(arrays):
+        n = len(audio)
+        if n == 0:
+            continue
+        view = out[starts[i]:starts[i] + n]
+        head = int(overlaps[i - 1]) if i > 0 else 0
+        fade_in = min(fade, n) if i > 0 else 0
+        fade_out = min(fade, n) if i < last else 0
+
+        # Samples that need a fade-in or are shared with the previous chunk
+        # are built separately and added; the rest is written in place.
+        k = max(head, fade_in)
+        if k:
+            lead = audio[:k] * gains[i]
+            if fade_in:
+                lead[:fade_in] *= _ramp(fade_in)
+            view[:head] += lead[:head]
+            view[head:k] = lead[head:]
+        np.multiply(audio[k:], gains[i], out=view[k:])
+
+        if fade_out:
+            lo = max(n - fade_out, head)
+            view[lo:] *= _ramp(fade_out)[::-1][lo - (n - fade_out):]
+
+    logger.debug(
+        f"Stitched {len(arrays)} chunks into {total} samples "
+        f"({total / sample_rate:.1f}s, {int(overlaps.sum())} samples crossfaded)"
+    )
+    return out
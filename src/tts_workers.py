@@ -0,0 +1,255 @@
+"""
+Multi-process TTS worker pool for Story2Audio.
+
+Each worker process loads its own TTS pipeline once at startup and
+synthesizes chunks sent to it over the pool's task queue. Waveforms come
+back through shared memory rather than being pickled through the result
+pipe, so large chunks are copied only once into the parent.
+
+Chunks wait in the parent until a worker is free rather than in the
+executor's call queue, so a chunk whose request is cancelled while it
+waits is dropped without reaching a worker.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Deque, Optional, Tuple
+
+import numpy as np
+
+from config import Config
+from src.cancellation import CancellationToken, RequestCancelled
+from src.metrics import StageTotals, metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _export_array(audio: np.ndarray) -> Tuple[str, int]:
+    """Copy a float32 waveform into a new shared memory block; returns (name, length)."""
+    audio = np.ascontiguousarray(audio, dtype=np.float32)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, audio.nbytes))
+    try:
+        np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)[:] = audio
+        return shm.name, len(audio)
+    finally:
+        shm.close()
+
+
+def _import_array(name: str, length: int) -> np.ndarray:
+    """Copy a waveform out of a shared memory block and release the block."""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return np.ndarray((length,), dtype=np.float32, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _init_worker(torch_threads: int, voice: str, ready: "multiprocessing.Queue") -> None:
+    """Worker initializer: limit torch threads, load and warm up the pipeline, then report ready."""
+    try:
+        import torch
+        torch.set_num_threads(max(1, torch_threads))
+    except ImportError:
+        pass
+
+    from src.kokoro_tts import warm_up
+    warm_up(voice=voice)
+    logger.info(f"TTS worker {multiprocessing.current_process().name} ready")
+    ready.put(os.getpid())
+
+
+def _synthesize_in_worker(text: str, voice: str) -> Tuple[str, int, float]:
+    """Synthesize one chunk inside a worker process; returns (name, length, seconds)."""
+    from src.kokoro_tts import synthesize_chunk
+    start = time.perf_counter()
+    audio = synthesize_chunk(text, voice=voice)
+    return (*_export_array(audio), time.perf_counter() - start)
+
+
+class TTSWorkerPool:
+    """Pool of processes that each own a TTS pipeline."""
+
+    def __init__(self, workers: int = 2, torch_threads: int = 1):
+        """
+        Initialize pool.
+
+        Args:
+            workers: Number of worker processes
+            torch_threads: Torch intra-op threads per worker
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.workers = workers
+        self.torch_threads = torch_threads
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._ready: Optional["multiprocessing.Queue"] = None
+        self._warm = False
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        # Chunks not yet handed to a worker: (text, voice, cancel, work, result)
+        self._waiting: Deque[Tuple[str, str, Optional[CancellationToken], Optional[StageTotals], Future]] = deque()
+        self._in_flight = 0
+
+    def start(self) -> None:
+        """Start the worker processes (idempotent)."""
+        if self._executor is not None:
+            return
+        context = multiprocessing.get_context("spawn")
+        self._ready = context.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.torch_threads, Config.TTS_VOICE, self._ready)
+        )
+        logger.info(f"Started TTS worker pool: {self.workers} processes x {self.torch_threads} torch threads")
+
+    def wait_ready(self, timeout: Optional[float] = None) -> None:
+        """
+        Block until every worker has loaded and warmed up its pipeline.
+
+        Raises:
+            RuntimeError: If the pool is not running
+            queue.Empty: If a worker is not ready within the timeout
+        """
+        if self._executor is None or self._ready is None:
+            raise RuntimeError("TTS worker pool is not running")
+        if self._warm:
+            return
+        # Worker processes are spawned on demand, one per submission while none is idle
+        for _ in range(self.workers):
+            self._executor.submit(os.getpid)
+        for _ in range(self.workers):
+            self._ready.get(timeout=timeout)
+        self._warm = True
+        logger.info(f"All {self.workers} TTS workers warmed up")
+
+    def submit(
+        self,
+        text: str,
+        voice: str = 'af_heart',
+        cancel: Optional[CancellationToken] = None,
+        work: Optional[StageTotals] = None
+    ) -> Future:
+        """
+        Queue a chunk for synthesis in a worker process.
+
+        Args:
+            text: Text chunk to synthesize
+            voice: Voice style to use
+            cancel: Token of the submitting request; the chunk is dropped with
+                RequestCancelled if it is cancelled before a worker takes it
+            work: Per-request accumulator receiving the worker's synthesis
+                time (time spent waiting for a worker is not counted)
+
+        Returns:
+            Future resolved with the float32 waveform
+        """
+        if self._executor is None:
+            raise RuntimeError("TTS worker pool is not running")
+
+        result: Future = Future()
+        with self._pending_lock:
+            self._pending += 1
+            self._waiting.append((text, voice, cancel, work, result))
+        self._dispatch()
+        return result
+
+    def _dispatch(self) -> None:
+        """Hand waiting chunks to the executor while a worker is free, skipping cancelled ones."""
+        while True:
+            with self._pending_lock:
+                if not self._waiting or self._in_flight >= self.workers or self._executor is None:
+                    return
+                text, voice, cancel, work, result = self._waiting.popleft()
+                dropped = result.cancelled() or (cancel is not None and cancel.cancelled)
+                if dropped:
+                    self._pending -= 1
+                else:
+                    self._in_flight += 1
+                executor = self._executor
+            if dropped:
+                if not result.cancelled():
+                    result.set_exception(RequestCancelled(cancel.reason))
+                continue
+            task = executor.submit(_synthesize_in_worker, text, voice)
+            task.add_done_callback(lambda task, work=work, result=result: self._copy_out(task, work, result))
+
+    def _copy_out(self, task: Future, work: Optional[StageTotals], result: Future) -> None:
+        """Deliver a finished chunk and start the next waiting one."""
+        with self._pending_lock:
+            self._pending -= 1
+            self._in_flight -= 1
+        if not task.cancelled():
+            try:
+                # Always copy out so the shared memory block is released
+                name, length, seconds = task.result()
+                audio = _import_array(name, length)
+                metrics.record_stage("synthesize", seconds, work)
+                if not result.cancelled():
+                    result.set_result(audio)
+            except Exception as e:
+                if not result.cancelled():
+                    result.set_exception(e)
+        elif not result.done():
+            result.cancel()
+        self._dispatch()
+
+    @property
+    def pending(self) -> int:
+        """Number of chunks submitted and not yet finished."""
+        return self._pending
+
+    def synthesize(self, text: str, voice: str = 'af_heart') -> np.ndarray:
+        """Synthesize a chunk in a worker process and wait for it."""
+        return self.submit(text, voice).result()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            with self._pending_lock:
+                waiting = list(self._waiting)
+                self._waiting.clear()
+                self._pending -= len(waiting)
+            for *_, result in waiting:
+                result.cancel()
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+            self._ready = None
+            self._warm = False
+            logger.info("TTS worker pool stopped")
+
+
+_tts_pool: Optional[TTSWorkerPool] = None
+_tts_pool_lock = threading.Lock()
+
+
+def get_tts_pool() -> TTSWorkerPool:
+    """Get the shared TTS worker pool, starting it on first use."""
+    global _tts_pool
+    with _tts_pool_lock:
+        if _tts_pool is None:
+            _tts_pool = TTSWorkerPool(workers=Config.TTS_PROCESS_WORKERS, torch_threads=Config.TTS_TORCH_THREADS)
+            _tts_pool.start()
+        return _tts_pool
+
+
+def tts_pool_pending() -> int:
+    """Number of chunks in flight in the shared worker pool (0 if not started)."""
+    pool = _tts_pool
+    return pool.pending if pool is not None else 0
+
+
+def shutdown_tts_pool() -> None:
+    """Stop the shared TTS worker pool if it was started."""
+    global _tts_pool
+    with _tts_pool_lock:
+        if _tts_pool is not None:
+            _tts_pool.shutdown(wait=False)
+            _tts_pool = None
@@ -6,9 +6,13 @@ format conversion, and quality optimization.
 """
 from pydub import AudioSegment
 from typing import List, Optional
+import numpy as np
+import soundfile as sf
+import io
 import logging
 import os
 from config import Config
+from src.stitching import stitch
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +39,20 @@ def validate_audio_file(file_path: str) -> bool:
     return True
 
 
+def to_pcm16(audio: np.ndarray) -> bytes:
+    """
+    Convert a float waveform in [-1, 1] to 16-bit little-endian PCM bytes.
+    
+    Args:
+        audio: Float waveform
+        
+    Returns:
+        Raw PCM bytes (pcm_s16le)
+    """
+    clipped = np.clip(np.asarray(audio, dtype=np.float32), -1.0, 1.0)
+    return (clipped * 32767.0).astype('<i2').tobytes()
+
+
 def combine_audio(
     files: List[str], 
     output_path: str = "outputs/final_story.mp3",
@@ -75,44 +93,111 @@ def combine_audio(
         os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else ".", exist_ok=True)
         
         logger.info(f"Combining {len(files)} audio files into {output_path}")
-        final = AudioSegment.empty()
-        
+        arrays = []
+        sample_rate = None
         for i, file_path in enumerate(files):
             try:
-                audio = AudioSegment.from_wav(file_path)
-                
-                # Normalize audio if enabled
-                if Config.NORMALIZE_AUDIO:
-                    from src.audio_quality import normalize_audio_levels
-                    audio = normalize_audio_levels(audio)
-                
-                # Add fade in/out for smoother transitions (except first and last)
-                if i > 0 and fade_duration > 0:
-                    audio = audio.fade_in(fade_duration)
-                if i < len(files) - 1 and fade_duration > 0:
-                    audio = audio.fade_out(fade_duration)
-                
-                final += audio
-                logger.debug(f"Added chunk {i+1}/{len(files)}: {len(audio)}ms")
-                
+                audio, rate = sf.read(file_path, dtype="float32", always_2d=True)
             except Exception as e:
                 logger.error(f"Error processing file {file_path}: {e}")
                 raise
+            if sample_rate is None:
+                sample_rate = rate
+            elif rate != sample_rate:
+                raise ValueError(f"Sample rate mismatch in {file_path}: {rate} != {sample_rate}")
+            # Downmix to mono
+            arrays.append(audio.mean(axis=1) if audio.shape[1] > 1 else audio[:, 0])
+            logger.debug(f"Loaded chunk {i+1}/{len(files)}: {len(audio) / rate * 1000:.0f}ms")
+        
+        final = combine_audio_arrays(arrays, sample_rate, fade_duration=fade_duration)
         
         # Export with specified bitrate
-        final.export(
-            output_path, 
-            format="mp3",
-            bitrate=bitrate,
-            parameters=["-q:a", "2"]  # High quality
-        )
+        with open(output_path, "wb") as f:
+            f.write(encode_audio(final, sample_rate=sample_rate, bitrate=bitrate))
         
         file_size_mb = os.path.getsize(output_path) / (1024 * 1024)
-        duration_sec = len(final) / 1000.0
+        duration_sec = len(final) / sample_rate
         logger.info(f"Audio stitched successfully: {output_path} ({file_size_mb:.2f} MB, {duration_sec:.1f}s)")
         
         return output_path
         
     except Exception as e:
         logger.error(f"Audio stitching failed: {e}")
-        raise RuntimeError(f"Failed to combine audio files: {e}") from e
\ No newline at end of file
+        raise RuntimeError(f"Failed to combine audio files: {e}") from e
+
+
+def combine_audio_arrays(
+    arrays: List[np.ndarray],
+    sample_rate: int = 24000,
+    fade_duration: int = 100,
+    normalize: Optional[bool] = None
+) -> np.ndarray:
+    """
+    Combine in-memory float waveforms into a single waveform.
+    
+    Applies per-chunk normalization and fade transitions using the
+    preallocated NumPy stitching engine, without writing or reading any files.
+
+    Args:
+        arrays: Float32 waveforms, one per chunk
+        sample_rate: Audio sample rate in Hz (default: 24000)
+        fade_duration: Fade duration in milliseconds between chunks (default: 100)
+        normalize: Normalize each chunk (defaults to Config.NORMALIZE_AUDIO)
+
+    Returns:
+        Combined float32 waveform
+
+    Raises:
+        ValueError: If arrays list is empty
+    """
+    if normalize is None:
+        normalize = Config.NORMALIZE_AUDIO
+    
+    return stitch(
+        arrays,
+        sample_rate=sample_rate,
+        fade_duration=fade_duration,
+        crossfade_duration=Config.AUDIO_CROSSFADE_DURATION,
+        normalize=normalize
+    )
+
+
+def encode_audio(
+    audio: np.ndarray,
+    sample_rate: int = 24000,
+    bitrate: str = "192k",
+    audio_format: str = "mp3"
+) -> bytes:
+    """
+    Encode a float waveform to a compressed audio format in memory.
+
+    Args:
+        audio: Float32 waveform
+        sample_rate: Audio sample rate in Hz (default: 24000)
+        bitrate: Output bitrate (default: "192k")
+        audio_format: Output container/codec understood by ffmpeg (default: "mp3")
+
+    Returns:
+        Encoded audio bytes
+
+    Raises:
+        RuntimeError: If encoding fails
+    """
+    try:
+        segment = AudioSegment(
+            data=to_pcm16(audio),
+            sample_width=2,
+            frame_rate=sample_rate,
+            channels=1
+        )
+        buffer = io.BytesIO()
+        segment.export(buffer, format=audio_format, bitrate=bitrate, parameters=["-q:a", "2"])
+        encoded = buffer.getvalue()
+        logger.info(
+            f"Audio encoded in memory: {len(encoded) / (1024 * 1024):.2f} MB, "
+            f"{len(audio) / sample_rate:.1f}s"
+        )
+        return encoded
+    except Exception as e:
+        logger.error(f"Audio encoding failed: {e}")
+        raise RuntimeError(f"Failed to encode audio: {e}") from e
@@ -5,11 +5,60 @@ Provides comprehensive validation for story text inputs.
 """
 import re
 import logging
-from typing import Tuple, Optional
+from dataclasses import dataclass
+from functools import cached_property
+from itertools import accumulate
+from typing import List, Tuple, Optional
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class StoryAnalysis:
+    """
+    Normalized story text and its words, computed once per request.
+    
+    The server uses it for validation, word counts and admission. The
+    chunker works on the raw source text, so paragraph breaks still end
+    sentences and chunk offsets point into what the client sent, and reuses
+    the word spans instead of splitting the text again.
+    """
+    text: str
+    words: List[str]
+    error: Optional[str] = None
+    source: str = ""
+    
+    @property
+    def is_valid(self) -> bool:
+        """Whether the story passed validation."""
+        return self.error is None
+    
+    @property
+    def word_count(self) -> int:
+        return len(self.words)
+    
+    @property
+    def char_count(self) -> int:
+        return len(self.text)
+    
+    @cached_property
+    def word_spans(self) -> List[Tuple[int, int]]:
+        """(start, end) offsets of each word in source (in text if there is no source)."""
+        if not self.source:
+            # Words are joined by single spaces: word i ends at the sum of the
+            # first i + 1 word lengths plus the i spaces before it
+            ends = [end + i for i, end in enumerate(accumulate(map(len, self.words)))]
+            return [(end - len(word), end) for word, end in zip(self.words, ends)]
+        spans = []
+        end = 0
+        find = self.source.find
+        for word in self.words:
+            start = find(word, end)
+            end = start + len(word)
+            spans.append((start, end))
+        return spans
+
+
 class StoryValidator:
     """Validates story text inputs before processing."""
     
@@ -25,70 +74,92 @@ class StoryValidator:
     EXCESSIVE_WHITESPACE_PATTERN = re.compile(r'\s{10,}')
     
     @classmethod
-    def validate_story_text(cls, text: str) -> Tuple[bool, Optional[str]]:
+    def analyze(cls, text: str) -> StoryAnalysis:
         """
-        Validate story text.
+        Sanitize and validate story text in one pass over its words.
+        
+        Equivalent to validate_story_text(sanitize_text(text)), but the text
+        is split once and the result keeps the normalized text and its words
+        for the rest of the request.
         
         Args:
-            text: Story text to validate
+            text: Raw story text
             
         Returns:
-            Tuple of (is_valid, error_message)
+            StoryAnalysis; its error is set if the story is invalid
         """
-        if not text:
-            return False, "Story text cannot be empty"
-        
         if not isinstance(text, str):
-            return False, "Story text must be a string"
-        
-        text = text.strip()
+            return StoryAnalysis("", [], "Story text must be a string")
+        words = text.split()
+        normalized = " ".join(words)
+        return StoryAnalysis(normalized, words, cls._check(normalized, words), source=text)
+    
+    @classmethod
+    def _check(cls, text: str, words: List[str]) -> Optional[str]:
+        """Validate whitespace-normalized text; returns an error message or None."""
+        word_count = len(words)
+        if word_count < cls.MIN_WORDS:
+            return "Story text cannot be empty"
+        
+        # Only a single token can be all numbers or all special characters
+        # (the patterns exclude whitespace, so "1234 5678" is accepted, as it
+        # always was); report that before its length, which would otherwise
+        # hide the more useful message
+        if word_count == 1:
+            if cls.ONLY_NUMBERS_PATTERN.match(text):
+                return "Story cannot consist only of numbers"
+            if cls.ONLY_SPECIAL_CHARS_PATTERN.match(text):
+                return "Story cannot consist only of special characters"
         
-        # Check minimum length
         if len(text) < cls.MIN_CHARS:
-            return False, f"Story text too short (minimum {cls.MIN_CHARS} characters)"
+            return f"Story text too short (minimum {cls.MIN_CHARS} characters)"
         
-        # Check maximum length
         if len(text) > cls.MAX_CHARS:
-            return False, f"Story text too long (maximum {cls.MAX_CHARS} characters)"
+            return f"Story text too long (maximum {cls.MAX_CHARS} characters)"
         
-        # Count words
-        words = text.split()
-        word_count = len(words)
+        if word_count > cls.MAX_WORDS:
+            return f"Story text too long (maximum {cls.MAX_WORDS} words, found {word_count})"
         
-        if word_count < cls.MIN_WORDS:
-            return False, f"Story must contain at least {cls.MIN_WORDS} word"
+        # Check for meaningful words (at least some words longer than 1 char)
+        if not any(len(w) > 1 and w.isalnum() for w in words):
+            return "Story must contain meaningful words"
         
-        if word_count > cls.MAX_WORDS:
-            return False, f"Story text too long (maximum {cls.MAX_WORDS} words, found {word_count})"
+        return None
+    
+    @classmethod
+    def validate_story_text(cls, text: str) -> Tuple[bool, Optional[str]]:
+        """
+        Validate story text.
         
-        # Check for only numbers
-        if cls.ONLY_NUMBERS_PATTERN.match(text):
-            return False, "Story cannot consist only of numbers"
+        Lengths are measured after whitespace normalization; raw text is
+        additionally checked for whitespace runs and its line count.
         
-        # Check for only special characters
-        if cls.ONLY_SPECIAL_CHARS_PATTERN.match(text):
-            return False, "Story cannot consist only of special characters"
+        Args:
+            text: Story text to validate
+            
+        Returns:
+            Tuple of (is_valid, error_message)
+        """
+        if not text:
+            return False, "Story text cannot be empty"
+        
+        analysis = cls.analyze(text)
+        if analysis.error is not None:
+            return False, analysis.error
         
-        # Check for excessive whitespace
+        # Checks that only apply to text that has not been sanitized
         if cls.EXCESSIVE_WHITESPACE_PATTERN.search(text):
             return False, "Story contains excessive whitespace"
         
-        # Check line count
-        line_count = len(text.split('\n'))
-        if line_count > cls.MAX_LINES:
+        if text.strip().count('\n') + 1 > cls.MAX_LINES:
             return False, f"Story has too many lines (max {cls.MAX_LINES})"
         
-        # Check for meaningful words (at least some words longer than 1 char)
-        meaningful_words = [w for w in words if len(w) > 1 and w.isalnum()]
-        if len(meaningful_words) < cls.MIN_WORDS:
-            return False, "Story must contain meaningful words"
-        
         return True, None
     
     @classmethod
     def sanitize_text(cls, text: str) -> str:
         """
-        Sanitize story text by removing excessive whitespace.
+        Sanitize story text by collapsing all whitespace to single spaces.
         
         Args:
             text: Text to sanitize
@@ -98,12 +169,4 @@ class StoryValidator:
         """
         if not text:
             return ""
-        
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text.strip())
-        
-        # Remove leading/trailing whitespace from each line
-        lines = [line.strip() for line in text.split('\n')]
-        text = '\n'.join(lines)
-        
-        return text.strip()
+        return " ".join(text.split())
@@ -0,0 +1,134 @@
+"""
+Per-request scratch directories for Story2Audio.
+
+Each request writes its chunk files and final audio into its own
+directory so concurrent requests never overwrite each other's output.
+Directories are removed when the request finishes and are subject to a
+configurable disk quota.
+"""
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WorkspaceQuotaExceeded(RuntimeError):
+    """Raised when a request writes more data than its disk quota allows."""
+
+
+class RequestWorkspace:
+    """
+    Isolated scratch directory for a single request.
+
+    Use as a context manager; the directory is created on entry and
+    deleted on exit unless ``keep`` is set.
+    """
+
+    def __init__(
+        self,
+        request_id: str,
+        root: str = "outputs/temp",
+        quota_bytes: int = 0,
+        keep: bool = False
+    ):
+        """
+        Initialize workspace.
+
+        Args:
+            request_id: Request identifier used as the directory name
+            root: Parent directory for all workspaces
+            quota_bytes: Maximum bytes the workspace may hold (0 = unlimited)
+            keep: Keep the directory after the request finishes
+        """
+        if not request_id or os.sep in request_id or request_id in (".", ".."):
+            raise ValueError(f"Invalid request id for workspace: {request_id!r}")
+
+        self.request_id = request_id
+        self.path = Path(root) / request_id
+        self.quota_bytes = quota_bytes
+        self.keep = keep
+        self._used_bytes = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "RequestWorkspace":
+        self.path.mkdir(parents=True, exist_ok=True)
+        logger.debug(f"[{self.request_id}] Workspace created: {self.path}")
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if not self.keep:
+            self.cleanup()
+
+    @property
+    def used_bytes(self) -> int:
+        """Bytes recorded against the quota so far."""
+        return self._used_bytes
+
+    def file_path(self, name: str) -> str:
+        """Get the path of a file inside the workspace."""
+        return str(self.path / name)
+
+    def track(self, file_path: Optional[str]) -> Optional[str]:
+        """
+        Record a file written into the workspace against the quota.
+
+        Args:
+            file_path: Path of the written file (None is ignored)
+
+        Returns:
+            The same path, for chaining
+
+        Raises:
+            WorkspaceQuotaExceeded: If the workspace exceeds its quota
+        """
+        if file_path is None:
+            return None
+
+        size = os.path.getsize(file_path)
+        with self._lock:
+            self._used_bytes += size
+            used = self._used_bytes
+
+        if self.quota_bytes and used > self.quota_bytes:
+            raise WorkspaceQuotaExceeded(
+                f"Request {self.request_id} exceeded disk quota "
+                f"({used / 1024 / 1024:.1f} MB > {self.quota_bytes / 1024 / 1024:.1f} MB)"
+            )
+        return file_path
+
+    def cleanup(self) -> None:
+        """Delete the workspace directory and everything in it."""
+        shutil.rmtree(self.path, ignore_errors=True)
+        logger.debug(f"[{self.request_id}] Workspace removed: {self.path}")
+
+
+def cleanup_stale_workspaces(root: str, max_age: float) -> int:
+    """
+    Remove workspace directories left behind by crashed or killed requests.
+
+    Args:
+        root: Parent directory of all workspaces
+        max_age: Minimum age in seconds for a directory to be removed
+
+    Returns:
+        Number of directories removed
+    """
+    root_path = Path(root)
+    if not root_path.is_dir():
+        return 0
+
+    removed = 0
+    cutoff = time.time() - max_age
+    for entry in root_path.iterdir():
+        if entry.is_dir() and entry.stat().st_mtime < cutoff:
+            shutil.rmtree(entry, ignore_errors=True)
+            removed += 1
+
+    if removed:
+        logger.info(f"Removed {removed} stale workspaces from {root}")
+    return removed
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x11story2audio.proto\x12\x0cstoryservice\"\"\n\x0cStoryRequest\x12\x12\n\nstory_text\x18\x01 \x01(\t\"F\n\rAudioResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x14\n\x0c\x61udio_base64\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t2Z\n\x0cStoryService\x12J\n\rGenerateAudio\x12\x1a.storyservice.StoryRequest\x1a\x1b.storyservice.AudioResponse\"\x00\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x11story2audio.proto\x12\x0cstoryservice\"D\n\x0cStoryRequest\x12\x12\n\nstory_text\x18\x01 \x01(\t\x12\x0e\n\x06\x62inary\x18\x02 \x01(\x08\x12\x10\n\x08story_id\x18\x03 \x01(\t\"k\n\rAudioResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x14\n\x0c\x61udio_base64\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\x12\r\n\x05\x61udio\x18\x04 \x01(\x0c\x12\x14\n\x0c\x61udio_format\x18\x05 \x01(\t\"\x88\x01\n\nAudioFrame\x12\r\n\x05index\x18\x01 \x01(\x05\x12\r\n\x05\x61udio\x18\x02 \x01(\x0c\x12\x10\n\x08\x64uration\x18\x03 \x01(\x02\x12\r\n\x05\x66inal\x18\x04 \x01(\x08\x12\x13\n\x0bsample_rate\x18\x05 \x01(\x05\x12\x10\n\x08\x65ncoding\x18\x06 \x01(\t\x12\x14\n\x0ctotal_chunks\x18\x07 \x01(\x05\"d\n\nAudioPiece\x12\x10\n\x08sequence\x18\x01 \x01(\x05\x12\x0c\n\x04\x64\x61ta\x18\x02 \x01(\x0c\x12\x0c\n\x04last\x18\x03 \x01(\x08\x12\x12\n\ntotal_size\x18\x04 \x01(\x03\x12\x14\n\x0c\x61udio_format\x18\x05 \x01(\t\"\x1c\n\nJobRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\t\"\xbf\x01\n\tJobStatus\x12\x0e\n\x06job_id\x18\x01 \x01(\t\x12\r\n\x05state\x18\x02 \x01(\t\x12\x18\n\x10progress_current\x18\x03 \x01(\x05\x12\x16\n\x0eprogress_total\x18\x04 \x01(\x05\x12\x0f\n\x07message\x18\x05 \x01(\t\x12\x12\n\naudio_size\x18\x06 \x01(\x03\x12\x14\n\x0c\x61udio_format\x18\x07 \x01(\t\x12\x12\n\ncreated_at\x18\x08 \x01(\x01\x12\x12\n\nupdated_at\x18\t \x01(\x01\x32\x91\x04\n\x0cStoryService\x12J\n\rGenerateAudio\x12\x1a.storyservice.StoryRequest\x1a\x1b.storyservice.AudioResponse\"\x00\x12O\n\x13GenerateAudioStream\x12\x1a.storyservice.StoryRequest\x1a\x18.storyservice.AudioFrame\"\x00\x30\x01\x12P\n\x14GenerateAudioChunked\x12\x1a.storyservice.StoryRequest\x1a\x18.storyservice.AudioPiece\"\x00\x30\x01\x12\x44\n\x0bSubmitStory\x12\x1a.storyservice.StoryRequest\x1a\x17.storyservice.JobStatus\"\x00\x12\x43\n\x0cGetJobStatus\x12\x18.storyservice.JobRequest\x1a\x17.storyservice.JobStatus\"\x00\x12\x41\n\x08WatchJob\x12\x18.storyservice.JobRequest\x1a\x17.storyservice.JobStatus\"\x00\x30\x01\x12\x44\n\nFetchAudio\x12\x18.storyservice.JobRequest\x1a\x18.storyservice.AudioPiece\"\x00\x30\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -32,9 +32,17 @@ _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'story2audio_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
   _globals['_STORYREQUEST']._serialized_start=35
-  _globals['_STORYREQUEST']._serialized_end=69
-  _globals['_AUDIORESPONSE']._serialized_start=71
-  _globals['_AUDIORESPONSE']._serialized_end=141
-  _globals['_STORYSERVICE']._serialized_start=143
-  _globals['_STORYSERVICE']._serialized_end=233
+  _globals['_STORYREQUEST']._serialized_end=103
+  _globals['_AUDIORESPONSE']._serialized_start=105
+  _globals['_AUDIORESPONSE']._serialized_end=212
+  _globals['_AUDIOFRAME']._serialized_start=215
+  _globals['_AUDIOFRAME']._serialized_end=351
+  _globals['_AUDIOPIECE']._serialized_start=353
+  _globals['_AUDIOPIECE']._serialized_end=453
+  _globals['_JOBREQUEST']._serialized_start=455
+  _globals['_JOBREQUEST']._serialized_end=483
+  _globals['_JOBSTATUS']._serialized_start=486
+  _globals['_JOBSTATUS']._serialized_end=677
+  _globals['_STORYSERVICE']._serialized_start=680
+  _globals['_STORYSERVICE']._serialized_end=1209
 # @@protoc_insertion_point(module_scope)
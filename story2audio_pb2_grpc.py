@@ -39,6 +39,36 @@ class StoryServiceStub(object):
                 request_serializer=story2audio__pb2.StoryRequest.SerializeToString,
                 response_deserializer=story2audio__pb2.AudioResponse.FromString,
                 _registered_method=True)
+        self.GenerateAudioStream = channel.unary_stream(
+                '/storyservice.StoryService/GenerateAudioStream',
+                request_serializer=story2audio__pb2.StoryRequest.SerializeToString,
+                response_deserializer=story2audio__pb2.AudioFrame.FromString,
+                _registered_method=True)
+        self.GenerateAudioChunked = channel.unary_stream(
+                '/storyservice.StoryService/GenerateAudioChunked',
+                request_serializer=story2audio__pb2.StoryRequest.SerializeToString,
+                response_deserializer=story2audio__pb2.AudioPiece.FromString,
+                _registered_method=True)
+        self.SubmitStory = channel.unary_unary(
+                '/storyservice.StoryService/SubmitStory',
+                request_serializer=story2audio__pb2.StoryRequest.SerializeToString,
+                response_deserializer=story2audio__pb2.JobStatus.FromString,
+                _registered_method=True)
+        self.GetJobStatus = channel.unary_unary(
+                '/storyservice.StoryService/GetJobStatus',
+                request_serializer=story2audio__pb2.JobRequest.SerializeToString,
+                response_deserializer=story2audio__pb2.JobStatus.FromString,
+                _registered_method=True)
+        self.WatchJob = channel.unary_stream(
+                '/storyservice.StoryService/WatchJob',
+                request_serializer=story2audio__pb2.JobRequest.SerializeToString,
+                response_deserializer=story2audio__pb2.JobStatus.FromString,
+                _registered_method=True)
+        self.FetchAudio = channel.unary_stream(
+                '/storyservice.StoryService/FetchAudio',
+                request_serializer=story2audio__pb2.JobRequest.SerializeToString,
+                response_deserializer=story2audio__pb2.AudioPiece.FromString,
+                _registered_method=True)
 
 
 class StoryServiceServicer(object):
@@ -50,6 +80,42 @@ class StoryServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GenerateAudioStream(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GenerateAudioChunked(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SubmitStory(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetJobStatus(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def WatchJob(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def FetchAudio(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_StoryServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -58,6 +124,36 @@ def add_StoryServiceServicer_to_server(servicer, server):
                     request_deserializer=story2audio__pb2.StoryRequest.FromString,
                     response_serializer=story2audio__pb2.AudioResponse.SerializeToString,
             ),
+            'GenerateAudioStream': grpc.unary_stream_rpc_method_handler(
+                    servicer.GenerateAudioStream,
+                    request_deserializer=story2audio__pb2.StoryRequest.FromString,
+                    response_serializer=story2audio__pb2.AudioFrame.SerializeToString,
+            ),
+            'GenerateAudioChunked': grpc.unary_stream_rpc_method_handler(
+                    servicer.GenerateAudioChunked,
+                    request_deserializer=story2audio__pb2.StoryRequest.FromString,
+                    response_serializer=story2audio__pb2.AudioPiece.SerializeToString,
+            ),
+            'SubmitStory': grpc.unary_unary_rpc_method_handler(
+                    servicer.SubmitStory,
+                    request_deserializer=story2audio__pb2.StoryRequest.FromString,
+                    response_serializer=story2audio__pb2.JobStatus.SerializeToString,
+            ),
+            'GetJobStatus': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetJobStatus,
+                    request_deserializer=story2audio__pb2.JobRequest.FromString,
+                    response_serializer=story2audio__pb2.JobStatus.SerializeToString,
+            ),
+            'WatchJob': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchJob,
+                    request_deserializer=story2audio__pb2.JobRequest.FromString,
+                    response_serializer=story2audio__pb2.JobStatus.SerializeToString,
+            ),
+            'FetchAudio': grpc.unary_stream_rpc_method_handler(
+                    servicer.FetchAudio,
+                    request_deserializer=story2audio__pb2.JobRequest.FromString,
+                    response_serializer=story2audio__pb2.AudioPiece.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'storyservice.StoryService', rpc_method_handlers)
@@ -95,3 +191,165 @@ class StoryService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def GenerateAudioStream(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/storyservice.StoryService/GenerateAudioStream',
+            story2audio__pb2.StoryRequest.SerializeToString,
+            story2audio__pb2.AudioFrame.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GenerateAudioChunked(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/storyservice.StoryService/GenerateAudioChunked',
+            story2audio__pb2.StoryRequest.SerializeToString,
+            story2audio__pb2.AudioPiece.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SubmitStory(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/storyservice.StoryService/SubmitStory',
+            story2audio__pb2.StoryRequest.SerializeToString,
+            story2audio__pb2.JobStatus.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetJobStatus(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/storyservice.StoryService/GetJobStatus',
+            story2audio__pb2.JobRequest.SerializeToString,
+            story2audio__pb2.JobStatus.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def WatchJob(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/storyservice.StoryService/WatchJob',
+            story2audio__pb2.JobRequest.SerializeToString,
+            story2audio__pb2.JobStatus.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def FetchAudio(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/storyservice.StoryService/FetchAudio',
+            story2audio__pb2.JobRequest.SerializeToString,
+            story2audio__pb2.AudioPiece.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)